@@ -0,0 +1,77 @@
+"""
+Compare concurrent throughput of the sync and async patient routes.
+
+Starts the API twice under uvicorn against the same database, once with
+ASYNC_DB=false and once with ASYNC_DB=true, and drives both with the same
+concurrent read load. Each mode's results record where its queries wait
+("db_wait"): in threadpool workers for the sync routes, on the event loop
+for the async ones. Scoring and serialization run in the threadpool in
+both modes.
+
+Usage (from ehr-cds-api/):
+    python bench/async_vs_sync.py --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+
+import httpx
+
+from harness import API_DIR, free_port, run_load, wait_ready
+
+
+def start_server(async_db: bool, port: int) -> subprocess.Popen:
+    """Launch uvicorn for one mode; readiness is awaited by ``measure``."""
+    env = dict(os.environ, ASYNC_DB=str(async_db).lower())
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+async def measure(base_url: str, concurrency: int, duration: float) -> dict:
+    """Drive list and detail reads from ``concurrency`` workers for ``duration`` seconds."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        await wait_ready(client, timeout=300)
+        first_page = (await client.get("/api/patients", params={"page_size": 100})).json()
+        seqns = [item["seqn"] for item in first_page["items"]]
+
+        def send():
+            if random.random() < 0.5:
+                return client.get("/api/patients", params={"page": random.randint(1, 20)})
+            return client.get(f"/api/patients/{random.choice(seqns)}")
+
+        return await run_load(send, concurrency, duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = {}
+    for async_db in (False, True):
+        port = free_port()
+        proc = start_server(async_db, port)
+        try:
+            mode = "async" if async_db else "sync"
+            results[mode] = asyncio.run(
+                measure(f"http://127.0.0.1:{port}", args.concurrency, args.duration)
+            )
+            results[mode]["db_wait"] = "event loop" if async_db else "threadpool"
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(json.dumps({"concurrency": args.concurrency, "duration_s": args.duration, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Server and load helpers shared by the HTTP benchmarks.
+
+Imported by bench/http_load.py and bench/async_vs_sync.py, which are run as
+scripts from ehr-cds-api/ and so find this module next to them.
+"""
+import asyncio
+import os
+import socket
+import statistics
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 600):
+    """Wait until the server is listening, seeding has finished and data routes accept requests."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/api/ready")
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+            continue
+        if response.status_code == 200:
+            return
+        if response.json().get("status") == "failed":
+            raise RuntimeError(f"seeding failed: {response.json()}")
+        await asyncio.sleep(0.2)
+    raise RuntimeError("database did not become ready")
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": errors}
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+async def run_load(
+    send: Callable[[], Awaitable[httpx.Response]],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    expected_status: int = 200,
+    exhausted: Optional[Callable[[], bool]] = None,
+) -> dict:
+    """
+    Call ``send`` from ``concurrency`` workers for ``warmup`` + ``duration``
+    seconds and summarize the recorded latencies; warmup requests aren't
+    recorded. A worker also stops once ``exhausted()`` returns True.
+    """
+    latencies = []
+    errors = 0
+    record_from = time.monotonic() + warmup
+    stop_at = record_from + duration
+
+    async def worker():
+        nonlocal errors
+        while time.monotonic() < stop_at:
+            if exhausted is not None and exhausted():
+                return
+            started = time.perf_counter()
+            response = await send()
+            latency = time.perf_counter() - started
+            if time.monotonic() >= record_from:
+                latencies.append(latency)
+                if response.status_code != expected_status:
+                    errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = min(time.monotonic(), stop_at) - record_from
+    return summarize(latencies, errors, max(elapsed, 1e-9))
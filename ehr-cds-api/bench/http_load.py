@@ -0,0 +1,246 @@
+"""
+HTTP load benchmark for the patient API.
+
+Runs the app under uvicorn on a thread of this process, against a copy of a
+seeded SQLite file so write scenarios never touch the original, and drives
+each scenario with an async httpx load generator at a fixed concurrency.
+Prints one JSON document with throughput and latency percentiles per
+scenario, plus the commit and settings it ran with, so runs can be diffed.
+
+Usage (from ehr-cds-api/):
+    python bench/http_load.py --db ehr_cds.db --concurrency 32 --duration 10
+    python bench/http_load.py --db ehr_cds.db --scenarios list,detail --output before.json
+
+A database file that doesn't exist yet is seeded from CSV_DATA_PATH first.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from harness import API_DIR, free_port, run_load, wait_ready
+
+
+class Context:
+    """State shared by the scenarios of one run."""
+
+    def __init__(self, seqns: list[int], rng: random.Random):
+        self.seqns = seqns
+        self.rng = rng
+        self.created: list[int] = []
+
+    def seqn(self) -> int:
+        return self.rng.choice(self.seqns)
+
+    def page(self) -> int:
+        return self.rng.randint(1, 20)
+
+
+def list_scenario(**filters):
+    async def run(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+        return await client.get("/api/patients", params={"page": ctx.page(), **filters})
+    return run
+
+
+async def list_cursor(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/patients", params={"after_seqn": ctx.seqn(), "include_total": "false"})
+
+
+async def detail(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get(f"/api/patients/{ctx.seqn()}")
+
+
+async def medications(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get(f"/api/patients/{ctx.seqn()}/medications")
+
+
+async def create(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    response = await client.post("/api/patients", json={
+        "gender": ctx.rng.choice(["male", "female"]),
+        "age": ctx.rng.randint(18, 90),
+        "blood_pressure_systolic": ctx.rng.randint(95, 180),
+        "blood_pressure_diastolic": ctx.rng.randint(55, 110),
+        "hba1c": round(ctx.rng.uniform(4.5, 10.0), 1),
+        "creatinine": round(ctx.rng.uniform(0.5, 2.0), 2),
+    })
+    if response.status_code == 201:
+        ctx.created.append(response.json()["seqn"])
+    return response
+
+
+async def update(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.put(f"/api/patients/{ctx.seqn()}", json={
+        "blood_pressure_systolic": ctx.rng.randint(95, 180),
+        "hba1c": round(ctx.rng.uniform(4.5, 10.0), 1),
+    })
+
+
+async def delete(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    # Deletes the patients the create scenario added; see run_scenario
+    return await client.delete(f"/api/patients/{ctx.created.pop()}")
+
+
+SCENARIOS = {
+    "list": list_scenario(),
+    "list_gender": list_scenario(gender="female"),
+    "list_age": list_scenario(min_age=40, max_age=65),
+    "list_risk_level": list_scenario(risk_level="high"),
+    "list_status": list_scenario(status="critical"),
+    "list_on_antihypertensive": list_scenario(on_antihypertensive="true"),
+    "list_on_diabetic": list_scenario(on_diabetic="true"),
+    "list_on_renal": list_scenario(on_renal="true"),
+    "list_cursor": list_cursor,
+    "detail": detail,
+    "medications": medications,
+    "create": create,
+    "update": update,
+    "delete": delete,
+}
+
+EXPECTED_STATUS = {"create": 201, "delete": 204}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def copy_database(source: str, target: str):
+    """Copy through SQLite's backup API so pages still in the WAL are included."""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def seed_database(path: str):
+    """Seed a new database file once, so later runs can reuse it."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.abspath(path)}")
+    subprocess.run([sys.executable, "seed_db.py"], cwd=API_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def start_app(port: int):
+    """Serve ``main:app`` on a daemon thread; returns the uvicorn server."""
+    import uvicorn
+
+    sys.path.insert(0, API_DIR)
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="bench-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, name: str, ctx: Context, concurrency: int, duration: float, warmup: float
+) -> dict:
+    """Drive one scenario from ``concurrency`` workers; warmup requests aren't recorded."""
+    scenario = SCENARIOS[name]
+    return await run_load(
+        lambda: scenario(client, ctx),
+        concurrency,
+        duration,
+        warmup,
+        expected_status=EXPECTED_STATUS.get(name, 200),
+        # delete can only remove what create added
+        exhausted=(lambda: not ctx.created) if name == "delete" else None,
+    )
+
+
+async def run(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await wait_ready(client)
+        export = await client.get("/api/patients/export", params={"format": "csv", "columns": "seqn"})
+        seqns = [int(line) for line in export.text.splitlines()[1:]]
+        ctx = Context(seqns, random.Random(args.seed))
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, name, ctx, args.concurrency, args.duration, args.warmup)
+            print(f"  {name}: {results[name]}", file=sys.stderr)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=os.path.join(API_DIR, "ehr_cds.db"), help="Seeded SQLite file")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Recorded seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unrecorded seconds per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated, run in order")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        if not os.path.exists(args.db):
+            print(f"Seeding {args.db}...", file=sys.stderr)
+            seed_database(args.db)
+        copy_database(args.db, db_path)
+        # Settings are read when the app is imported, so configure it first
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+        # The app logs with print(); keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            port = free_port()
+            server, thread = start_app(port)
+            try:
+                results = asyncio.run(run(f"http://127.0.0.1:{port}", args))
+            finally:
+                server.should_exit = True
+                thread.join()
+
+        from config import get_settings
+        settings = get_settings()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "database": os.path.abspath(args.db),
+        "settings": {"async_db": settings.async_db, "fast_json": settings.fast_json},
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Latency and memory per page of the patient list query.
+
+Compares loading a page as ORM entities with joinedload (Demographic plus
+full Examination, Labs and Questionnaire rows) against the projected Core
+select the list endpoint uses, including the per-page scoring both feed.
+
+Usage (from ehr-cds-api/, against a seeded database):
+    python bench/list_query.py --page-size 100 --pages 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from database import SessionLocal
+from models import Demographic, Examination, Labs, Questionnaire
+from routes.patients import LIST_COLUMNS, patient_list_rows, patient_list_select
+
+
+class Row(tuple):
+    """Tuple with attribute access, standing in for a Core result row."""
+
+    def __new__(cls, values: dict):
+        row = super().__new__(cls, values.values())
+        row.__dict__.update(values)
+        return row
+
+
+# Relationship each list column is reached through from a Demographic
+RELATIONSHIPS = {Demographic: None, Examination: "examination", Labs: "labs", Questionnaire: "questionnaire"}
+
+
+def orm_page(db, offset: int, limit: int) -> list[tuple]:
+    """The previous list query: full entities, flattened into list columns."""
+    demos = db.query(Demographic).options(
+        joinedload(Demographic.examination),
+        joinedload(Demographic.labs),
+        joinedload(Demographic.questionnaire),
+    ).order_by(Demographic.seqn).offset(offset).limit(limit).all()
+    records = []
+    for demo in demos:
+        values = {}
+        for column in LIST_COLUMNS:
+            relationship = RELATIONSHIPS[column.class_]
+            source = demo if relationship is None else getattr(demo, relationship)
+            values[column.key] = getattr(source, column.key) if source is not None else None
+        records.append(Row(values))
+    return patient_list_rows(records)
+
+
+def projected_page(db, offset: int, limit: int) -> list[tuple]:
+    records = db.execute(
+        patient_list_select().order_by(Demographic.seqn).offset(offset).limit(limit)
+    ).all()
+    return patient_list_rows(records)
+
+
+def measure(loader, offsets: list[int], page_size: int) -> dict:
+    """Median/p95 latency and mean peak traced memory per page, on a fresh session each page."""
+    peaks = []
+    for offset in offsets:
+        db = SessionLocal()
+        try:
+            tracemalloc.start()
+            loader(db, offset, page_size)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        finally:
+            db.close()
+    # tracemalloc slows allocation-heavy code, so latency is timed in a separate pass
+    untraced = []
+    for offset in offsets:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            loader(db, offset, page_size)
+            untraced.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    quantiles = statistics.quantiles(untraced, n=20)
+    return {
+        "p50_ms": round(statistics.median(untraced) * 1000, 3),
+        "p95_ms": round(quantiles[18] * 1000, 3),
+        "peak_kib_per_page": round(statistics.mean(peaks) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = db.scalar(select(func.count()).select_from(Demographic))
+        assert orm_page(db, 0, args.page_size) == projected_page(db, 0, args.page_size)
+    finally:
+        db.close()
+    if not total:
+        sys.exit("No patients in the database; seed it first")
+
+    last = max(total - args.page_size, 0)
+    offsets = [last * i // max(args.pages - 1, 1) for i in range(args.pages)]
+    results = {
+        "orm_joinedload": measure(orm_page, offsets, args.page_size),
+        "projected_select": measure(projected_page, offsets, args.page_size),
+    }
+    print(json.dumps({"patients": total, "page_size": args.page_size, "pages": args.pages, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
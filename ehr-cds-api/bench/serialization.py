@@ -0,0 +1,102 @@
+"""
+Per-row cost of encoding patient list and detail payloads.
+
+Loads patients from the configured database once, then times only the
+response encoding for the default pydantic path (model per row, dump,
+re-validation of the page, JSON encoding as FastAPI does it) against the
+msgspec path used with FAST_JSON=true.
+
+Usage (from ehr-cds-api/, against a seeded database):
+    python bench/serialization.py --rows 100 --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from database import SessionLocal
+from fast_json import LIST_ITEM_FIELDS, encode_patient_detail, encode_patient_page
+from models import Demographic
+from routes.patients import patient_detail_options, patient_detail_values, patient_list_rows, patient_list_select
+from schemas import PaginatedResponse, PatientDetail, PatientListItem
+
+
+def pydantic_page(rows: list[tuple]) -> bytes:
+    """What get_patients and FastAPI's response_model handling do per page."""
+    page = PaginatedResponse(
+        items=[PatientListItem(**dict(zip(LIST_ITEM_FIELDS, row))).model_dump() for row in rows],
+        total=len(rows), page=1, page_size=len(rows), pages=1, next_cursor=None,
+    )
+    validated = PaginatedResponse.model_validate(page.model_dump())
+    return json.dumps(
+        jsonable_encoder(validated.model_dump(mode="json")), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def msgspec_page(rows: list[tuple]) -> bytes:
+    return encode_patient_page(rows, len(rows), 1, len(rows), 1, None)
+
+
+def pydantic_details(values: list[dict]) -> list[bytes]:
+    return [PatientDetail(**v).model_dump_json().encode() for v in values]
+
+
+def msgspec_details(values: list[dict]) -> list[bytes]:
+    return [encode_patient_detail(v) for v in values]
+
+
+def per_row_us(func, payload, rows: int, repeat: int) -> float:
+    """Best-of-``repeat`` wall time per row, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+    return round(best / rows * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="Patients per payload")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        records = db.execute(patient_list_select().order_by(Demographic.seqn).limit(args.rows)).all()
+        detail_patients = db.query(Demographic).options(*patient_detail_options()).order_by(
+            Demographic.seqn
+        ).limit(args.rows).all()
+        rows = patient_list_rows(records)
+        values = [patient_detail_values(p) for p in detail_patients]
+    finally:
+        db.close()
+
+    if not rows:
+        sys.exit("No patients in the database; seed it first")
+    assert json.loads(pydantic_page(rows)) == json.loads(msgspec_page(rows))
+    assert pydantic_details(values) == msgspec_details(values)
+
+    results = {}
+    for name, pydantic_func, msgspec_func, payload in [
+        ("list", pydantic_page, msgspec_page, rows),
+        ("detail", pydantic_details, msgspec_details, values),
+    ]:
+        slow = per_row_us(pydantic_func, payload, len(payload), args.repeat)
+        fast = per_row_us(msgspec_func, payload, len(payload), args.repeat)
+        results[name] = {
+            "pydantic_us_per_row": slow,
+            "msgspec_us_per_row": fast,
+            "speedup": round(slow / fast, 1),
+        }
+
+    print(json.dumps({"rows": len(rows), "repeat": args.repeat, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+In-process result caches for derived API payloads.
+
+Caches are keyed by the normalized request parameters and cleared by the
+write endpoints, so readers never see results older than the last commit
+made through this process. Writes made by other processes, such as
+``seed_db.py --sync`` or synthetic.py's database output, only show once
+entries expire (RESULT_CACHE_TTL, DETAIL_CACHE_TTL).
+
+For the same reason, with several worker processes (``WORKERS`` > 1) the
+process-local backends are replaced by ``NullCache`` and every read goes
+to the database, unless a backend shared by all workers is configured.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Union
+
+from config import get_settings
+
+
+class CacheBackend(ABC):
+    """
+    Interface for cache storage; subclasses implement get, set, delete and clear.
+
+    Values handed to a backend are already serialized (bytes or plain data),
+    so a shared store such as Redis can implement the same methods and be
+    registered in ``CACHE_BACKENDS`` to share entries across workers.
+    """
+
+    # Entries live in this process only, invisible to other workers' writes
+    process_local = True
+
+    @abstractmethod
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored under ``key``, or ``default``."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any):
+        """Store ``value`` under ``key``."""
+
+    @abstractmethod
+    def delete(self, key: Hashable):
+        """Drop the entry for ``key``, if any."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry."""
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def get_many_or_compute(
+        self, keys: list[Hashable], compute: Callable[[list[Hashable]], dict]
+    ) -> dict:
+        """
+        Return cached values for ``keys``; ``compute`` is called once with the
+        missing keys and returns a dict of the values it could produce.
+        """
+        missing = object()
+        values = {}
+        misses = []
+        for key in keys:
+            value = self.get(key, missing)
+            if value is missing:
+                misses.append(key)
+            else:
+                values[key] = value
+        if misses:
+            computed = compute(misses)
+            for key, value in computed.items():
+                self.set(key, value)
+            values.update(computed)
+        return values
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """``get_or_compute`` for a coroutine function ``compute``."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    async def get_many_or_compute_async(
+        self, keys: list[Hashable], compute: Callable[[list[Hashable]], Awaitable[dict]]
+    ) -> dict:
+        """``get_many_or_compute`` for a coroutine function ``compute``."""
+        missing = object()
+        values = {}
+        misses = []
+        for key in keys:
+            value = self.get(key, missing)
+            if value is missing:
+                misses.append(key)
+            else:
+                values[key] = value
+        if misses:
+            computed = await compute(misses)
+            for key, value in computed.items():
+                self.set(key, value)
+            values.update(computed)
+        return values
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ResultCache(CacheBackend):
+    """Thread-safe in-memory LRU cache with an optional per-entry TTL."""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on invalidation so in-flight computations aren't stored
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store ``value`` under ``key``, evicting the least recently used entry."""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        """Store an entry; the caller must hold the lock."""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store_current(self, generation: int, values: dict):
+        """Store computed values unless the cache was invalidated since ``generation``."""
+        with self._lock:
+            if generation == self._generation:
+                for key, value in values.items():
+                    self._store(key, value)
+
+    def _lookup(self, keys: list[Hashable]) -> tuple[dict, list[Hashable]]:
+        """Cached values of ``keys``, and the keys that missed."""
+        missing = object()
+        values = {}
+        misses = []
+        for key in keys:
+            value = self.get(key, missing)
+            if value is missing:
+                misses.append(key)
+            else:
+                values[key] = value
+        return values, misses
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            generation = self._generation
+            value = compute()
+            self._store_current(generation, {key: value})
+        return value
+
+    def get_many_or_compute(
+        self, keys: list[Hashable], compute: Callable[[list[Hashable]], dict]
+    ) -> dict:
+        """Batch ``get_or_compute``; computed values are dropped if invalidated meanwhile."""
+        values, misses = self._lookup(keys)
+        if misses:
+            generation = self._generation
+            computed = compute(misses)
+            self._store_current(generation, computed)
+            values.update(computed)
+        return values
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """``get_or_compute`` for a coroutine function ``compute``."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            generation = self._generation
+            value = await compute()
+            self._store_current(generation, {key: value})
+        return value
+
+    async def get_many_or_compute_async(
+        self, keys: list[Hashable], compute: Callable[[list[Hashable]], Awaitable[dict]]
+    ) -> dict:
+        """``get_many_or_compute`` for a coroutine function ``compute``."""
+        values, misses = self._lookup(keys)
+        if misses:
+            generation = self._generation
+            computed = await compute(misses)
+            self._store_current(generation, computed)
+            values.update(computed)
+        return values
+
+    def delete(self, key: Hashable):
+        """Drop one entry."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+            self._generation += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        """Counters and current size."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class NullCache(CacheBackend):
+    """Stores nothing, so every lookup is computed from the database."""
+
+    process_local = False
+
+    def __init__(self, maxsize: int = 0, ttl: Optional[float] = None):
+        pass
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        pass
+
+    def delete(self, key: Hashable):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"disabled": True}
+
+
+CACHE_BACKENDS = {
+    "memory": ResultCache,
+    "none": NullCache,
+}
+
+
+def cache_backend_class(name: str) -> type[CacheBackend]:
+    """Look up a registered cache backend by name."""
+    try:
+        return CACHE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache backend: {name!r}")
+
+
+def make_cache_backend(name: str, maxsize: int, ttl: Optional[float], workers: int = 1) -> CacheBackend:
+    """
+    Instantiate a registered cache backend by name.
+
+    With more than one worker a process-local backend becomes a ``NullCache``:
+    the other workers would keep serving entries a write had invalidated.
+    """
+    backend = cache_backend_class(name)
+    if workers > 1 and backend.process_local:
+        return NullCache()
+    return backend(maxsize=maxsize, ttl=ttl)
+
+
+settings = get_settings()
+
+# Cohort statistics keyed by filter set; cleared on any patient write, expire after RESULT_CACHE_TTL
+cohort_stats_cache = make_cache_backend(
+    settings.result_cache_backend, maxsize=256, ttl=settings.result_cache_ttl, workers=settings.workers
+)
+
+# Patient list totals keyed by filter signature; cleared on any patient write, expire after RESULT_CACHE_TTL
+patient_count_cache = make_cache_backend(
+    settings.result_cache_backend, maxsize=512, ttl=settings.result_cache_ttl, workers=settings.workers
+)
+
+# Serialized PatientDetail JSON keyed by SEQN; evicted when that patient changes
+patient_detail_cache = make_cache_backend(
+    settings.detail_cache_backend,
+    maxsize=settings.detail_cache_size,
+    ttl=settings.detail_cache_ttl,
+    workers=settings.workers,
+)
+
+
+def invalidate_patient_caches(seqn: Union[int, Iterable[int], None] = None):
+    """
+    Invalidate caches that depend on patient data after a write.
+
+    Pass the SEQN (or SEQNs) of the changed patients to evict just their
+    detail entries; without one every cached detail is dropped.
+    """
+    cohort_stats_cache.clear()
+    patient_count_cache.clear()
+    if seqn is None:
+        patient_detail_cache.clear()
+    elif isinstance(seqn, int):
+        patient_detail_cache.delete(seqn)
+    else:
+        for key in seqn:
+            patient_detail_cache.delete(key)
+
+
+def cache_stats() -> dict:
+    """Counters for every cache, keyed by cache name."""
+    return {
+        "cohort_stats": cohort_stats_cache.stats(),
+        "patient_count": patient_count_cache.stats(),
+        "patient_detail": patient_detail_cache.stats(),
+    }
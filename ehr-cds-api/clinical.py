@@ -0,0 +1,245 @@
+"""
+Clinical scoring helpers shared by the API routes and the seeding scripts.
+"""
+from typing import Optional
+
+import numpy as np
+
+
+def decode_gender(code: Optional[int]) -> str:
+    """Convert NHANES gender code to string."""
+    if code == 1:
+        return "male"
+    elif code == 2:
+        return "female"
+    return "other"
+
+
+def calculate_egfr(creatinine: Optional[float], age: int, gender: str) -> Optional[float]:
+    """Calculate eGFR using CKD-EPI equation (simplified)."""
+    if creatinine is None or creatinine <= 0:
+        return None
+    
+    # Simplified CKD-EPI formula
+    if gender == "female":
+        if creatinine <= 0.7:
+            egfr = 144 * (creatinine / 0.7) ** -0.329 * 0.993 ** age
+        else:
+            egfr = 144 * (creatinine / 0.7) ** -1.209 * 0.993 ** age
+    else:
+        if creatinine <= 0.9:
+            egfr = 141 * (creatinine / 0.9) ** -0.411 * 0.993 ** age
+        else:
+            egfr = 141 * (creatinine / 0.9) ** -1.209 * 0.993 ** age
+    
+    return round(egfr, 1)
+
+
+def calculate_risk_score(
+    hba1c: Optional[float],
+    systolic_bp: Optional[int],
+    egfr: Optional[float],
+    diabetes: bool,
+    hypertension: bool
+) -> int:
+    """Calculate the additive clinical risk score used for risk stratification."""
+    risk_score = 0
+    
+    # HbA1c risk
+    if hba1c is not None:
+        if hba1c >= 9.0:
+            risk_score += 3
+        elif hba1c >= 7.0:
+            risk_score += 2
+        elif hba1c >= 6.5:
+            risk_score += 1
+    
+    # Blood pressure risk
+    if systolic_bp is not None:
+        if systolic_bp >= 180:
+            risk_score += 3
+        elif systolic_bp >= 140:
+            risk_score += 2
+        elif systolic_bp >= 130:
+            risk_score += 1
+    
+    # Kidney function risk
+    if egfr is not None:
+        if egfr < 30:
+            risk_score += 3
+        elif egfr < 60:
+            risk_score += 2
+        elif egfr < 90:
+            risk_score += 1
+    
+    # History factors
+    if diabetes:
+        risk_score += 1
+    if hypertension:
+        risk_score += 1
+    
+    return risk_score
+
+
+def risk_level_for_score(risk_score: int) -> str:
+    """Map a risk score onto its risk level."""
+    if risk_score >= 5:
+        return "high"
+    elif risk_score >= 2:
+        return "moderate"
+    return "low"
+
+
+def calculate_risk_level(
+    hba1c: Optional[float],
+    systolic_bp: Optional[int],
+    egfr: Optional[float],
+    diabetes: bool,
+    hypertension: bool
+) -> str:
+    """Calculate patient risk level based on clinical markers."""
+    return risk_level_for_score(
+        calculate_risk_score(hba1c, systolic_bp, egfr, diabetes, hypertension)
+    )
+
+
+def status_for_risk_level(risk_level: str) -> str:
+    """Determine patient status from risk level."""
+    return "critical" if risk_level == "high" else "active"
+
+
+def average_bp_readings(*readings) -> Optional[int]:
+    """Calculate average of available BP readings."""
+    valid = [r for r in readings if r is not None]
+    if not valid:
+        return None
+    return round(sum(valid) / len(valid))
+
+
+# ============ Batch Scoring ============
+
+def _as_float_array(values) -> np.ndarray:
+    """Convert a column (possibly containing None) into a float array with NaN."""
+    return np.asarray(values, dtype=np.float64)
+
+
+def _near_half(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Mask of finite elements within 1e-6 of a half-way point at ``ndigits``."""
+    with np.errstate(invalid="ignore"):
+        scaled = values * 10.0 ** ndigits
+        return (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) & np.isfinite(values)
+
+
+def _round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Round like the builtin ``round`` so batch results match the scalar path.
+
+    ``np.round`` scales by 10**ndigits before rounding, which can disagree with
+    Python's correctly-rounded result right at a half-way point; those few
+    elements are re-rounded with the builtin.
+    """
+    rounded = np.round(values, ndigits)
+    for i in np.flatnonzero(_near_half(values, ndigits)):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def average_bp_batch(*readings) -> np.ndarray:
+    """Vectorized ``average_bp_readings``; NaN where no reading is available."""
+    stacked = np.vstack([_as_float_array(r) for r in readings])
+    counts = np.sum(~np.isnan(stacked), axis=0)
+    totals = np.nansum(stacked, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.where(counts > 0, totals / counts, np.nan)
+    return _round_like_python(averages, 0)
+
+
+def calculate_egfr_batch(creatinine, age, gender_code) -> np.ndarray:
+    """Vectorized ``calculate_egfr`` keyed on the NHANES gender code (2 = female)."""
+    creatinine = _as_float_array(creatinine)
+    age = np.nan_to_num(_as_float_array(age), nan=0.0)
+    female = _as_float_array(gender_code) == 2
+
+    valid = creatinine > 0
+    kappa = np.where(female, 0.7, 0.9)
+    scale = np.where(female, 144.0, 141.0)
+    low_exponent = np.where(female, -0.329, -0.411)
+    exponent = np.where(creatinine <= kappa, low_exponent, -1.209)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        egfr = scale * (creatinine / kappa) ** exponent * 0.993 ** age
+    rounded = np.round(egfr, 1)
+
+    # numpy's pow can differ from libm's by an ulp, enough to flip a value
+    # sitting on a tie; recompute those few with the scalar formula
+    for i in np.flatnonzero(_near_half(egfr, 1) & valid):
+        rounded[i] = calculate_egfr(float(creatinine[i]), float(age[i]), "female" if female[i] else "male")
+    return np.where(valid, rounded, np.nan)
+
+
+def calculate_risk_score_batch(hba1c, systolic_bp, egfr, diabetes, hypertension) -> np.ndarray:
+    """Vectorized ``calculate_risk_score``; NaN markers contribute nothing."""
+    hba1c = _as_float_array(hba1c)
+    systolic_bp = _as_float_array(systolic_bp)
+    egfr = _as_float_array(egfr)
+
+    with np.errstate(invalid="ignore"):
+        score = np.select([hba1c >= 9.0, hba1c >= 7.0, hba1c >= 6.5], [3, 2, 1], 0)
+        score += np.select([systolic_bp >= 180, systolic_bp >= 140, systolic_bp >= 130], [3, 2, 1], 0)
+        score += np.select([egfr < 30, egfr < 60, egfr < 90], [3, 2, 1], 0)
+    score += np.asarray(diabetes, dtype=bool).astype(int)
+    score += np.asarray(hypertension, dtype=bool).astype(int)
+    return score
+
+
+def risk_level_for_score_batch(risk_score: np.ndarray) -> np.ndarray:
+    """Vectorized ``risk_level_for_score``."""
+    return np.select([risk_score >= 5, risk_score >= 2], ["high", "moderate"], "low").astype(object)
+
+
+def score_patients_batch(
+    riagendr,
+    ridageyr,
+    lbxscr,
+    lbxgh,
+    systolic_readings,
+    diastolic_readings,
+    diq010,
+    bpq020,
+) -> dict[str, np.ndarray]:
+    """
+    Score a whole cohort from column arrays.
+
+    Takes the raw NHANES columns (gender code, age, creatinine, HbA1c, the
+    three systolic and three diastolic readings, diabetes and hypertension
+    answers) and returns averaged BP, eGFR, risk score, risk level and status
+    arrays that match the scalar helpers element for element.
+    """
+    systolic = average_bp_batch(*systolic_readings)
+    diastolic = average_bp_batch(*diastolic_readings)
+    egfr = calculate_egfr_batch(lbxscr, ridageyr, riagendr)
+    diabetes = _as_float_array(diq010) == 1
+    hypertension = _as_float_array(bpq020) == 1
+
+    risk_score = calculate_risk_score_batch(lbxgh, systolic, egfr, diabetes, hypertension)
+    risk_level = risk_level_for_score_batch(risk_score)
+    status = np.where(risk_level == "high", "critical", "active").astype(object)
+
+    return {
+        "systolic": systolic,
+        "diastolic": diastolic,
+        "egfr": egfr,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "status": status,
+    }
+
+
+def optional_int(value) -> Optional[int]:
+    """Convert a batch element to ``int``, mapping NaN to None."""
+    return None if np.isnan(value) else int(value)
+
+
+def optional_float(value) -> Optional[float]:
+    """Convert a batch element to ``float``, mapping NaN to None."""
+    return None if np.isnan(value) else float(value)
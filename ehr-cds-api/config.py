@@ -1,13 +1,49 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 import os
 
 
 class Settings(BaseSettings):
     app_name: str = "EHR CDS API"
     database_url: str = "sqlite:///./ehr_cds.db"
+    async_db: bool = False  # Serve patient routes on the aiosqlite AsyncEngine
     csv_data_path: str = os.path.join(os.path.dirname(__file__), "med_data")
+    csv_snapshots: bool = True  # Read NHANES tables from checksum-keyed Parquet snapshots
+    model_dir: str = os.path.join(os.path.dirname(__file__), "ML", "artifacts")
+    preload_models: bool = False  # Load model pipelines at startup instead of on first use
+    prediction_batching: bool = True  # Coalesce concurrent prediction requests into shared batches
+    prediction_max_batch: int = 256  # Rows per coalesced model call
+    prediction_max_wait_ms: float = 5.0  # Longest a request waits for its batch to fill
     cors_origins: list[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
+    seed_chunk_size: int = 5000  # Rows per executemany batch when seeding
+    seed_sync: bool = False  # On startup, apply changed CSVs to an already seeded database
+    seed_lock_file: Optional[str] = None  # Cross-process seed lock; defaults to "<sqlite file>.seed.lock"
+    workers: int = 1  # Worker processes; above 1, process-local caches are disabled (serve.py sets it)
+    import_chunk_size: int = 1000  # Patients per transaction in POST /api/patients/bulk
+    import_max_line_bytes: int = 65536  # Longest NDJSON/CSV line accepted by POST /api/patients/bulk
+    export_batch_size: int = 2000  # Rows fetched and encoded per chunk in /api/patients/export
+    drug_classes_file: Optional[str] = None  # JSON overrides for the treatment drug classes
+    fast_json: bool = False  # Encode patient list/detail responses with msgspec instead of pydantic
+    query_plan_diagnostics: bool = False  # Serve EXPLAIN QUERY PLAN output at /api/patients/plan
+    
+    # Patient detail read-through cache
+    detail_cache_backend: str = "memory"
+    detail_cache_size: int = 2048      # Max cached patients
+    detail_cache_ttl: float = 300.0    # Seconds
+    
+    # Cohort stats and list totals; the TTL bounds how long writes made by
+    # other processes (seed_db.py --sync, synthetic.py) go unnoticed
+    result_cache_backend: str = "memory"
+    result_cache_ttl: float = 60.0  # Seconds
+    
+    # SQLite connection profile, applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size: int = -65536    # Negative values are KiB (64 MiB)
+    sqlite_busy_timeout: int = 5000    # Milliseconds
+    sqlite_writer_pool_size: int = 1
     
     class Config:
         env_file = ".env"
@@ -1,18 +1,109 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import get_settings
+from metrics import instrument_engine
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # SQLite specific
-)
+
+def is_sqlite(database_url: str) -> bool:
+    """Whether the URL points at SQLite."""
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    """Whether the URL points at an on-disk SQLite database."""
+    database = make_url(database_url).database
+    return is_sqlite(database_url) and bool(database) and database != ":memory:"
+
+
+def to_async_url(database_url: str):
+    """Swap a sync SQLite URL onto the aiosqlite driver."""
+    url = make_url(database_url)
+    if url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def apply_sqlite_pragmas(dbapi_connection, readonly: bool):
+    """Apply the configured SQLite connection profile to a new connection."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA cache_size = {settings.sqlite_cache_size}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+    ]
+    if readonly:
+        # journal_mode is persistent in the file, so readers inherit WAL
+        pragmas.append("PRAGMA query_only = ON")
+    elif is_sqlite_file(settings.database_url):
+        pragmas.insert(0, f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def engine_options(database_url: str, readonly: bool, is_async: bool = False) -> dict:
+    """Connection arguments and pool sizing for one engine role."""
+    if not is_sqlite(database_url):
+        return {}
+    options = {"connect_args": {"check_same_thread": False}}  # SQLite specific
+    if is_async and is_sqlite_file(database_url):
+        # aiosqlite defaults to NullPool, which would re-apply pragmas per request
+        options["poolclass"] = AsyncAdaptedQueuePool
+    if is_sqlite_file(database_url) and not readonly:
+        # SQLite has a single writer; queue writers in the pool instead of on SQLITE_BUSY
+        options.update(pool_size=settings.sqlite_writer_pool_size, max_overflow=0)
+    return options
+
+
+def configure_engine(sync_engine, readonly: bool):
+    """Register the SQLite connection profile on an engine."""
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, readonly)
+
+
+# Writer engine: all inserts, updates, deletes and seeding
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, False))
+configure_engine(engine, readonly=False)
+instrument_engine(engine, "writer")
+
+# Reader engine: query_only connections for GET endpoints, never blocked by WAL writers
+read_engine = create_engine(settings.database_url, **engine_options(settings.database_url, True))
+configure_engine(read_engine, readonly=True)
+instrument_engine(read_engine, "reader")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
+async_engine = create_async_engine(
+    to_async_url(settings.database_url), **engine_options(settings.database_url, False, is_async=True)
+)
+configure_engine(async_engine.sync_engine, readonly=False)
+instrument_engine(async_engine.sync_engine, "async_writer")
+
+async_read_engine = create_async_engine(
+    to_async_url(settings.database_url), **engine_options(settings.database_url, True, is_async=True)
+)
+configure_engine(async_read_engine.sync_engine, readonly=True)
+instrument_engine(async_read_engine.sync_engine, "async_reader")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
+
 
 def get_db():
     """Dependency for getting database sessions."""
@@ -21,3 +112,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Dependency for getting read-only database sessions."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency for getting async database sessions."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Dependency for getting read-only async database sessions."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
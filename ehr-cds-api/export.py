@@ -0,0 +1,137 @@
+"""
+Streaming export of patient rows as NDJSON, CSV or Arrow IPC.
+
+Rows are read through a server-side cursor (``yield_per``) and encoded one
+partition at a time, so memory stays flat regardless of how many patients
+match. Every exportable column is addressed by its database column name;
+names are unique across the patient tables.
+"""
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+import pyarrow as pa
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Demographic, Examination, Labs, Diet, Questionnaire, PatientSummary, PatientTreatment
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+# Tables that can contribute columns, in output order
+EXPORT_TABLES = [Demographic, PatientSummary, PatientTreatment, Examination, Labs, Questionnaire, Diet]
+
+EXPORT_COLUMNS = {"seqn": Demographic.seqn}
+for _model in EXPORT_TABLES:
+    for _column in _model.__table__.columns:
+        if _column.name != "seqn":
+            EXPORT_COLUMNS[_column.name] = getattr(_model, _column.key)
+
+# Roughly the fields of the patient list view
+DEFAULT_EXPORT_COLUMNS = [
+    "seqn", "riagendr", "ridageyr", "systolic", "diastolic", "bmxbmi",
+    "lbxgh", "lbxscr", "egfr", "risk_score", "risk_level", "status",
+]
+
+ARROW_TYPES = {int: pa.int64(), float: pa.float64(), str: pa.string(), bool: pa.bool_()}
+
+
+def resolve_export_columns(columns: Optional[str]) -> list[str]:
+    """Parse a comma-separated column list; 'all' selects every column."""
+    if not columns:
+        return list(DEFAULT_EXPORT_COLUMNS)
+    if columns.strip() == "all":
+        return list(EXPORT_COLUMNS)
+    names = list(dict.fromkeys(name.strip().lower() for name in columns.split(",") if name.strip()))
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    if not names:
+        raise ValueError("No export columns given")
+    return names
+
+
+def export_select(names: list[str], seqn_filter=None):
+    """
+    Select the named columns, outer-joining only the tables they come from.
+
+    ``seqn_filter`` is an optional subquery of matching SEQNs built by the
+    list filters, kept separate so its joins don't clash with these.
+    """
+    stmt = select(*(EXPORT_COLUMNS[name] for name in names)).select_from(Demographic)
+    needed = {EXPORT_COLUMNS[name].class_ for name in names}
+    for model in EXPORT_TABLES[1:]:
+        if model in needed:
+            stmt = stmt.outerjoin(model, model.seqn == Demographic.seqn)
+    if seqn_filter is not None:
+        stmt = stmt.where(Demographic.seqn.in_(seqn_filter))
+    return stmt.order_by(Demographic.seqn)
+
+
+def arrow_schema(names: list[str]) -> pa.Schema:
+    return pa.schema([
+        (name, ARROW_TYPES[EXPORT_COLUMNS[name].type.python_type]) for name in names
+    ])
+
+
+def encode_ndjson(names: list[str], partitions) -> Iterator[bytes]:
+    for rows in partitions:
+        yield "".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows).encode()
+
+
+def encode_csv(names: list[str], partitions) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(names)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_arrow(names: list[str], partitions) -> Iterator[bytes]:
+    """One Arrow IPC stream; each cursor partition becomes a record batch."""
+    schema = arrow_schema(names)
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in partitions:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield drain()
+    yield drain()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "arrow": encode_arrow}
+
+
+def stream_export(session_factory, stmt, names: list[str], format: str, batch_size: int) -> Iterator[bytes]:
+    """
+    Run ``stmt`` on a fresh session and yield encoded chunks.
+
+    The session lives as long as the response body is being sent, so it's
+    opened here rather than taken from a request dependency.
+    """
+    db: Session = session_factory()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": batch_size})
+        yield from ENCODERS[format](names, result.partitions())
+    finally:
+        db.close()
@@ -0,0 +1,123 @@
+"""
+msgspec encoders for the patient list and detail payloads.
+
+The default path builds a pydantic model per row, dumps it to a dict and has
+FastAPI validate the page again before encoding it. With ``FAST_JSON=true``
+rows are packed into the msgspec Structs below and encoded straight to bytes.
+The Structs mirror the response schemas field for field, in the same order
+and with the same defaults, so both paths produce identical JSON.
+"""
+from typing import Optional
+
+import msgspec
+
+from schemas import MedicationResponse, PaginatedResponse, PatientDetail, PatientListItem
+
+
+class PatientListRecord(msgspec.Struct):
+    id: str
+    seqn: int
+    gender: str
+    age: int
+    blood_pressure_systolic: Optional[int] = None
+    blood_pressure_diastolic: Optional[int] = None
+    bmi: Optional[float] = None
+    hba1c: Optional[float] = None
+    risk_level: str = "low"
+    status: str = "active"
+
+
+class PatientPage(msgspec.Struct, kw_only=True):
+    items: list[PatientListRecord]
+    total: Optional[int] = None
+    page: int
+    page_size: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class MedicationRecord(msgspec.Struct, kw_only=True):
+    rxduse: Optional[int] = None
+    rxddrug: Optional[str] = None
+    rxddrgid: Optional[str] = None
+    rxddays: Optional[int] = None
+    rxdrsc1: Optional[str] = None
+    rxdrsd1: Optional[str] = None
+    id: int
+    seqn: int
+
+
+class PatientDetailRecord(msgspec.Struct):
+    id: str
+    seqn: int
+    gender: str
+    age: int
+    race_ethnicity: Optional[str] = None
+    education: Optional[str] = None
+    marital_status: Optional[str] = None
+    blood_pressure_systolic: Optional[int] = None
+    blood_pressure_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    weight: Optional[float] = None
+    height: Optional[float] = None
+    bmi: Optional[float] = None
+    waist_circumference: Optional[float] = None
+    hba1c: Optional[float] = None
+    fasting_glucose: Optional[float] = None
+    total_cholesterol: Optional[float] = None
+    ldl_cholesterol: Optional[float] = None
+    hdl_cholesterol: Optional[float] = None
+    triglycerides: Optional[float] = None
+    creatinine: Optional[float] = None
+    egfr: Optional[float] = None
+    albumin: Optional[float] = None
+    smoker: bool = False
+    diabetes_history: bool = False
+    hypertension_history: bool = False
+    heart_disease_history: bool = False
+    kidney_disease_history: bool = False
+    daily_calories: Optional[float] = None
+    daily_sodium: Optional[float] = None
+    medications: list[MedicationRecord] = []
+    risk_level: str = "low"
+    status: str = "active"
+
+
+# A field added to a schema but not here would silently vanish from the fast path
+for _record, _schema in [
+    (PatientListRecord, PatientListItem),
+    (PatientPage, PaginatedResponse),
+    (MedicationRecord, MedicationResponse),
+    (PatientDetailRecord, PatientDetail),
+]:
+    if _record.__struct_fields__ != tuple(_schema.model_fields):
+        raise TypeError(f"{_record.__name__} is out of sync with {_schema.__name__}")
+
+LIST_ITEM_FIELDS = PatientListRecord.__struct_fields__
+
+_encoder = msgspec.json.Encoder()
+
+
+def encode_patient_page(
+    rows: list[tuple],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    pages: Optional[int],
+    next_cursor: Optional[str],
+) -> bytes:
+    """Encode a list page; ``rows`` are tuples in ``LIST_ITEM_FIELDS`` order."""
+    return _encoder.encode(PatientPage(
+        items=[PatientListRecord(*row) for row in rows],
+        total=total,
+        page=page,
+        page_size=page_size,
+        pages=pages,
+        next_cursor=next_cursor,
+    ))
+
+
+def encode_patient_detail(values: dict) -> bytes:
+    """Encode the keyword values of a PatientDetail."""
+    medications = [MedicationRecord(**med) for med in values["medications"]]
+    return _encoder.encode(PatientDetailRecord(**{**values, "medications": medications}))
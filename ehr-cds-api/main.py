@@ -1,22 +1,41 @@
-from fastapi import FastAPI
+from startup import STARTED_AT  # First, so the startup time includes loading the modules below
+
+import math
+import os
+import time
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from cache import cache_stats
 from config import get_settings
 from database import engine, Base
+from metrics import DB_TIME_HEADER, QUERY_COUNT_HEADER, MetricsMiddleware, metrics
+from routes.cohorts import router as cohorts_router
+from routes.medications import router as medications_router
 from routes.patients import router as patients_router
-from seed_db import init_db
+from routes.patients_async import router as patients_async_router
+from routes.predictions import router as predictions_router
+from seed_db import seed_progress, start_background_seed
+from serving import registry as model_registry, batcher as prediction_batcher
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Start seeding the database in the background on startup."""
     print("Starting EHR CDS API...")
-    init_db()
+    start_background_seed()
+    if settings.preload_models:
+        model_registry.load_all()
+    print(f"[worker {os.getpid()}] Started in {time.perf_counter() - STARTED_AT:.2f}s")
     yield
     print("Shutting down EHR CDS API...")
+    if prediction_batcher is not None:
+        prediction_batcher.stop()
 
 
 app = FastAPI(
@@ -33,10 +52,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[QUERY_COUNT_HEADER, DB_TIME_HEADER],
 )
 
+# Per-route latency and DB query metrics, published on /api/metrics
+app.add_middleware(MetricsMiddleware)
+
+
+def retry_after_seconds() -> int:
+    """Seconds a client should wait before retrying while the database seeds."""
+    eta = seed_progress.eta_seconds()
+    return max(1, math.ceil(eta)) if eta is not None else 5
+
+
+def require_ready():
+    """Reject data requests with 503 until seeding has finished."""
+    if not seed_progress.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Database is {seed_progress.state}",
+            headers={"Retry-After": str(retry_after_seconds())},
+        )
+
+
 # Include routers
-app.include_router(patients_router, prefix="/api")
+data_dependencies = [Depends(require_ready)]
+app.include_router(
+    patients_async_router if settings.async_db else patients_router,
+    prefix="/api",
+    dependencies=data_dependencies,
+)
+app.include_router(cohorts_router, prefix="/api", dependencies=data_dependencies)
+app.include_router(medications_router, prefix="/api", dependencies=data_dependencies)
+app.include_router(predictions_router, prefix="/api", dependencies=data_dependencies)
 
 
 @app.get("/")
@@ -51,8 +99,26 @@ def root():
 
 @app.get("/api/health")
 def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Liveness check; stays healthy while the database seeds in the background."""
+    return {"status": "healthy", "seeding": seed_progress.snapshot(), "caches": cache_stats()}
+
+
+@app.get("/api/ready")
+def readiness_check():
+    """Readiness check; 503 until the database has been seeded."""
+    if not seed_progress.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": seed_progress.state, "seeding": seed_progress.snapshot()},
+            headers={"Retry-After": str(retry_after_seconds())},
+        )
+    return {"status": "ready"}
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Request latency histograms and DB query counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
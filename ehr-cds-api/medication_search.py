@@ -0,0 +1,213 @@
+"""
+Full-text search over medication names, conditions and ICD-10 codes.
+
+On SQLite the ``medications`` table is indexed by an external-content FTS5
+table kept in sync by triggers, so term and prefix lookups use the inverted
+index instead of scanning every row. Other databases fall back to LIKE.
+"""
+import re
+from dataclasses import dataclass, field as dataclass_field
+
+from sqlalchemy import Connection, column, func, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from models import Medication
+
+FTS_TABLE = "medications_fts"
+FTS_COLUMNS = ["rxddrug", "rxdrsd1", "rxdrsd2", "rxdrsd3", "rxdrsc1", "rxdrsc2", "rxdrsc3"]
+
+# Column groups a search can be restricted to
+SEARCH_FIELDS = {
+    "all": FTS_COLUMNS,
+    "drug": ["rxddrug"],
+    "condition": ["rxdrsd1", "rxdrsd2", "rxdrsd3"],
+    "code": ["rxdrsc1", "rxdrsc2", "rxdrsc3"],
+}
+
+SEARCH_MODES = ("prefix", "phrase")
+
+# '.' is a token character so ICD-10 codes like E11.9 stay one token
+FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        seqn UNINDEXED, {", ".join(FTS_COLUMNS)},
+        content='medications', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2 tokenchars '.'"
+    )
+    """,
+    f"""
+    CREATE TRIGGER medications_fts_insert AFTER INSERT ON medications BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, seqn, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, new.seqn, {", ".join(f"new.{c}" for c in FTS_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER medications_fts_delete AFTER DELETE ON medications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, seqn, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, old.seqn, {", ".join(f"old.{c}" for c in FTS_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER medications_fts_update AFTER UPDATE ON medications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, seqn, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, old.seqn, {", ".join(f"old.{c}" for c in FTS_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, seqn, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, new.seqn, {", ".join(f"new.{c}" for c in FTS_COLUMNS)});
+    END
+    """,
+]
+
+FTS_OBJECTS = [FTS_TABLE, "medications_fts_insert", "medications_fts_delete", "medications_fts_update"]
+
+# Databases (by URL) whose index this process has seen complete; searches
+# skip the sqlite_master lookup for them
+_fts_ready_urls: set[str] = set()
+
+
+@dataclass
+class SearchPage:
+    terms: list[str]  # Search terms as matched, after tokenizing
+    total_patients: int = 0
+    total_matches: int = 0
+    items: list[tuple[int, int]] = dataclass_field(default_factory=list)  # (seqn, matching rows)
+
+
+def fts_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def fts_ready(conn: Connection) -> bool:
+    """True if the FTS table and all of its sync triggers exist."""
+    if not fts_supported(conn):
+        return False
+    names = set(conn.scalars(
+        text("SELECT name FROM sqlite_master WHERE name IN ({})".format(
+            ", ".join(f"'{name}'" for name in FTS_OBJECTS)
+        ))
+    ))
+    return names == set(FTS_OBJECTS)
+
+
+def fts_available(conn: Connection) -> bool:
+    """``fts_ready``, remembered per database once the index exists."""
+    url = str(conn.engine.url)
+    if url in _fts_ready_urls:
+        return True
+    if fts_ready(conn):
+        _fts_ready_urls.add(url)
+        return True
+    return False
+
+
+def drop_medication_search(conn: Connection):
+    """Drop the FTS table and its triggers; the caller commits."""
+    if not fts_supported(conn):
+        return
+    _fts_ready_urls.clear()
+    for trigger in FTS_OBJECTS[1:]:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def ensure_medication_search(conn: Connection) -> bool:
+    """
+    Create and populate the FTS index if it is missing or incomplete.
+
+    Runs on the caller's connection, which must commit. Returns True if the
+    index was (re)built. Creating it after bulk seeding and rebuilding once
+    is much faster than indexing row by row via triggers.
+    """
+    if not fts_supported(conn) or fts_ready(conn):
+        return False
+    drop_medication_search(conn)
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def query_words(term: str) -> list[str]:
+    """Split user input into tokens the FTS tokenizer would produce."""
+    return re.findall(r"[\w.]+", term)
+
+
+def normalize_terms(terms: list[str]) -> list[str]:
+    """Each term as the space-separated words that are searched; empty terms are dropped."""
+    normalized = [" ".join(words) for words in map(query_words, terms) if words]
+    if not normalized:
+        raise ValueError("Search query contains no searchable words")
+    return normalized
+
+
+def build_match_query(terms: list[str], mode: str = "prefix", field: str = "all") -> str:
+    """
+    Build an FTS5 MATCH expression from user search terms.
+
+    Each term becomes a quoted phrase (prefix mode lets its last word match
+    as a prefix); terms are OR'ed together. Quoting every word means user
+    input can't inject FTS5 operators.
+    """
+    phrases = ['"' + term + '"' + ("*" if mode == "prefix" else "") for term in normalize_terms(terms)]
+    expression = " OR ".join(phrases)
+    return "{" + " ".join(SEARCH_FIELDS[field]) + "} : (" + expression + ")"
+
+
+def like_filter(terms: list[str], field: str):
+    """Substring fallback for ``build_match_query`` on databases without FTS5."""
+    return or_(*(
+        getattr(Medication, column).ilike("%" + term + "%")
+        for term in normalize_terms(terms)
+        for column in SEARCH_FIELDS[field]
+    ))
+
+
+def matching_patients(db: Session, seqn, condition, page: SearchPage, limit: int, offset: int) -> SearchPage:
+    """
+    Fill ``page`` with one page of (seqn, matching rows) pairs for rows
+    meeting ``condition``, and the totals over every matching patient.
+
+    The totals are window aggregates over the grouped rows, so the page and
+    the counts come from one query; a page past the end needs a second one.
+    """
+    matches = func.count()
+    rows = db.execute(
+        select(seqn, matches, func.count().over(), func.sum(matches).over())
+        .where(condition, seqn.is_not(None))
+        .group_by(seqn)
+        .order_by(seqn)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    if rows:
+        page.total_patients, page.total_matches = int(rows[0][2]), int(rows[0][3])
+    elif offset:
+        counts = select(matches.label("matches")).where(condition, seqn.is_not(None)).group_by(seqn).subquery()
+        page.total_patients, page.total_matches = db.execute(
+            select(func.count(), func.coalesce(func.sum(counts.c.matches), 0))
+        ).one()
+    page.items = [(int(row[0]), int(row[1])) for row in rows]
+    return page
+
+
+def search_medications(
+    db: Session, terms: list[str], mode: str = "prefix", field: str = "all", limit: int = 1000, offset: int = 0
+) -> SearchPage:
+    """
+    Find patients with a medication row matching any of ``terms``.
+
+    Returns the page of patients ordered by SEQN, ``limit`` at ``offset``,
+    with the number of matching rows of each and the totals of the search.
+    """
+    page = SearchPage(terms=normalize_terms(terms))
+    if fts_available(db.connection()):
+        fts = table(FTS_TABLE, column("seqn"))
+        condition = text(f"{FTS_TABLE} MATCH :match").bindparams(match=build_match_query(terms, mode, field))
+        try:
+            return matching_patients(db, fts.c.seqn, condition, page, limit, offset)
+        except OperationalError:
+            # Another process dropped the index (a reseed); look it up again next time
+            _fts_ready_urls.clear()
+            db.rollback()
+
+    return matching_patients(db, Medication.seqn, like_filter(terms, field), page, limit, offset)
@@ -0,0 +1,212 @@
+"""
+Request and database metrics, exported in the Prometheus text format.
+
+``MetricsMiddleware`` times every request into a latency histogram keyed by
+method, route template and status. SQLAlchemy cursor hooks installed by
+``instrument_engine`` count queries and DB time, both per engine and for
+the request the query ran in, which is tracked through a context variable.
+Each response sent in one piece carries that request's query count and DB
+time in headers.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Stats of the request being served; worker threads and greenlets inherit it
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a running sum, as Prometheus expects."""
+
+    def __init__(self, buckets: list[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe store of request latencies and query counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str, str], Histogram] = {}
+        self.route_queries: dict[tuple[str, str], list] = {}  # [queries, db seconds]
+        self.engine_queries: dict[str, list] = {}
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            key = (method, route, str(status))
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            totals = self.route_queries.setdefault((method, route), [0, 0.0])
+            totals[0] += stats.queries
+            totals[1] += stats.db_seconds
+
+    def record_query(self, engine: str, seconds: float):
+        with self._lock:
+            totals = self.engine_queries.setdefault(engine, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route, status), histogram in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{escape(route)}",status="{status}"'
+                for bound, count in zip(histogram.buckets, histogram.cumulative()):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            route_totals = sorted(self.route_queries.items())
+            lines += [
+                "# HELP http_request_db_queries_total Database queries issued while serving each route.",
+                "# TYPE http_request_db_queries_total counter",
+            ]
+            for (method, route), (queries, _) in route_totals:
+                lines.append(f'http_request_db_queries_total{{method="{method}",route="{escape(route)}"}} {queries}')
+            lines += [
+                "# HELP http_request_db_seconds_total Database time spent while serving each route.",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), (_, seconds) in route_totals:
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{escape(route)}"}} {seconds:.6f}')
+
+            engine_totals = sorted(self.engine_queries.items())
+            lines += [
+                "# HELP db_queries_total Queries executed per engine, including background work.",
+                "# TYPE db_queries_total counter",
+            ]
+            for engine, (queries, _) in engine_totals:
+                lines.append(f'db_queries_total{{engine="{engine}"}} {queries}')
+            lines += [
+                "# HELP db_query_seconds_total Time spent executing queries per engine.",
+                "# TYPE db_query_seconds_total counter",
+            ]
+            for engine, (_, seconds) in engine_totals:
+                lines.append(f'db_query_seconds_total{{engine="{engine}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(sync_engine, name: str):
+    """Count queries and their execution time on ``sync_engine``."""
+
+    # The start time lives on the execution context, so a failed statement
+    # (which never reaches after_cursor_execute) leaves nothing behind
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context.metrics_started
+        metrics.record_query(name, seconds)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency per route template.
+
+    Timing stops when the last body chunk is sent, so streamed responses
+    count in full. The DB headers go on responses whose body is sent in one
+    message: the start message is held until the first body message, and a
+    streamed body (``more_body``) runs queries after the headers are out,
+    so its headers are left off rather than undercounting.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        response_start = None
+
+        async def send_with_headers(message):
+            nonlocal status, response_start
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_start = message
+                return
+            if response_start is not None:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    response_start["headers"] = list(response_start.get("headers", [])) + [
+                        (QUERY_COUNT_HEADER.lower().encode(), str(stats.queries).encode()),
+                        (DB_TIME_HEADER.lower().encode(), f"{stats.db_seconds * 1000:.3f}".encode()),
+                    ]
+                await send(response_start)
+                response_start = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            metrics.record_request(
+                scope["method"],
+                getattr(route, "path", "<unmatched>"),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
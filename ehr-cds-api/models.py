@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -6,6 +6,11 @@ from database import Base
 class Demographic(Base):
     """Patient demographic information from NHANES demographic.csv"""
     __tablename__ = "demographics"
+    __table_args__ = (
+        # Patient list filters: gender with an optional age range, or age alone
+        Index("ix_demographics_riagendr_ridageyr", "riagendr", "ridageyr"),
+        Index("ix_demographics_ridageyr", "ridageyr"),
+    )
     
     seqn = Column(Integer, primary_key=True, index=True)
     riagendr = Column(Integer)  # Gender: 1=Male, 2=Female
@@ -25,6 +30,8 @@ class Demographic(Base):
     diet = relationship("Diet", back_populates="demographic", uselist=False)
     questionnaire = relationship("Questionnaire", back_populates="demographic", uselist=False)
     medications = relationship("Medication", back_populates="demographic")
+    summary = relationship("PatientSummary", back_populates="demographic", uselist=False)
+    treatment = relationship("PatientTreatment", back_populates="demographic", uselist=False)
 
 
 class Examination(Base):
@@ -237,3 +244,61 @@ class Medication(Base):
     rxdcount = Column(Integer) # Total medication count for patient
     
     demographic = relationship("Demographic", back_populates="medications")
+
+
+class PatientSummary(Base):
+    """Materialized per-patient risk summary derived from exam, labs and questionnaire data"""
+    __tablename__ = "patient_summary"
+    
+    seqn = Column(Integer, ForeignKey("demographics.seqn"), primary_key=True, index=True)
+    
+    systolic = Column(Integer)     # Average systolic BP over readings 1-3
+    diastolic = Column(Integer)    # Average diastolic BP over readings 1-3
+    egfr = Column(Float)           # Estimated GFR (CKD-EPI, simplified)
+    risk_score = Column(Integer)   # Additive clinical risk score
+    risk_level = Column(String, index=True)  # low / moderate / high
+    status = Column(String, index=True)      # active / critical
+    
+    demographic = relationship("Demographic", back_populates="summary")
+
+
+class PatientTreatment(Base):
+    """Materialized per-patient treatment status derived from current medications"""
+    __tablename__ = "patient_treatment"
+    
+    seqn = Column(Integer, ForeignKey("demographics.seqn"), primary_key=True, index=True)
+    
+    on_antihypertensive = Column(Boolean, index=True)  # Any blood-pressure medication
+    on_diabetic = Column(Boolean, index=True)          # Any diabetes medication
+    on_renal = Column(Boolean, index=True)             # Any renal-management medication
+    antihypertensive_count = Column(Integer)  # Matching medication rows
+    diabetic_count = Column(Integer)
+    renal_count = Column(Integer)
+    
+    demographic = relationship("Demographic", back_populates="treatment")
+
+
+class SeqnSequence(Base):
+    """Single-row counter for allocating new patient SEQNs"""
+    __tablename__ = "seqn_sequence"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    next_seqn = Column(Integer, nullable=False)  # First SEQN not yet handed out
+
+
+class SeedFile(Base):
+    """Checksum of each NHANES CSV as of the last seed or incremental sync"""
+    __tablename__ = "seed_files"
+    
+    filename = Column(String, primary_key=True)
+    sha256 = Column(String, nullable=False)
+    row_count = Column(Integer, nullable=False)
+
+
+class SeedRowHash(Base):
+    """Hash of each CSV row as last loaded, keyed by SEQN (SEQN, drug and occurrence for medications)"""
+    __tablename__ = "seed_row_hashes"
+    
+    table_name = Column(String, primary_key=True)
+    row_key = Column(String, primary_key=True)
+    row_hash = Column(Integer, nullable=False)
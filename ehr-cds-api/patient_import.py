@@ -0,0 +1,255 @@
+"""
+SEQN allocation and bulk creation of patients.
+
+New SEQNs come from a single-row counter advanced with one UPDATE ...
+RETURNING, so concurrent creates and imports always get disjoint blocks.
+The counter never goes below max(demographics.seqn) + 1, which keeps it
+correct after seeding or any insert that bypasses it.
+"""
+import csv
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from cache import invalidate_patient_caches
+from models import Demographic, Examination, Labs, Diet, Questionnaire, SeqnSequence
+from schemas import PatientCreate, BulkImportRowResult, BulkImportResponse
+from summary import refresh_patient_summaries
+from treatment import refresh_patient_treatments
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+# ============ SEQN Allocation ============
+
+def allocate_seqns(db: Session, count: int) -> range:
+    """Reserve ``count`` consecutive SEQNs inside the caller's transaction."""
+    if db.get(SeqnSequence, 1) is None:
+        try:
+            with db.begin_nested():
+                db.add(SeqnSequence(id=1, next_seqn=1))
+        except IntegrityError:
+            pass  # Another writer created the counter first
+    
+    floor = select(func.coalesce(func.max(Demographic.seqn), 0) + 1).scalar_subquery()
+    current = case((SeqnSequence.next_seqn >= floor, SeqnSequence.next_seqn), else_=floor)
+    end = db.execute(
+        update(SeqnSequence)
+        .where(SeqnSequence.id == 1)
+        .values(next_seqn=current + count)
+        .returning(SeqnSequence.next_seqn)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    return range(end - count, end)
+
+
+# ============ Patient Records ============
+
+def patient_records(seqn: int, data: PatientCreate) -> dict:
+    """Column values for each table a new patient writes, keyed by model."""
+    gender_code = 1 if data.gender == "male" else 2 if data.gender == "female" else 3
+    
+    bmi = None
+    if data.weight and data.height:
+        bmi = round(data.weight / ((data.height / 100) ** 2), 1)
+    
+    return {
+        Demographic: {
+            "seqn": seqn,
+            "riagendr": gender_code,
+            "ridageyr": data.age,
+        },
+        Examination: {
+            "seqn": seqn,
+            "bpxsy1": data.blood_pressure_systolic,
+            "bpxdi1": data.blood_pressure_diastolic,
+            "bpxpls": data.heart_rate,
+            "bmxwt": data.weight,
+            "bmxht": data.height,
+            "bmxbmi": bmi,
+        },
+        Labs: {
+            "seqn": seqn,
+            "lbxgh": data.hba1c,
+            "lbxsgl": data.fasting_glucose,
+            "lbxtc": data.total_cholesterol,
+            "lbdldl": data.ldl_cholesterol,
+            "lbdhdd": data.hdl_cholesterol,
+            "lbxtr": data.triglycerides,
+            "lbxscr": data.creatinine,
+            "lbxsal": data.albumin,
+        },
+        Questionnaire: {
+            "seqn": seqn,
+            "smq020": 1 if data.smoker else 2,
+            "diq010": 1 if data.diabetes_history else 2,
+            "bpq020": 1 if data.hypertension_history else 2,
+        },
+        Diet: {"seqn": seqn},  # Empty diet record
+    }
+
+
+def import_patients(db: Session, patients: list[PatientCreate]) -> list[int]:
+    """
+    Create patients in one transaction and return their SEQNs in input order.
+    
+    Rows are written with one executemany per table and the derived tables
+    are refreshed for the whole block; nothing is re-read afterwards.
+    """
+    if not patients:
+        return []
+    try:
+        seqns = list(allocate_seqns(db, len(patients)))
+        
+        rows: dict = {}
+        for seqn, data in zip(seqns, patients):
+            for model, values in patient_records(seqn, data).items():
+                rows.setdefault(model, []).append(values)
+        for model in (Demographic, Examination, Labs, Questionnaire, Diet):
+            db.execute(insert(model.__table__), rows[model])
+        
+        refresh_patient_summaries(db, seqns)
+        refresh_patient_treatments(db, seqns)
+        db.commit()
+    except Exception:
+        # Callers may reuse the session for the next chunk; don't let it commit these writes
+        db.rollback()
+        raise
+    invalidate_patient_caches(seqns)
+    return seqns
+
+
+# ============ Streaming Import ============
+
+def resolve_import_format(format: Optional[str], content_type: Optional[str]) -> str:
+    """Pick the import format from an explicit ``format`` or the Content-Type."""
+    if format:
+        if format not in IMPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+        return format
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines as chunks arrive.
+    
+    Lines are left undecoded so that invalid UTF-8 fails only its own row.
+    A line longer than ``max_line_bytes`` is dropped as it streams in, so
+    the buffer stays bounded, and yielded as None.
+    """
+    buffer = b""
+    overlong = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.rstrip(b"\r")
+            yield None if overlong or len(line) > max_line_bytes else line
+            overlong = False
+        if len(buffer) > max_line_bytes:
+            buffer = b""
+            overlong = True
+    if overlong:
+        yield None
+    elif buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def parse_csv_line(line: str) -> list[str]:
+    return next(csv.reader([line]))
+
+
+def validation_messages(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    ]
+
+
+async def bulk_import(
+    chunks: AsyncIterator[bytes],
+    format: str,
+    chunk_size: int,
+    max_line_bytes: int,
+    flush: Callable[[list[PatientCreate]], Awaitable[list[int]]],
+) -> BulkImportResponse:
+    """
+    Validate records from an NDJSON or CSV stream and create them in chunks.
+    
+    ``flush`` receives up to ``chunk_size`` valid patients at a time and
+    returns their SEQNs; each call is its own transaction, so a failing
+    chunk doesn't undo earlier ones. CSV input is one record per line with
+    a header row of PatientCreate field names. Lines longer than
+    ``max_line_bytes`` fail their row; a CSV header that long raises
+    ValueError.
+    """
+    results: list[BulkImportRowResult] = []
+    pending: list[tuple[int, PatientCreate]] = []
+    header: Optional[list[str]] = None
+    
+    async def flush_pending():
+        batch = [patient for _, patient in pending]
+        try:
+            seqns = await flush(batch)
+        except Exception as e:
+            results.extend(
+                BulkImportRowResult(row=row, status="error", errors=[f"Chunk failed: {e}"])
+                for row, _ in pending
+            )
+        else:
+            results.extend(
+                BulkImportRowResult(row=row, status="created", seqn=seqn)
+                for (row, _), seqn in zip(pending, seqns)
+            )
+        pending.clear()
+    
+    row = 0
+    async for raw in iter_lines(chunks, max_line_bytes):
+        if raw is None and format == "csv" and header is None:
+            raise ValueError(f"CSV header is longer than {max_line_bytes} bytes")
+        if raw is None:
+            row += 1
+            results.append(BulkImportRowResult(
+                row=row, status="error", errors=[f"Line is longer than {max_line_bytes} bytes"]
+            ))
+            continue
+        if not raw.strip():
+            continue
+        if format == "csv" and header is None:
+            header = [name.strip() for name in parse_csv_line(raw.decode("utf-8", errors="replace"))]
+            continue
+        
+        row += 1
+        try:
+            try:
+                line = raw.decode("utf-8")
+            except UnicodeDecodeError as e:
+                raise ValueError(f"Invalid UTF-8 at byte {e.start}") from e
+            if format == "csv":
+                record = {k: v for k, v in zip(header, parse_csv_line(line)) if v != ""}
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Each line must be a JSON object")
+            pending.append((row, PatientCreate.model_validate(record)))
+        except ValidationError as e:
+            results.append(BulkImportRowResult(row=row, status="error", errors=validation_messages(e)))
+        except ValueError as e:
+            results.append(BulkImportRowResult(row=row, status="error", errors=[str(e)]))
+        
+        if len(pending) >= chunk_size:
+            await flush_pending()
+    
+    if pending:
+        await flush_pending()
+    
+    results.sort(key=lambda r: r.row)
+    created = sum(1 for r in results if r.status == "created")
+    return BulkImportResponse(created=created, failed=len(results) - created, results=results)
@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, literal, select
+from typing import Optional
+import numpy as np
+
+from cache import cohort_stats_cache
+from clinical import decode_gender
+from database import get_read_db
+from models import Demographic, Examination, Labs, Questionnaire, PatientSummary
+from routes.patients import apply_patient_filters, patient_filter_key
+from schemas import CohortStats, AgeBandStats, Percentiles
+
+router = APIRouter(prefix="/cohorts", tags=["cohorts"])
+
+
+# ============ Helper Functions ============
+
+# (label, lower bound inclusive, upper bound inclusive)
+AGE_BANDS = [
+    ("0-17", 0, 17),
+    ("18-39", 18, 39),
+    ("40-59", 40, 59),
+    ("60-79", 60, 79),
+    ("80+", 80, None),
+]
+
+PERCENTILE_COLUMNS = {
+    "hba1c": Labs.lbxgh,
+    "systolic": PatientSummary.systolic,
+    "diastolic": PatientSummary.diastolic,
+    "egfr": PatientSummary.egfr,
+    "bmi": Examination.bmxbmi,
+}
+
+
+def age_band_expression():
+    """SQL CASE expression mapping age to its band label."""
+    whens = [
+        (Demographic.ridageyr.between(low, high) if high is not None else Demographic.ridageyr >= low, label)
+        for label, low, high in AGE_BANDS
+    ]
+    return case(*whens, else_=literal("unknown"))
+
+
+def flag_rate(column):
+    """Fraction of rows where a questionnaire answer is 1 (yes)."""
+    return func.avg(case((column == 1, 1.0), else_=0.0))
+
+
+def round_or_none(value, digits: int = 2) -> Optional[float]:
+    """Round an aggregate, preserving NULL."""
+    return None if value is None else round(float(value), digits)
+
+
+def cohort_select(filtered_seqns, *columns):
+    """Select columns for the filtered cohort with every per-patient table outer-joined."""
+    return (
+        select(*columns)
+        .select_from(Demographic)
+        .join(filtered_seqns, filtered_seqns.c.seqn == Demographic.seqn)
+        .outerjoin(PatientSummary, PatientSummary.seqn == Demographic.seqn)
+        .outerjoin(Examination, Examination.seqn == Demographic.seqn)
+        .outerjoin(Labs, Labs.seqn == Demographic.seqn)
+        .outerjoin(Questionnaire, Questionnaire.seqn == Demographic.seqn)
+    )
+
+
+def compute_cohort_stats(db: Session, filters: dict) -> CohortStats:
+    """Aggregate the filtered cohort with GROUP BY queries and a columnar percentile pass."""
+    filtered_seqns = apply_patient_filters(db.query(Demographic.seqn), **filters).subquery()
+    
+    # Risk level / status distribution
+    risk_levels, statuses = {}, {}
+    rows = db.execute(
+        cohort_select(filtered_seqns, PatientSummary.risk_level, PatientSummary.status, func.count())
+        .group_by(PatientSummary.risk_level, PatientSummary.status)
+    ).all()
+    for level, status, count in rows:
+        if level is not None:
+            risk_levels[level] = risk_levels.get(level, 0) + count
+        if status is not None:
+            statuses[status] = statuses.get(status, 0) + count
+    
+    # Gender distribution
+    genders = {}
+    for code, count in db.execute(
+        cohort_select(filtered_seqns, Demographic.riagendr, func.count()).group_by(Demographic.riagendr)
+    ).all():
+        gender = decode_gender(code)
+        genders[gender] = genders.get(gender, 0) + count
+    
+    # Age band aggregates
+    band = age_band_expression().label("age_band")
+    band_rows = {
+        row.age_band: row
+        for row in db.execute(
+            cohort_select(
+                filtered_seqns,
+                band,
+                func.count().label("count"),
+                func.avg(Labs.lbxgh).label("mean_hba1c"),
+                func.avg(PatientSummary.systolic).label("mean_systolic"),
+                func.avg(Examination.bmxbmi).label("mean_bmi"),
+                flag_rate(Questionnaire.bpq020).label("hypertension_prevalence"),
+                flag_rate(Questionnaire.diq010).label("diabetes_prevalence"),
+            ).group_by(band)
+        ).all()
+    }
+    age_bands = [
+        AgeBandStats(
+            age_band=label,
+            count=row.count,
+            mean_hba1c=round_or_none(row.mean_hba1c),
+            mean_systolic=round_or_none(row.mean_systolic),
+            mean_bmi=round_or_none(row.mean_bmi),
+            hypertension_prevalence=round_or_none(row.hypertension_prevalence, 4),
+            diabetes_prevalence=round_or_none(row.diabetes_prevalence, 4),
+        )
+        for label in [b[0] for b in AGE_BANDS] + ["unknown"]
+        if (row := band_rows.get(label)) is not None
+    ]
+    
+    # Percentiles (SQLite has no percentile aggregate, so pull the columns once)
+    values = np.array(
+        db.execute(cohort_select(filtered_seqns, *PERCENTILE_COLUMNS.values())).all(),
+        dtype=np.float64,
+    ).reshape(-1, len(PERCENTILE_COLUMNS))
+    percentiles = {}
+    for i, name in enumerate(PERCENTILE_COLUMNS):
+        column = values[:, i]
+        column = column[~np.isnan(column)]
+        if column.size == 0:
+            percentiles[name] = Percentiles(count=0)
+            continue
+        p25, p50, p75, p90 = np.percentile(column, [25, 50, 75, 90])
+        percentiles[name] = Percentiles(
+            count=int(column.size),
+            p25=round(float(p25), 2),
+            p50=round(float(p50), 2),
+            p75=round(float(p75), 2),
+            p90=round(float(p90), 2),
+        )
+    
+    return CohortStats(
+        total=sum(b.count for b in age_bands),
+        risk_levels=risk_levels,
+        statuses=statuses,
+        genders=genders,
+        age_bands=age_bands,
+        percentiles=percentiles,
+    )
+
+
+# ============ API Endpoints ============
+
+@router.get("/stats", response_model=CohortStats)
+def get_cohort_stats(
+    gender: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    risk_level: Optional[str] = None,
+    status: Optional[str] = None,
+    on_antihypertensive: Optional[bool] = None,
+    on_diabetic: Optional[bool] = None,
+    on_renal: Optional[bool] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Get aggregate statistics for the patients matching the list filters."""
+    filters = {
+        "gender": gender,
+        "min_age": min_age,
+        "max_age": max_age,
+        "risk_level": risk_level,
+        "status": status,
+        "on_antihypertensive": on_antihypertensive,
+        "on_diabetic": on_diabetic,
+        "on_renal": on_renal,
+    }
+    key = patient_filter_key(filters)
+    return cohort_stats_cache.get_or_compute(key, lambda: compute_cohort_stats(db, filters))
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+from medication_search import SEARCH_FIELDS, SEARCH_MODES, search_medications
+from schemas import MedicationSearchMatch, MedicationSearchResponse
+
+router = APIRouter(prefix="/medications", tags=["medications"])
+
+
+# ============ API Endpoints ============
+
+@router.get("/search", response_model=MedicationSearchResponse)
+def search(
+    q: list[str] = Query(..., description="Search terms; repeat to match any of several"),
+    mode: str = Query("prefix", description="'prefix' lets the last word match as a prefix; 'phrase' is exact"),
+    field: str = Query("all", description="Restrict to 'drug', 'condition' or 'code' columns"),
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """Find patients whose medications match drug names, conditions or ICD-10 codes."""
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+    if field not in SEARCH_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field must be one of {', '.join(SEARCH_FIELDS)}")
+    
+    try:
+        page = search_medications(db, q, mode=mode, field=field, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return MedicationSearchResponse(
+        query=page.terms,
+        total_patients=page.total_patients,
+        total_matches=page.total_matches,
+        items=[MedicationSearchMatch(seqn=seqn, matches=count) for seqn, count in page.items],
+    )
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, select, text
 from typing import Optional
+import base64
+import json
 import math
 
-from database import get_db
-from models import Demographic, Examination, Labs, Diet, Questionnaire, Medication
+from clinical import (
+    decode_gender, calculate_egfr, calculate_risk_level, average_bp_readings,
+    status_for_risk_level, score_patients_batch, optional_int,
+)
+from cache import invalidate_patient_caches, patient_count_cache, patient_detail_cache
+from config import get_settings
+from database import get_db, get_read_db, ReadSessionLocal
+from export import EXPORT_FORMATS, resolve_export_columns, export_select, stream_export
+from fast_json import LIST_ITEM_FIELDS, encode_patient_detail, encode_patient_page
+from models import (
+    Demographic, Examination, Labs, Diet, Questionnaire, Medication, PatientSummary, PatientTreatment
+)
+from patient_import import allocate_seqns, patient_records, import_patients, bulk_import, resolve_import_format
+from summary import refresh_patient_summary, remove_patient_summary
+from treatment import refresh_patient_treatment, remove_patient_treatment
 from schemas import (
     PatientListItem, PatientDetail, PatientCreate, PatientUpdate,
-    MedicationResponse, PaginatedResponse
+    MedicationResponse, PaginatedResponse, PatientBatchRequest, PatientBatchResponse,
+    BulkImportResponse,
 )
 
 router = APIRouter(prefix="/patients", tags=["patients"])
@@ -16,15 +34,6 @@ router = APIRouter(prefix="/patients", tags=["patients"])
 
 # ============ Helper Functions ============
 
-def decode_gender(code: Optional[int]) -> str:
-    """Convert NHANES gender code to string."""
-    if code == 1:
-        return "male"
-    elif code == 2:
-        return "female"
-    return "other"
-
-
 def decode_race_ethnicity(code: Optional[int]) -> Optional[str]:
     """Convert NHANES race/ethnicity code to string."""
     mapping = {
@@ -64,129 +73,77 @@ def decode_marital_status(code: Optional[int]) -> Optional[str]:
     return mapping.get(code)
 
 
-def calculate_egfr(creatinine: Optional[float], age: int, gender: str) -> Optional[float]:
-    """Calculate eGFR using CKD-EPI equation (simplified)."""
-    if creatinine is None or creatinine <= 0:
-        return None
-    
-    # Simplified CKD-EPI formula
-    if gender == "female":
-        if creatinine <= 0.7:
-            egfr = 144 * (creatinine / 0.7) ** -0.329 * 0.993 ** age
-        else:
-            egfr = 144 * (creatinine / 0.7) ** -1.209 * 0.993 ** age
-    else:
-        if creatinine <= 0.9:
-            egfr = 141 * (creatinine / 0.9) ** -0.411 * 0.993 ** age
-        else:
-            egfr = 141 * (creatinine / 0.9) ** -1.209 * 0.993 ** age
-    
-    return round(egfr, 1)
-
-
-def calculate_risk_level(
-    hba1c: Optional[float],
-    systolic_bp: Optional[int],
-    egfr: Optional[float],
-    diabetes: bool,
-    hypertension: bool
-) -> str:
-    """Calculate patient risk level based on clinical markers."""
-    risk_score = 0
-    
-    # HbA1c risk
-    if hba1c is not None:
-        if hba1c >= 9.0:
-            risk_score += 3
-        elif hba1c >= 7.0:
-            risk_score += 2
-        elif hba1c >= 6.5:
-            risk_score += 1
-    
-    # Blood pressure risk
-    if systolic_bp is not None:
-        if systolic_bp >= 180:
-            risk_score += 3
-        elif systolic_bp >= 140:
-            risk_score += 2
-        elif systolic_bp >= 130:
-            risk_score += 1
-    
-    # Kidney function risk
-    if egfr is not None:
-        if egfr < 30:
-            risk_score += 3
-        elif egfr < 60:
-            risk_score += 2
-        elif egfr < 90:
-            risk_score += 1
-    
-    # History factors
-    if diabetes:
-        risk_score += 1
-    if hypertension:
-        risk_score += 1
-    
-    if risk_score >= 5:
-        return "high"
-    elif risk_score >= 2:
-        return "moderate"
-    return "low"
-
-
-def average_bp_readings(*readings) -> Optional[int]:
-    """Calculate average of available BP readings."""
-    valid = [r for r in readings if r is not None]
-    if not valid:
-        return None
-    return round(sum(valid) / len(valid))
-
-
-def build_patient_list_item(demo: Demographic) -> PatientListItem:
-    """Build a PatientListItem from database models."""
-    exam = demo.examination
-    labs = demo.labs
-    quest = demo.questionnaire
-    
-    gender = decode_gender(demo.riagendr)
-    
-    # Get BP readings
-    systolic = None
-    diastolic = None
-    if exam:
-        systolic = average_bp_readings(exam.bpxsy1, exam.bpxsy2, exam.bpxsy3)
-        diastolic = average_bp_readings(exam.bpxdi1, exam.bpxdi2, exam.bpxdi3)
-    
-    hba1c = labs.lbxgh if labs else None
-    
-    # Determine risk factors
-    diabetes = quest.diq010 == 1 if quest and quest.diq010 else False
-    hypertension = quest.bpq020 == 1 if quest and quest.bpq020 else False
-    
-    creatinine = labs.lbxscr if labs else None
-    egfr = calculate_egfr(creatinine, demo.ridageyr or 0, gender)
-    
-    risk_level = calculate_risk_level(hba1c, systolic, egfr, diabetes, hypertension)
-    
-    # Determine status based on risk and recent data
-    status = "critical" if risk_level == "high" else "active"
+# Only the columns the list view reads; everything else stays in the database
+LIST_COLUMNS = (
+    Demographic.seqn,
+    Demographic.riagendr,
+    Demographic.ridageyr,
+    Examination.bpxsy1, Examination.bpxsy2, Examination.bpxsy3,
+    Examination.bpxdi1, Examination.bpxdi2, Examination.bpxdi3,
+    Examination.bmxbmi,
+    Labs.lbxgh,
+    Labs.lbxscr,
+    Questionnaire.diq010,
+    Questionnaire.bpq020,
+)
+
+
+def patient_list_select():
+    """
+    Core select of ``LIST_COLUMNS`` rooted at Demographic.
     
-    return PatientListItem(
-        id=str(demo.seqn),
-        seqn=demo.seqn,
-        gender=gender,
-        age=demo.ridageyr or 0,
-        blood_pressure_systolic=systolic,
-        blood_pressure_diastolic=diastolic,
-        bmi=exam.bmxbmi if exam else None,
-        hba1c=hba1c,
-        risk_level=risk_level,
-        status=status,
+    Rows come back as plain tuples, so a page costs no ORM instances,
+    identity-map entries or unused Labs/Examination columns.
+    """
+    return (
+        select(*LIST_COLUMNS)
+        .select_from(Demographic)
+        .outerjoin(Examination, Examination.seqn == Demographic.seqn)
+        .outerjoin(Labs, Labs.seqn == Demographic.seqn)
+        .outerjoin(Questionnaire, Questionnaire.seqn == Demographic.seqn)
     )
 
 
-def build_patient_detail(demo: Demographic) -> PatientDetail:
-    """Build a PatientDetail from database models."""
+def patient_list_rows(records) -> list[tuple]:
+    """
+    List-view values for rows of ``patient_list_select``, as tuples in
+    ``LIST_ITEM_FIELDS`` order and scored as one batch.
+    """
+    columns = dict(zip(
+        (column.key for column in LIST_COLUMNS),
+        zip(*records) if records else [()] * len(LIST_COLUMNS),
+    ))
+    
+    scores = score_patients_batch(
+        riagendr=columns["riagendr"],
+        ridageyr=columns["ridageyr"],
+        lbxscr=columns["lbxscr"],
+        lbxgh=columns["lbxgh"],
+        systolic_readings=[columns[f"bpxsy{i}"] for i in (1, 2, 3)],
+        diastolic_readings=[columns[f"bpxdi{i}"] for i in (1, 2, 3)],
+        diq010=columns["diq010"],
+        bpq020=columns["bpq020"],
+    )
+    
+    return [
+        (
+            str(record.seqn),
+            record.seqn,
+            decode_gender(record.riagendr),
+            record.ridageyr or 0,
+            optional_int(scores["systolic"][i]),
+            optional_int(scores["diastolic"][i]),
+            record.bmxbmi,
+            record.lbxgh,
+            str(scores["risk_level"][i]),
+            str(scores["status"][i]),
+        )
+        for i, record in enumerate(records)
+    ]
+
+
+def patient_detail_values(demo: Demographic) -> dict:
+    """PatientDetail field values from database models, medications as plain dicts."""
     exam = demo.examination
     labs = demo.labs
     diet = demo.diet
@@ -220,11 +177,11 @@ def build_patient_detail(demo: Demographic) -> PatientDetail:
     kidney_disease = quest.kiq022 == 1 if quest and quest.kiq022 else False
     
     risk_level = calculate_risk_level(hba1c, systolic, egfr, diabetes, hypertension)
-    status = "critical" if risk_level == "high" else "active"
+    status = status_for_risk_level(risk_level)
     
     # Build medication list
     med_list = [
-        MedicationResponse(
+        dict(
             id=m.id,
             seqn=m.seqn,
             rxduse=m.rxduse,
@@ -237,7 +194,7 @@ def build_patient_detail(demo: Demographic) -> PatientDetail:
         for m in meds if m.rxddrug and m.rxddrug not in ("99999", "55555")
     ]
     
-    return PatientDetail(
+    return dict(
         id=str(demo.seqn),
         seqn=demo.seqn,
         gender=gender,
@@ -274,27 +231,40 @@ def build_patient_detail(demo: Demographic) -> PatientDetail:
     )
 
 
-# ============ API Endpoints ============
+def build_patient_detail(demo: Demographic) -> PatientDetail:
+    """Build a PatientDetail from database models."""
+    return PatientDetail(**patient_detail_values(demo))
 
-@router.get("", response_model=PaginatedResponse)
-def get_patients(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
+
+def encode_cursor(seqn: int) -> str:
+    """Encode the last SEQN of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"seqn:{seqn}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode an opaque cursor back into the SEQN to seek after."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, value = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        if prefix != "seqn":
+            raise ValueError(prefix)
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_patient_filters(
+    query,
     gender: Optional[str] = None,
     min_age: Optional[int] = None,
     max_age: Optional[int] = None,
     risk_level: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    on_antihypertensive: Optional[bool] = None,
+    on_diabetic: Optional[bool] = None,
+    on_renal: Optional[bool] = None,
 ):
-    """Get paginated list of patients with optional filters."""
-    query = db.query(Demographic).options(
-        joinedload(Demographic.examination),
-        joinedload(Demographic.labs),
-        joinedload(Demographic.questionnaire),
-    )
-    
-    # Apply filters
+    """Apply the patient list filters to a query rooted at Demographic."""
     if gender:
         gender_code = 1 if gender == "male" else 2 if gender == "female" else None
         if gender_code:
@@ -306,132 +276,221 @@ def get_patients(
     if max_age is not None:
         query = query.filter(Demographic.ridageyr <= max_age)
     
-    # Get total count
-    total = query.count()
+    # Computed fields are filtered through the materialized summary table
+    if risk_level or status:
+        query = query.join(PatientSummary, PatientSummary.seqn == Demographic.seqn)
+        if risk_level:
+            query = query.filter(PatientSummary.risk_level == risk_level)
+        if status:
+            query = query.filter(PatientSummary.status == status)
+    
+    # Treatment status comes from the materialized patient_treatment table
+    treatment_filters = [
+        (PatientTreatment.on_antihypertensive, on_antihypertensive),
+        (PatientTreatment.on_diabetic, on_diabetic),
+        (PatientTreatment.on_renal, on_renal),
+    ]
+    if any(value is not None for _, value in treatment_filters):
+        query = query.join(PatientTreatment, PatientTreatment.seqn == Demographic.seqn)
+        for column, value in treatment_filters:
+            if value is not None:
+                query = query.filter(column == value)
     
-    # Paginate
-    offset = (page - 1) * page_size
-    patients = query.offset(offset).limit(page_size).all()
+    return query
+
+
+def patient_filters(
+    gender: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    risk_level: Optional[str] = None,
+    status: Optional[str] = None,
+    on_antihypertensive: Optional[bool] = None,
+    on_diabetic: Optional[bool] = None,
+    on_renal: Optional[bool] = None,
+) -> dict:
+    """Dependency collecting the patient list filters as ``apply_patient_filters`` keyword arguments."""
+    return dict(
+        gender=gender, min_age=min_age, max_age=max_age, risk_level=risk_level, status=status,
+        on_antihypertensive=on_antihypertensive, on_diabetic=on_diabetic, on_renal=on_renal,
+    )
+
+
+def patient_filter_key(filters: dict) -> tuple:
+    """
+    Normalized signature of a filter set.
     
-    # Build response items
-    items = [build_patient_list_item(p) for p in patients]
+    Filters ``apply_patient_filters`` ignores (None, empty strings, unknown
+    genders) are dropped, so equivalent requests share one cache entry.
+    """
+    filters = dict(filters)
+    if filters.get("gender") not in ("male", "female"):
+        filters["gender"] = None
+    return tuple(sorted((name, value) for name, value in filters.items() if value is not None and value != ""))
+
+
+def patient_count_select(filters: dict):
+    """Count of patients matching the filters, joining only the tables the filters need."""
+    return apply_patient_filters(select(func.count()).select_from(Demographic), **filters)
+
+
+def patient_page_select(filters: dict, page: int, page_size: int, after_seqn: Optional[int]):
+    """One list page plus a look-ahead row, by offset or by seeking past ``after_seqn``."""
+    query = apply_patient_filters(patient_list_select(), **filters).order_by(Demographic.seqn)
+    if after_seqn is not None:
+        query = query.where(Demographic.seqn > after_seqn)
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size + 1)
+
+
+def patient_page_response(records, total: Optional[int], page: int, page_size: int):
+    """Score and encode the rows of ``patient_page_select``, dropping the look-ahead row."""
+    has_more = len(records) > page_size
+    records = records[:page_size]
     
-    # Post-filter by risk_level and status (computed fields)
-    if risk_level:
-        items = [p for p in items if p.risk_level == risk_level]
-    if status:
-        items = [p for p in items if p.status == status]
+    rows = patient_list_rows(records)
+    pages = math.ceil(total / page_size) if total is not None else None
+    next_cursor = encode_cursor(records[-1].seqn) if has_more else None
     
-    pages = math.ceil(total / page_size)
+    if get_settings().fast_json:
+        body = encode_patient_page(rows, total, page, page_size, pages, next_cursor)
+        return Response(content=body, media_type="application/json")
     
     return PaginatedResponse(
-        items=[item.model_dump() for item in items],
+        items=[PatientListItem(**dict(zip(LIST_ITEM_FIELDS, row))).model_dump() for row in rows],
         total=total,
         page=page,
         page_size=page_size,
         pages=pages,
+        next_cursor=next_cursor,
     )
 
 
-@router.get("/{patient_id}", response_model=PatientDetail)
-def get_patient(patient_id: int, db: Session = Depends(get_db)):
-    """Get detailed patient information by SEQN."""
-    patient = db.query(Demographic).options(
+def count_patients(db: Session, filters: dict) -> int:
+    """Total for the filters, cached per filter signature until the next patient write."""
+    return patient_count_cache.get_or_compute(
+        patient_filter_key(filters), lambda: db.scalar(patient_count_select(filters))
+    )
+
+
+def query_plan_sql(stmt, dialect) -> str:
+    """EXPLAIN QUERY PLAN statement for ``stmt`` with its parameters inlined."""
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    return f"EXPLAIN QUERY PLAN {sql}"
+
+
+def format_query_plan(rows) -> list[str]:
+    """EXPLAIN QUERY PLAN rows, one line per step, indented by depth."""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def explain_query_plan(db: Session, stmt) -> list[str]:
+    """SQLite's EXPLAIN QUERY PLAN for a statement, one line per step, indented by depth."""
+    return format_query_plan(db.execute(text(query_plan_sql(stmt, db.get_bind().dialect))))
+
+
+# Upper bound on SEQNs per batch detail request
+MAX_BATCH_IDS = 500
+
+
+def patient_detail_options():
+    """
+    Eager-load options for PatientDetail.
+    
+    One-to-one tables are joined; medications are fetched with a separate
+    IN query so patient rows aren't multiplied by their medication count.
+    """
+    return (
         joinedload(Demographic.examination),
         joinedload(Demographic.labs),
         joinedload(Demographic.diet),
         joinedload(Demographic.questionnaire),
-        joinedload(Demographic.medications),
-    ).filter(Demographic.seqn == patient_id).first()
-    
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
-    return build_patient_detail(patient)
+        selectinload(Demographic.medications),
+    )
 
 
-@router.post("", response_model=PatientDetail, status_code=201)
-def create_patient(patient_data: PatientCreate, db: Session = Depends(get_db)):
-    """Create a new patient."""
-    # Get next SEQN (max + 1)
-    max_seqn = db.query(func.max(Demographic.seqn)).scalar() or 0
-    new_seqn = max_seqn + 1
-    
-    # Create demographic record
-    gender_code = 1 if patient_data.gender == "male" else 2 if patient_data.gender == "female" else 3
-    
-    demo = Demographic(
-        seqn=new_seqn,
-        riagendr=gender_code,
-        ridageyr=patient_data.age,
-    )
-    db.add(demo)
-    
-    # Create examination record
-    bmi = None
-    if patient_data.weight and patient_data.height:
-        bmi = round(patient_data.weight / ((patient_data.height / 100) ** 2), 1)
-    
-    exam = Examination(
-        seqn=new_seqn,
-        bpxsy1=patient_data.blood_pressure_systolic,
-        bpxdi1=patient_data.blood_pressure_diastolic,
-        bpxpls=patient_data.heart_rate,
-        bmxwt=patient_data.weight,
-        bmxht=patient_data.height,
-        bmxbmi=bmi,
-    )
-    db.add(exam)
-    
-    # Create labs record
-    labs = Labs(
-        seqn=new_seqn,
-        lbxgh=patient_data.hba1c,
-        lbxsgl=patient_data.fasting_glucose,
-        lbxtc=patient_data.total_cholesterol,
-        lbdldl=patient_data.ldl_cholesterol,
-        lbdhdd=patient_data.hdl_cholesterol,
-        lbxtr=patient_data.triglycerides,
-        lbxscr=patient_data.creatinine,
-        lbxsal=patient_data.albumin,
-    )
-    db.add(labs)
-    
-    # Create questionnaire record
-    quest = Questionnaire(
-        seqn=new_seqn,
-        smq020=1 if patient_data.smoker else 2,
-        diq010=1 if patient_data.diabetes_history else 2,
-        bpq020=1 if patient_data.hypertension_history else 2,
+def patient_details_select(seqns: list[int]):
+    """Patients with everything PatientDetail needs; read with ``.unique()`` because of the joins."""
+    return select(Demographic).options(*patient_detail_options()).where(Demographic.seqn.in_(seqns))
+
+
+def encode_patient_details(patients: list[Demographic]) -> dict[int, bytes]:
+    """Serialized PatientDetail JSON per SEQN for fully loaded patients."""
+    if get_settings().fast_json:
+        return {p.seqn: encode_patient_detail(patient_detail_values(p)) for p in patients}
+    return {p.seqn: build_patient_detail(p).model_dump_json().encode() for p in patients}
+
+
+def load_patient_details(db: Session, seqns: list[int]) -> dict[int, bytes]:
+    """Serialized PatientDetail JSON for each SEQN that exists, in two queries."""
+    return encode_patient_details(db.execute(patient_details_select(seqns)).unique().scalars().all())
+
+
+def load_patient_detail(db: Session, seqn: int) -> PatientDetail:
+    """PatientDetail of a patient that exists, bypassing the cache (after a write)."""
+    return build_patient_detail(db.execute(patient_details_select([seqn])).unique().scalar_one())
+
+
+def parse_id_list(values: list[str]) -> list[int]:
+    """Parse repeated and/or comma-separated SEQNs."""
+    try:
+        return [int(part) for value in values for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+
+def batch_ids(ids: list[int]) -> list[int]:
+    """Validate the SEQNs of a batch request, dropping repeats but keeping request order."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No patient ids given")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
+
+def batch_response(ids: list[int], details: dict[int, bytes]) -> Response:
+    """Join serialized details in request order, listing the SEQNs that don't exist."""
+    items = b",".join(details[i] for i in ids if i in details)
+    missing = [i for i in ids if i not in details]
+    body = b'{"items":[' + items + b'],"missing":' + json.dumps(missing).encode() + b"}"
+    return Response(content=body, media_type="application/json")
+
+
+def patient_batch_response(db: Session, ids: list[int]) -> Response:
+    """Details for ``ids`` in request order, reading through the detail cache."""
+    ids = batch_ids(ids)
+    details = patient_detail_cache.get_many_or_compute(
+        ids, lambda misses: load_patient_details(db, misses)
     )
-    db.add(quest)
-    
-    # Create empty diet record
-    diet = Diet(seqn=new_seqn)
-    db.add(diet)
+    return batch_response(ids, details)
+
+
+def add_patient(db: Session, patient_data: PatientCreate) -> int:
+    """Insert a new patient with its summary and treatment rows; the caller commits."""
+    new_seqn = allocate_seqns(db, 1)[0]
     
-    db.commit()
-    db.refresh(demo)
+    records = patient_records(new_seqn, patient_data)
+    for model, values in records.items():
+        db.add(model(**values))
     
-    # Reload with relationships
-    patient = db.query(Demographic).options(
-        joinedload(Demographic.examination),
-        joinedload(Demographic.labs),
-        joinedload(Demographic.diet),
-        joinedload(Demographic.questionnaire),
-        joinedload(Demographic.medications),
-    ).filter(Demographic.seqn == new_seqn).first()
-    
-    return build_patient_detail(patient)
+    refresh_patient_summary(db, new_seqn)
+    refresh_patient_treatment(db, new_seqn)
+    return new_seqn
 
 
-@router.put("/{patient_id}", response_model=PatientDetail)
-def update_patient(patient_id: int, patient_data: PatientUpdate, db: Session = Depends(get_db)):
-    """Update patient information."""
+def apply_patient_update(db: Session, patient_id: int, patient_data: PatientUpdate) -> bool:
+    """Apply an update and refresh the patient's summary; False if there is no such patient."""
     patient = db.query(Demographic).filter(Demographic.seqn == patient_id).first()
     
     if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+        return False
     
     # Update examination
     exam = db.query(Examination).filter(Examination.seqn == patient_id).first()
@@ -484,29 +543,20 @@ def update_patient(patient_id: int, patient_data: PatientUpdate, db: Session = D
         if patient_data.hypertension_history is not None:
             quest.bpq020 = 1 if patient_data.hypertension_history else 2
     
-    db.commit()
-    
-    # Reload with relationships
-    updated_patient = db.query(Demographic).options(
-        joinedload(Demographic.examination),
-        joinedload(Demographic.labs),
-        joinedload(Demographic.diet),
-        joinedload(Demographic.questionnaire),
-        joinedload(Demographic.medications),
-    ).filter(Demographic.seqn == patient_id).first()
-    
-    return build_patient_detail(updated_patient)
+    refresh_patient_summary(db, patient_id)
+    return True
 
 
-@router.delete("/{patient_id}", status_code=204)
-def delete_patient(patient_id: int, db: Session = Depends(get_db)):
-    """Delete a patient and all related records."""
+def delete_patient_records(db: Session, patient_id: int) -> bool:
+    """Delete a patient and all related records; False if there is no such patient."""
     patient = db.query(Demographic).filter(Demographic.seqn == patient_id).first()
     
     if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+        return False
     
     # Delete related records first
+    remove_patient_summary(db, patient_id)
+    remove_patient_treatment(db, patient_id)
     db.query(Medication).filter(Medication.seqn == patient_id).delete()
     db.query(Questionnaire).filter(Questionnaire.seqn == patient_id).delete()
     db.query(Diet).filter(Diet.seqn == patient_id).delete()
@@ -515,34 +565,222 @@ def delete_patient(patient_id: int, db: Session = Depends(get_db)):
     
     # Delete demographic record
     db.delete(patient)
+    return True
+
+
+def patient_medications_select(patient_id: int):
+    """A patient's medications, leaving out NHANES placeholder drug codes."""
+    return select(Medication).where(
+        Medication.seqn == patient_id,
+        Medication.rxddrug.notin_(["99999", "55555", None])
+    )
+
+
+def medication_response(m: Medication) -> MedicationResponse:
+    return MedicationResponse(
+        id=m.id,
+        seqn=m.seqn,
+        rxduse=m.rxduse,
+        rxddrug=m.rxddrug,
+        rxddrgid=m.rxddrgid,
+        rxddays=m.rxddays,
+        rxdrsc1=m.rxdrsc1,
+        rxdrsd1=m.rxdrsd1,
+    )
+
+
+# ============ API Endpoints ============
+
+@router.get("", response_model=PaginatedResponse)
+def get_patients(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(patient_filters),
+    after_seqn: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Get paginated list of patients with optional filters.
+    
+    Pages are addressed either by ``page`` (offset mode) or, for deep
+    scrolling, by ``cursor``/``after_seqn`` which seek on the SEQN primary
+    key. Every response carries a ``next_cursor`` when more rows follow.
+    Pass ``include_total=false`` to skip the count query.
+    """
+    total = count_patients(db, filters) if include_total else None
+    
+    if cursor is not None:
+        after_seqn = decode_cursor(cursor)
+    
+    records = db.execute(patient_page_select(filters, page, page_size, after_seqn)).all()
+    return patient_page_response(records, total, page, page_size)
+
+
+@router.get("/export")
+def export_patients(
+    format: str = Query("ndjson", description="ndjson, csv or arrow (Arrow IPC stream)"),
+    columns: Optional[str] = Query(None, description="Comma-separated column names, or 'all'"),
+    filters: dict = Depends(patient_filters),
+):
+    """
+    Stream every patient matching the list filters.
+    
+    Rows are read with a server-side cursor and written as they are fetched,
+    so the response size isn't limited by memory or page size.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    try:
+        names = resolve_export_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    seqn_filter = None
+    if any(value is not None for value in filters.values()):
+        seqn_filter = apply_patient_filters(select(Demographic.seqn), **filters)
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(
+            ReadSessionLocal, export_select(names, seqn_filter), names, format,
+            get_settings().export_batch_size,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="patients.{extension}"'},
+    )
+
+
+@router.get("/plan")
+def get_patients_query_plan(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(patient_filters),
+    after_seqn: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """
+    SQLite query plans of the count and page queries for a list request.
+    
+    A diagnostic for checking which index each filter combination uses;
+    only served when QUERY_PLAN_DIAGNOSTICS is enabled.
+    """
+    if not get_settings().query_plan_diagnostics:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=400, detail="Query plans are only available on SQLite")
+    
+    return {
+        "filters": dict(patient_filter_key(filters)),
+        "count": explain_query_plan(db, patient_count_select(filters)),
+        "page": explain_query_plan(db, patient_page_select(filters, page, page_size, after_seqn)),
+    }
+
+
+@router.get("/batch", response_model=PatientBatchResponse)
+def get_patients_batch(
+    ids: list[str] = Query(..., description="Comma-separated SEQNs (the parameter may also be repeated)"),
+    db: Session = Depends(get_read_db),
+):
+    """Get detailed information for several patients, in request order."""
+    return patient_batch_response(db, parse_id_list(ids))
+
+
+@router.post("/batch", response_model=PatientBatchResponse)
+def post_patients_batch(request: PatientBatchRequest, db: Session = Depends(get_read_db)):
+    """Get detailed information for a long list of patients, in request order."""
+    return patient_batch_response(db, request.ids)
+
+
+@router.get("/{patient_id}", response_model=PatientDetail)
+def get_patient(patient_id: int, db: Session = Depends(get_read_db)):
+    """Get detailed patient information by SEQN (served from the detail cache when warm)."""
+    def load_detail() -> bytes:
+        details = load_patient_details(db, [patient_id])
+        
+        if patient_id not in details:
+            raise HTTPException(status_code=404, detail="Patient not found")
+        
+        return details[patient_id]
+    
+    body = patient_detail_cache.get_or_compute(patient_id, load_detail)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("", response_model=PatientDetail, status_code=201)
+def create_patient(patient_data: PatientCreate, db: Session = Depends(get_db)):
+    """Create a new patient."""
+    new_seqn = add_patient(db, patient_data)
+    db.commit()
+    invalidate_patient_caches(new_seqn)
+    
+    return load_patient_detail(db, new_seqn)
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_create_patients(
+    request: Request,
+    format: Optional[str] = Query(None, description="'ndjson' or 'csv'; defaults from Content-Type"),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many patients from an NDJSON or CSV request body.
+    
+    The body is read as it streams in; every ``import_chunk_size`` valid
+    records are inserted in one transaction under a freshly reserved block
+    of SEQNs. The response reports the outcome of each input record.
+    """
+    try:
+        import_format = resolve_import_format(format, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    settings = get_settings()
+    try:
+        return await bulk_import(
+            request.stream(),
+            import_format,
+            settings.import_chunk_size,
+            settings.import_max_line_bytes,
+            lambda batch: run_in_threadpool(import_patients, db, batch),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{patient_id}", response_model=PatientDetail)
+def update_patient(patient_id: int, patient_data: PatientUpdate, db: Session = Depends(get_db)):
+    """Update patient information."""
+    if not apply_patient_update(db, patient_id, patient_data):
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
     db.commit()
+    invalidate_patient_caches(patient_id)
+    
+    return load_patient_detail(db, patient_id)
+
+
+@router.delete("/{patient_id}", status_code=204)
+def delete_patient(patient_id: int, db: Session = Depends(get_db)):
+    """Delete a patient and all related records."""
+    if not delete_patient_records(db, patient_id):
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    db.commit()
+    invalidate_patient_caches(patient_id)
     
     return None
 
 
 @router.get("/{patient_id}/medications", response_model=list[MedicationResponse])
-def get_patient_medications(patient_id: int, db: Session = Depends(get_db)):
+def get_patient_medications(patient_id: int, db: Session = Depends(get_read_db)):
     """Get all medications for a patient."""
     patient = db.query(Demographic).filter(Demographic.seqn == patient_id).first()
     
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    medications = db.query(Medication).filter(
-        Medication.seqn == patient_id,
-        Medication.rxddrug.notin_(["99999", "55555", None])
-    ).all()
+    medications = db.scalars(patient_medications_select(patient_id)).all()
     
-    return [
-        MedicationResponse(
-            id=m.id,
-            seqn=m.seqn,
-            rxduse=m.rxduse,
-            rxddrug=m.rxddrug,
-            rxddrgid=m.rxddrgid,
-            rxddays=m.rxddays,
-            rxdrsc1=m.rxdrsc1,
-            rxdrsd1=m.rxdrsd1,
-        )
-        for m in medications
-    ]
+    return [medication_response(m) for m in medications]
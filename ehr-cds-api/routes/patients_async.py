@@ -0,0 +1,225 @@
+"""
+Async variants of the patient routes.
+
+Each handler is a coroutine on an ``AsyncSession`` (aiosqlite), so requests
+no longer hold a threadpool slot while waiting on the database. Reads build
+the same statements as ``routes.patients`` (the projected list select, the
+keyset page, the eager-loaded detail select) and await them directly; the
+CPU-heavy steps, batch risk scoring and detail serialization, run through
+``run_in_threadpool`` so they don't stall other requests on the event loop.
+
+Writes reuse the sync write helpers through ``AsyncSession.run_sync``; they
+are a handful of statements per patient and most of their time is spent
+waiting on SQLite.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from cache import invalidate_patient_caches, patient_count_cache, patient_detail_cache
+from config import get_settings
+from database import get_async_db, get_async_read_db
+from models import Demographic
+from patient_import import bulk_import, import_patients, resolve_import_format
+from routes import patients
+from routes.patients import (
+    add_patient, apply_patient_update, batch_ids, batch_response, build_patient_detail, decode_cursor,
+    delete_patient_records, encode_patient_details, format_query_plan, medication_response,
+    parse_id_list, patient_count_select, patient_details_select, patient_filter_key, patient_filters,
+    patient_medications_select, patient_page_response, patient_page_select, query_plan_sql,
+)
+from schemas import (
+    PatientDetail, PatientCreate, PatientUpdate, MedicationResponse, PaginatedResponse,
+    PatientBatchRequest, PatientBatchResponse, BulkImportResponse,
+)
+
+router = APIRouter(prefix="/patients", tags=["patients"])
+
+
+# ============ Helper Functions ============
+
+async def count_patients(db: AsyncSession, filters: dict) -> int:
+    """Total for the filters, cached per filter signature until the next patient write."""
+    return await patient_count_cache.get_or_compute_async(
+        patient_filter_key(filters), lambda: db.scalar(patient_count_select(filters))
+    )
+
+
+async def load_patient_details(db: AsyncSession, seqns: list[int]) -> dict[int, bytes]:
+    """Serialized PatientDetail JSON for each SEQN that exists, in two queries."""
+    result = await db.execute(patient_details_select(seqns))
+    return await run_in_threadpool(encode_patient_details, result.unique().scalars().all())
+
+
+async def load_patient_detail(db: AsyncSession, seqn: int) -> PatientDetail:
+    """PatientDetail of a patient that exists, bypassing the cache (after a write)."""
+    result = await db.execute(patient_details_select([seqn]))
+    return await run_in_threadpool(build_patient_detail, result.unique().scalar_one())
+
+
+async def explain_query_plan(db: AsyncSession, stmt) -> list[str]:
+    """SQLite's EXPLAIN QUERY PLAN for a statement, one line per step, indented by depth."""
+    return format_query_plan(await db.execute(text(query_plan_sql(stmt, db.bind.dialect))))
+
+
+async def patient_batch_response(db: AsyncSession, ids: list[int]) -> Response:
+    """Details for ``ids`` in request order, reading through the detail cache."""
+    ids = batch_ids(ids)
+    details = await patient_detail_cache.get_many_or_compute_async(
+        ids, lambda misses: load_patient_details(db, misses)
+    )
+    return batch_response(ids, details)
+
+
+# ============ API Endpoints ============
+
+@router.get("", response_model=PaginatedResponse)
+async def get_patients(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(patient_filters),
+    after_seqn: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Get paginated list of patients with optional filters."""
+    total = await count_patients(db, filters) if include_total else None
+
+    if cursor is not None:
+        after_seqn = decode_cursor(cursor)
+
+    records = (await db.execute(patient_page_select(filters, page, page_size, after_seqn))).all()
+    return await run_in_threadpool(patient_page_response, records, total, page, page_size)
+
+
+# The body comes from a sync generator that Starlette iterates in a worker
+# thread on its own read session, so the sync handler serves both routers
+router.get("/export")(patients.export_patients)
+
+
+@router.get("/plan")
+async def get_patients_query_plan(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: dict = Depends(patient_filters),
+    after_seqn: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """SQLite query plans of the count and page queries for a list request."""
+    if not get_settings().query_plan_diagnostics:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=400, detail="Query plans are only available on SQLite")
+
+    return {
+        "filters": dict(patient_filter_key(filters)),
+        "count": await explain_query_plan(db, patient_count_select(filters)),
+        "page": await explain_query_plan(db, patient_page_select(filters, page, page_size, after_seqn)),
+    }
+
+
+@router.get("/batch", response_model=PatientBatchResponse)
+async def get_patients_batch(
+    ids: list[str] = Query(..., description="Comma-separated SEQNs (the parameter may also be repeated)"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Get detailed information for several patients, in request order."""
+    return await patient_batch_response(db, parse_id_list(ids))
+
+
+@router.post("/batch", response_model=PatientBatchResponse)
+async def post_patients_batch(request: PatientBatchRequest, db: AsyncSession = Depends(get_async_read_db)):
+    """Get detailed information for a long list of patients, in request order."""
+    return await patient_batch_response(db, request.ids)
+
+
+@router.get("/{patient_id}", response_model=PatientDetail)
+async def get_patient(patient_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get detailed patient information by SEQN (served from the detail cache when warm)."""
+    async def load_detail() -> bytes:
+        details = await load_patient_details(db, [patient_id])
+
+        if patient_id not in details:
+            raise HTTPException(status_code=404, detail="Patient not found")
+
+        return details[patient_id]
+
+    body = await patient_detail_cache.get_or_compute_async(patient_id, load_detail)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("", response_model=PatientDetail, status_code=201)
+async def create_patient(patient_data: PatientCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new patient."""
+    new_seqn = await db.run_sync(add_patient, patient_data)
+    await db.commit()
+    invalidate_patient_caches(new_seqn)
+
+    return await load_patient_detail(db, new_seqn)
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_create_patients(
+    request: Request,
+    format: Optional[str] = Query(None, description="'ndjson' or 'csv'; defaults from Content-Type"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create many patients from an NDJSON or CSV request body."""
+    try:
+        import_format = resolve_import_format(format, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    settings = get_settings()
+    try:
+        return await bulk_import(
+            request.stream(),
+            import_format,
+            settings.import_chunk_size,
+            settings.import_max_line_bytes,
+            lambda batch: db.run_sync(import_patients, batch),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{patient_id}", response_model=PatientDetail)
+async def update_patient(
+    patient_id: int, patient_data: PatientUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    """Update patient information."""
+    if not await db.run_sync(apply_patient_update, patient_id, patient_data):
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    await db.commit()
+    invalidate_patient_caches(patient_id)
+
+    return await load_patient_detail(db, patient_id)
+
+
+@router.delete("/{patient_id}", status_code=204)
+async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a patient and all related records."""
+    if not await db.run_sync(delete_patient_records, patient_id):
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    await db.commit()
+    invalidate_patient_caches(patient_id)
+
+    return None
+
+
+@router.get("/{patient_id}/medications", response_model=list[MedicationResponse])
+async def get_patient_medications(patient_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Get all medications for a patient."""
+    exists = await db.scalar(select(Demographic.seqn).where(Demographic.seqn == patient_id))
+
+    if exists is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    medications = (await db.scalars(patient_medications_select(patient_id))).all()
+
+    return [medication_response(m) for m in medications]
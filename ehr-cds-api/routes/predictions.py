@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+from schemas import PatientPredictions, PredictionBatchRequest, PredictionBatchResponse
+from serving import registry, batcher, predict_patients, MODEL_SPECS
+
+router = APIRouter(tags=["predictions"])
+
+
+# ============ API Endpoints ============
+
+@router.get("/patients/{patient_id}/predictions", response_model=PatientPredictions)
+def get_patient_predictions(patient_id: int, db: Session = Depends(get_read_db)):
+    """Run every served model for one patient using their stored exam, lab and diet data."""
+    predictions, missing, unavailable = predict_patients(db, registry, [patient_id], batcher=batcher)
+    
+    if missing:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    if len(unavailable) == len(MODEL_SPECS):
+        raise HTTPException(status_code=503, detail="No prediction models have been trained")
+    
+    return PatientPredictions(**predictions[0])
+
+
+@router.post("/predictions", response_model=PredictionBatchResponse)
+def batch_predictions(request: PredictionBatchRequest, db: Session = Depends(get_read_db)):
+    """Run every served model for a batch of patients in one pass."""
+    predictions, missing, unavailable = predict_patients(db, registry, request.seqns, batcher=batcher)
+    
+    if len(unavailable) == len(MODEL_SPECS):
+        raise HTTPException(status_code=503, detail="No prediction models have been trained")
+    
+    return PredictionBatchResponse(
+        items=[PatientPredictions(**p) for p in predictions],
+        missing=missing,
+        unavailable_models=unavailable,
+    )
+
+
+@router.get("/predictions/models")
+def get_model_status():
+    """Report which models are trained and loaded."""
+    return registry.status()
+
+
+@router.get("/predictions/batching")
+def get_batching_stats():
+    """Batch size distribution and queue latency of the inference scheduler."""
+    if batcher is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "max_batch_size": batcher.max_batch_size,
+        "max_wait_ms": batcher.max_wait * 1000,
+        **batcher.metrics.snapshot(),
+    }
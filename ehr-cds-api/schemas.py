@@ -22,6 +22,18 @@ class MedicationResponse(MedicationBase):
         from_attributes = True
 
 
+class MedicationSearchMatch(BaseModel):
+    seqn: int
+    matches: int  # Medication rows matching the query
+
+
+class MedicationSearchResponse(BaseModel):
+    query: list[str]  # Search terms as matched, after tokenizing
+    total_patients: int
+    total_matches: int
+    items: list[MedicationSearchMatch]
+
+
 # ============ Examination Schemas ============
 
 class ExaminationBase(BaseModel):
@@ -237,12 +249,97 @@ class PatientUpdate(BaseModel):
     hypertension_history: Optional[bool] = None
 
 
+class PatientBatchRequest(BaseModel):
+    """SEQNs to load in one call."""
+    ids: list[int] = Field(..., min_length=1, max_length=500)
+
+
+class PatientBatchResponse(BaseModel):
+    """Patient details in request order."""
+    items: list[PatientDetail]
+    missing: list[int] = []
+
+
+class BulkImportRowResult(BaseModel):
+    """Outcome of one input record of a bulk import."""
+    row: int  # 1-based record number, excluding the CSV header
+    status: str  # created / error
+    seqn: Optional[int] = None
+    errors: list[str] = []
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkImportRowResult]
+
+
 # ============ Pagination Schemas ============
 
 class PaginatedResponse(BaseModel):
     """Generic paginated response."""
     items: list
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+# ============ Cohort Schemas ============
+
+class Percentiles(BaseModel):
+    """Distribution summary of one measure across a cohort."""
+    count: int
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+
+
+class AgeBandStats(BaseModel):
+    """Aggregates for one age band of a cohort."""
+    age_band: str
+    count: int
+    mean_hba1c: Optional[float] = None
+    mean_systolic: Optional[float] = None
+    mean_bmi: Optional[float] = None
+    hypertension_prevalence: Optional[float] = None
+    diabetes_prevalence: Optional[float] = None
+
+
+class CohortStats(BaseModel):
+    """Aggregate statistics for the patients matching a filter set."""
+    total: int
+    risk_levels: dict[str, int] = {}
+    statuses: dict[str, int] = {}
+    genders: dict[str, int] = {}
+    age_bands: list[AgeBandStats] = []
+    percentiles: dict[str, Percentiles] = {}
+
+
+# ============ Prediction Schemas ============
+
+class PatientPredictions(BaseModel):
+    """Model outputs for one patient; fields are None when a model isn't trained."""
+    seqn: int
+    predicted_systolic_bp: Optional[float] = None
+    systolic_risk_status: Optional[str] = None
+    predicted_hba1c: Optional[float] = None
+    hba1c_category: Optional[str] = None
+    ckd_risk_probability: Optional[float] = None
+    ckd_high_risk: Optional[bool] = None
+    metabolic_cluster: Optional[int] = None
+    metabolic_phenotype: Optional[str] = None
+
+
+class PredictionBatchRequest(BaseModel):
+    """SEQNs to score in one call."""
+    seqns: list[int] = Field(..., min_length=1, max_length=1000)
+
+
+class PredictionBatchResponse(BaseModel):
+    """Batch prediction results in request order."""
+    items: list[PatientPredictions]
+    missing: list[int] = []
+    unavailable_models: list[str] = []
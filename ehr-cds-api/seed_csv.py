@@ -0,0 +1,85 @@
+"""
+Reading NHANES CSVs into model columns.
+
+Shared by the full seeder (seed_db.py), the incremental sync (seed_sync.py)
+and the synthetic data generator: each maps a file's upper-cased headers
+onto a model's columns and cleans the values the same way.
+"""
+import numpy as np
+import pandas as pd
+
+from snapshot import read_table
+
+
+# CSV headers that don't follow the "upper-cased column name" convention.
+# Candidates are tried in order; the first one present in the file wins.
+CSV_COLUMN_ALIASES = {
+    "urxucr": ["URXUCR.x", "URXUCR"],
+}
+
+
+def clean_int_column(series: pd.Series) -> pd.Series:
+    """Coerce a column to nullable integers, truncating floats and nulling bad values."""
+    numeric = pd.to_numeric(series, errors="coerce")
+    return np.trunc(numeric).astype("Int64")
+
+
+def clean_float_column(series: pd.Series) -> pd.Series:
+    """Coerce a column to floats, nulling bad values."""
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+
+def clean_str_column(series: pd.Series) -> pd.Series:
+    """Coerce a column to strings, keeping NaN as missing."""
+    return series.map(str, na_action="ignore")
+
+
+def clean_column(series: pd.Series, python_type: type) -> pd.Series:
+    """Clean a CSV column according to the target column's Python type."""
+    if python_type is int:
+        return clean_int_column(series)
+    if python_type is float:
+        return clean_float_column(series)
+    return clean_str_column(series)
+
+
+def csv_columns(model) -> list[str]:
+    """Every CSV header that could feed one of the model's columns."""
+    columns = []
+    for column in model.__table__.columns:
+        if column.autoincrement is not True:
+            columns.extend(CSV_COLUMN_ALIASES.get(column.name, [column.name.upper()]))
+    return columns
+
+
+def clean_frame(df: pd.DataFrame, model) -> pd.DataFrame:
+    """Map a raw NHANES frame onto a model's columns, cleaning each in one vectorized pass."""
+    columns = {}
+    for column in model.__table__.columns:
+        if column.autoincrement is True:
+            continue
+        candidates = CSV_COLUMN_ALIASES.get(column.name, [column.name.upper()])
+        csv_column = next((c for c in candidates if c in df.columns), None)
+        if csv_column is None:
+            series = pd.Series([None] * len(df), index=df.index, dtype=object)
+        else:
+            series = df[csv_column]
+        columns[column.name] = clean_column(series, column.type.python_type)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def rows_from_frame(df: pd.DataFrame) -> list[dict]:
+    """Plain-Python dicts (None for missing values) ready for executemany."""
+    columns = [df[name].astype(object).where(df[name].notna(), None).tolist() for name in df.columns]
+    names = list(df.columns)
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def frame_to_rows(df: pd.DataFrame, model) -> list[dict]:
+    """Map a raw NHANES frame onto a model's columns as rows ready for executemany."""
+    return rows_from_frame(clean_frame(df, model))
+
+
+def read_csv(csv_path: str, filename: str, model) -> pd.DataFrame:
+    """Read the columns of an NHANES table that the model stores."""
+    return read_table(csv_path, filename, csv_columns(model))
@@ -2,317 +2,311 @@
 Database seeding script to load CSV data into SQLite database.
 Run this script to initialize the database with NHANES data.
 """
+import argparse
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+import numpy as np
 import pandas as pd
+from filelock import FileLock, Timeout
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session
-from database import engine, SessionLocal, Base
-from models import Demographic, Examination, Labs, Diet, Questionnaire, Medication
+from cache import invalidate_patient_caches
+from database import engine, SessionLocal, Base, is_sqlite_file
+from medication_search import drop_medication_search, ensure_medication_search
+from models import (
+    Demographic, Examination, Labs, Diet, Questionnaire, Medication, PatientSummary, PatientTreatment
+)
 from config import get_settings
-import math
+from seed_csv import frame_to_rows, read_csv
+from seed_sync import record_seed_state, sync_seed_data
+from summary import rebuild_patient_summaries
+from treatment import rebuild_patient_treatments
 
 
-def clean_value(val):
-    """Clean NaN/None values for database insertion."""
-    if pd.isna(val):
-        return None
-    if isinstance(val, float) and math.isnan(val):
-        return None
-    return val
+class SeedProgress:
+    """
+    Thread-safe progress of the current seeding run.
 
+    The ETA weights each table by its CSV size, so a large medications file
+    counts for more of the remaining work than a small demographics file.
+    """
 
-def clean_int(val):
-    """Clean and convert to int, handling NaN."""
-    if pd.isna(val):
-        return None
-    try:
-        return int(val)
-    except (ValueError, TypeError):
-        return None
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "pending"  # pending -> [waiting ->] seeding -> ready | failed
+        self.error: Optional[str] = None
+        self.table: Optional[str] = None
+        self.table_rows = 0
+        self.table_total = 0
+        self.tables_done: dict[str, int] = {}
+        self._weights: dict[str, float] = {}
+        self._done_weight = 0.0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
 
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
 
-def clean_float(val):
-    """Clean and convert to float, handling NaN."""
-    if pd.isna(val):
-        return None
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return None
+    def wait(self):
+        """Another process holds the seed lock; this one waits for it."""
+        with self._lock:
+            self.state = "waiting"
+
+    def start(self, weights: dict[str, float]):
+        """Begin a seeding run over tables weighted by their input size."""
+        with self._lock:
+            self.state = "seeding"
+            self._weights = weights
+            self._started_at = time.monotonic()
+
+    def begin_table(self, table: str, total_rows: int):
+        with self._lock:
+            self.table = table
+            self.table_rows = 0
+            self.table_total = total_rows
+
+    def advance(self, rows: int):
+        with self._lock:
+            self.table_rows += rows
+
+    def end_table(self):
+        with self._lock:
+            if self.table is not None:
+                self.tables_done[self.table] = self.table_rows
+                self._done_weight += self._weights.get(self.table, 0.0)
+            self.table = None
+
+    def finish(self, error: Optional[Exception] = None):
+        with self._lock:
+            self.state = "failed" if error else "ready"
+            self.error = str(error) if error else None
+            self.table = None
+            self._finished_at = time.monotonic()
+
+    def _fraction_done(self) -> float:
+        total = sum(self._weights.values())
+        if not total:
+            return 0.0
+        done = self._done_weight
+        if self.table is not None and self.table_total:
+            done += self._weights.get(self.table, 0.0) * self.table_rows / self.table_total
+        return min(done / total, 1.0)
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until seeding finishes, or None before there's a rate."""
+        with self._lock:
+            if self.state != "seeding" or self._started_at is None:
+                return None
+            fraction = self._fraction_done()
+            if fraction <= 0:
+                return None
+            elapsed = time.monotonic() - self._started_at
+            return elapsed * (1 - fraction) / fraction
 
+    def snapshot(self) -> dict:
+        eta = self.eta_seconds()
+        with self._lock:
+            end = self._finished_at or time.monotonic()
+            return {
+                "state": self.state,
+                "table": self.table,
+                "table_rows_loaded": self.table_rows if self.table else None,
+                "table_rows_total": self.table_total if self.table else None,
+                "tables_loaded": dict(self.tables_done),
+                "percent": round(self._fraction_done() * 100, 1) if self.state == "seeding" else None,
+                "elapsed_seconds": round(end - self._started_at, 2) if self._started_at else None,
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "error": self.error,
+            }
 
-def clean_str(val):
-    """Clean and convert to string, handling NaN."""
-    if pd.isna(val):
-        return None
-    return str(val)
 
+# Progress of the seeding run in this process, reported by /api/health
+seed_progress = SeedProgress()
 
-def seed_demographics(db: Session, csv_path: str):
+
+def bulk_insert(db: Session, model, rows: list[dict], chunk_size: int) -> int:
+    """Insert rows with Core executemany in chunks of ``chunk_size``."""
+    stmt = insert(model.__table__)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        db.execute(stmt, chunk)
+        seed_progress.advance(len(chunk))
+    db.commit()
+    return len(rows)
+
+
+def filter_known_seqns(db: Session, df: pd.DataFrame) -> pd.DataFrame:
+    """Keep only rows whose SEQN exists in the demographics table."""
+    existing_seqns = np.fromiter(db.scalars(select(Demographic.seqn)), dtype=np.int64)
+    seqns = pd.to_numeric(df["SEQN"], errors="coerce")
+    return df[seqns.isin(existing_seqns)]
+
+
+def seed_table(
+    db: Session,
+    csv_path: str,
+    filename: str,
+    model,
+    chunk_size: int,
+    filter_seqns: bool = True,
+) -> int:
+    """Load one CSV into its table and return the number of rows inserted."""
+    df = read_csv(csv_path, filename, model)
+    if filter_seqns:
+        df = filter_known_seqns(db, df)
+    else:
+        df = df[pd.to_numeric(df["SEQN"], errors="coerce").notna()]
+    rows = frame_to_rows(df, model)
+    seed_progress.begin_table(model.__tablename__, len(rows))
+    return bulk_insert(db, model, rows, chunk_size)
+
+
+def seed_demographics(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed demographics table from CSV."""
     print("Loading demographics...")
-    df = pd.read_csv(os.path.join(csv_path, "demographic.csv"), encoding='latin-1')
-    
-    for _, row in df.iterrows():
-        demo = Demographic(
-            seqn=clean_int(row.get("SEQN")),
-            riagendr=clean_int(row.get("RIAGENDR")),
-            ridageyr=clean_int(row.get("RIDAGEYR")),
-            ridreth1=clean_int(row.get("RIDRETH1")),
-            ridreth3=clean_int(row.get("RIDRETH3")),
-            dmdeduc2=clean_int(row.get("DMDEDUC2")),
-            dmdeduc3=clean_int(row.get("DMDEDUC3")),
-            dmdmartl=clean_int(row.get("DMDMARTL")),
-            indhhin2=clean_int(row.get("INDHHIN2")),
-            wtint2yr=clean_float(row.get("WTINT2YR")),
-            wtmec2yr=clean_float(row.get("WTMEC2YR")),
-        )
-        db.add(demo)
-    
-    db.commit()
-    print(f"  Loaded {len(df)} demographic records")
+    count = seed_table(db, csv_path, "demographic.csv", Demographic, chunk_size, filter_seqns=False)
+    print(f"  Loaded {count} demographic records")
+    return count
 
 
-def seed_examinations(db: Session, csv_path: str):
+def seed_examinations(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed examinations table from CSV."""
     print("Loading examinations...")
-    df = pd.read_csv(os.path.join(csv_path, "examination.csv"), encoding='latin-1')
-    
-    # Get existing SEQNs from demographics
-    existing_seqns = {d.seqn for d in db.query(Demographic.seqn).all()}
-    
-    count = 0
-    for _, row in df.iterrows():
-        seqn = clean_int(row.get("SEQN"))
-        if seqn not in existing_seqns:
-            continue
-            
-        exam = Examination(
-            seqn=seqn,
-            bpxsy1=clean_int(row.get("BPXSY1")),
-            bpxdi1=clean_int(row.get("BPXDI1")),
-            bpxsy2=clean_int(row.get("BPXSY2")),
-            bpxdi2=clean_int(row.get("BPXDI2")),
-            bpxsy3=clean_int(row.get("BPXSY3")),
-            bpxdi3=clean_int(row.get("BPXDI3")),
-            bpxsy4=clean_int(row.get("BPXSY4")),
-            bpxdi4=clean_int(row.get("BPXDI4")),
-            bpxpls=clean_int(row.get("BPXPLS")),
-            bmxwt=clean_float(row.get("BMXWT")),
-            bmxht=clean_float(row.get("BMXHT")),
-            bmxbmi=clean_float(row.get("BMXBMI")),
-            bmxwaist=clean_float(row.get("BMXWAIST")),
-            bmxarmc=clean_float(row.get("BMXARMC")),
-            bmxleg=clean_float(row.get("BMXLEG")),
-            bmxarml=clean_float(row.get("BMXARML")),
-            mgxh1t1=clean_float(row.get("MGXH1T1")),
-            mgxh2t1=clean_float(row.get("MGXH2T1")),
-        )
-        db.add(exam)
-        count += 1
-    
-    db.commit()
+    count = seed_table(db, csv_path, "examination.csv", Examination, chunk_size)
     print(f"  Loaded {count} examination records")
+    return count
 
 
-def seed_labs(db: Session, csv_path: str):
+def seed_labs(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed labs table from CSV."""
     print("Loading labs...")
-    df = pd.read_csv(os.path.join(csv_path, "labs.csv"), encoding='latin-1')
-    
-    existing_seqns = {d.seqn for d in db.query(Demographic.seqn).all()}
-    
-    count = 0
-    for _, row in df.iterrows():
-        seqn = clean_int(row.get("SEQN"))
-        if seqn not in existing_seqns:
-            continue
-            
-        lab = Labs(
-            seqn=seqn,
-            urxuma=clean_float(row.get("URXUMA")),
-            urxucr=clean_float(row.get("URXUCR.x") or row.get("URXUCR")),
-            lbxscr=clean_float(row.get("LBXSCR")),
-            lbxsgl=clean_float(row.get("LBXSGL")),
-            lbxgh=clean_float(row.get("LBXGH")),
-            lbxglt=clean_float(row.get("LBXGLT")),
-            lbxin=clean_float(row.get("LBXIN")),
-            lbxtc=clean_float(row.get("LBXTC")),
-            lbdldl=clean_float(row.get("LBDLDL")),
-            lbdhdd=clean_float(row.get("LBDHDD")),
-            lbxtr=clean_float(row.get("LBXTR")),
-            lbxwbcsi=clean_float(row.get("LBXWBCSI")),
-            lbxrbcsi=clean_float(row.get("LBXRBCSI")),
-            lbxhgb=clean_float(row.get("LBXHGB")),
-            lbxhct=clean_float(row.get("LBXHCT")),
-            lbxmcvsi=clean_float(row.get("LBXMCVSI")),
-            lbxpltsi=clean_float(row.get("LBXPLTSI")),
-            lbxsatsi=clean_float(row.get("LBXSATSI")),
-            lbxsassi=clean_float(row.get("LBXSASSI")),
-            lbxsca=clean_float(row.get("LBXSCA")),
-            lbxsph=clean_float(row.get("LBXSPH")),
-            lbxsua=clean_float(row.get("LBXSUA")),
-            lbxstp=clean_float(row.get("LBXSTP")),
-            lbxsal=clean_float(row.get("LBXSAL")),
-            lbxstb=clean_float(row.get("LBXSTB")),
-            lbxsbu=clean_float(row.get("LBXSBU")),
-            lbxbpb=clean_float(row.get("LBXBPB")),
-            lbxbcd=clean_float(row.get("LBXBCD")),
-            lbxthg=clean_float(row.get("LBXTHG")),
-        )
-        db.add(lab)
-        count += 1
-    
-    db.commit()
+    count = seed_table(db, csv_path, "labs.csv", Labs, chunk_size)
     print(f"  Loaded {count} lab records")
+    return count
 
 
-def seed_diet(db: Session, csv_path: str):
+def seed_diet(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed diet table from CSV."""
     print("Loading diet...")
-    df = pd.read_csv(os.path.join(csv_path, "diet.csv"), encoding='latin-1')
-    
-    existing_seqns = {d.seqn for d in db.query(Demographic.seqn).all()}
-    
-    count = 0
-    for _, row in df.iterrows():
-        seqn = clean_int(row.get("SEQN"))
-        if seqn not in existing_seqns:
-            continue
-            
-        diet = Diet(
-            seqn=seqn,
-            dr1tkcal=clean_float(row.get("DR1TKCAL")),
-            dr1tprot=clean_float(row.get("DR1TPROT")),
-            dr1tcarb=clean_float(row.get("DR1TCARB")),
-            dr1ttfat=clean_float(row.get("DR1TTFAT")),
-            dr1tsfat=clean_float(row.get("DR1TSFAT")),
-            dr1tmfat=clean_float(row.get("DR1TMFAT")),
-            dr1tpfat=clean_float(row.get("DR1TPFAT")),
-            dr1tchol=clean_float(row.get("DR1TCHOL")),
-            dr1tfibe=clean_float(row.get("DR1TFIBE")),
-            dr1tsugr=clean_float(row.get("DR1TSUGR")),
-            dr1tsodi=clean_float(row.get("DR1TSODI")),
-            dr1tpota=clean_float(row.get("DR1TPOTA")),
-            dr1tcalc=clean_float(row.get("DR1TCALC")),
-            dr1tiron=clean_float(row.get("DR1TIRON")),
-            dr1tzinc=clean_float(row.get("DR1TZINC")),
-            dr1tmagn=clean_float(row.get("DR1TMAGN")),
-            dr1tvb12=clean_float(row.get("DR1TVB12")),
-            dr1tvb6=clean_float(row.get("DR1TVB6")),
-            dr1tvc=clean_float(row.get("DR1TVC")),
-            dr1tvd=clean_float(row.get("DR1TVD")),
-            dr1tfola=clean_float(row.get("DR1TFOLA")),
-            dr1_300=clean_int(row.get("DR1_300")),
-            dr1_330=clean_int(row.get("DR1_330")),
-            drabf=clean_int(row.get("DRABF")),
-        )
-        db.add(diet)
-        count += 1
-    
-    db.commit()
+    count = seed_table(db, csv_path, "diet.csv", Diet, chunk_size)
     print(f"  Loaded {count} diet records")
+    return count
 
 
-def seed_questionnaires(db: Session, csv_path: str):
+def seed_questionnaires(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed questionnaires table from CSV."""
     print("Loading questionnaires...")
-    df = pd.read_csv(os.path.join(csv_path, "questionnaire.csv"), encoding='latin-1')
-    
-    existing_seqns = {d.seqn for d in db.query(Demographic.seqn).all()}
-    
-    count = 0
-    for _, row in df.iterrows():
-        seqn = clean_int(row.get("SEQN"))
-        if seqn not in existing_seqns:
-            continue
-            
-        quest = Questionnaire(
-            seqn=seqn,
-            bpq020=clean_int(row.get("BPQ020")),
-            bpq030=clean_int(row.get("BPQ030")),
-            bpq040a=clean_int(row.get("BPQ040A")),
-            diq010=clean_int(row.get("DIQ010")),
-            diq050=clean_int(row.get("DIQ050")),
-            diq070=clean_int(row.get("DIQ070")),
-            mcq160b=clean_int(row.get("MCQ160B")),
-            mcq160c=clean_int(row.get("MCQ160C")),
-            mcq160d=clean_int(row.get("MCQ160D")),
-            mcq160e=clean_int(row.get("MCQ160E")),
-            mcq160f=clean_int(row.get("MCQ160F")),
-            kiq022=clean_int(row.get("KIQ022")),
-            smq020=clean_int(row.get("SMQ020")),
-            smq040=clean_int(row.get("SMQ040")),
-            alq101=clean_int(row.get("ALQ101")),
-            alq120q=clean_int(row.get("ALQ120Q")),
-            paq605=clean_int(row.get("PAQ605")),
-            paq620=clean_int(row.get("PAQ620")),
-            paq650=clean_int(row.get("PAQ650")),
-            paq665=clean_int(row.get("PAQ665")),
-            dpq010=clean_int(row.get("DPQ010")),
-            dpq020=clean_int(row.get("DPQ020")),
-            dpq030=clean_int(row.get("DPQ030")),
-            dpq040=clean_int(row.get("DPQ040")),
-            dpq050=clean_int(row.get("DPQ050")),
-            dpq060=clean_int(row.get("DPQ060")),
-            dpq070=clean_int(row.get("DPQ070")),
-            dpq080=clean_int(row.get("DPQ080")),
-            dpq090=clean_int(row.get("DPQ090")),
-            whd010=clean_float(row.get("WHD010")),
-            whd020=clean_float(row.get("WHD020")),
-        )
-        db.add(quest)
-        count += 1
-    
-    db.commit()
+    count = seed_table(db, csv_path, "questionnaire.csv", Questionnaire, chunk_size)
     print(f"  Loaded {count} questionnaire records")
+    return count
 
 
-def seed_medications(db: Session, csv_path: str):
+def seed_medications(db: Session, csv_path: str, chunk_size: int = 5000) -> int:
     """Seed medications table from CSV."""
     print("Loading medications...")
-    df = pd.read_csv(os.path.join(csv_path, "medications.csv"), encoding='latin-1')
-    
-    existing_seqns = {d.seqn for d in db.query(Demographic.seqn).all()}
+    count = seed_table(db, csv_path, "medications.csv", Medication, chunk_size)
+    print(f"  Loaded {count} medication records")
+    return count
+
+
+SEED_STEPS = [
+    ("demographics", "demographic.csv", seed_demographics),
+    ("examinations", "examination.csv", seed_examinations),
+    ("labs", "labs.csv", seed_labs),
+    ("diet", "diet.csv", seed_diet),
+    ("questionnaires", "questionnaire.csv", seed_questionnaires),
+    ("medications", "medications.csv", seed_medications),
+]
+
+
+def seed_weights(csv_path: str) -> dict[str, float]:
+    """Relative cost of each seeding step, by table name, from the CSV sizes."""
+    weights = {}
+    for table, filename, _ in SEED_STEPS:
+        path = os.path.join(csv_path, filename)
+        weights[table] = float(os.path.getsize(path)) if os.path.exists(path) else 0.0
+    return weights
+
+
+def print_benchmark(timings: list[tuple[str, int, float]]):
+    """Print per-table seeding throughput."""
+    print("\nSeeding benchmark:")
+    print(f"  {'table':<16}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for table, rows, elapsed in timings:
+        rate = rows / elapsed if elapsed > 0 else float("inf")
+        print(f"  {table:<16}{rows:>10}{elapsed:>10.3f}{rate:>12.0f}")
+    total_rows = sum(t[1] for t in timings)
+    total_time = sum(t[2] for t in timings)
+    total_rate = total_rows / total_time if total_time > 0 else float("inf")
+    print(f"  {'total':<16}{total_rows:>10}{total_time:>10.3f}{total_rate:>12.0f}")
+
+
+def ensure_indexes(bind) -> list[str]:
+    """
+    Create declared indexes missing from existing tables.
     
-    count = 0
-    for _, row in df.iterrows():
-        seqn = clean_int(row.get("SEQN"))
-        if seqn not in existing_seqns:
-            continue
-            
-        med = Medication(
-            seqn=seqn,
-            rxduse=clean_int(row.get("RXDUSE")),
-            rxddrug=clean_str(row.get("RXDDRUG")),
-            rxddrgid=clean_str(row.get("RXDDRGID")),
-            rxqseen=clean_int(row.get("RXQSEEN")),
-            rxddays=clean_int(row.get("RXDDAYS")),
-            rxdrsc1=clean_str(row.get("RXDRSC1")),
-            rxdrsc2=clean_str(row.get("RXDRSC2")),
-            rxdrsc3=clean_str(row.get("RXDRSC3")),
-            rxdrsd1=clean_str(row.get("RXDRSD1")),
-            rxdrsd2=clean_str(row.get("RXDRSD2")),
-            rxdrsd3=clean_str(row.get("RXDRSD3")),
-            rxdcount=clean_int(row.get("RXDCOUNT")),
-        )
-        db.add(med)
-        count += 1
+    ``create_all`` skips tables that already exist, so an index added to a
+    model later would never reach a database seeded before it.
+    """
+    created = []
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind)
+                created.append(index.name)
+    return created
+
+
+def update_planner_stats(conn, force: bool = False) -> bool:
+    """
+    Run ANALYZE on SQLite when forced or when no statistics exist yet.
     
-    db.commit()
-    print(f"  Loaded {count} medication records")
+    Without them the planner can't tell a selective filter index from one
+    that matches half the table, and may sort instead of scanning by SEQN.
+    The caller commits.
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    if not force and conn.scalar(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")):
+        return False
+    conn.execute(text("ANALYZE"))
+    return True
 
 
-def init_db():
-    """Initialize database and seed with CSV data."""
+def init_db(benchmark: bool = False, reset: bool = False, sync: bool = False):
+    """
+    Initialize database and seed with CSV data.
+    
+    A database that already has patients is left as is, unless ``sync`` (or
+    SEED_SYNC) is set: then changed CSVs are applied incrementally.
+    """
     settings = get_settings()
     csv_path = settings.csv_data_path
+    chunk_size = settings.seed_chunk_size
     
     print(f"Initializing database...")
     print(f"CSV data path: {csv_path}")
     
+    if reset:
+        with engine.begin() as conn:
+            drop_medication_search(conn)
+        Base.metadata.drop_all(bind=engine)
+        print("Existing tables dropped")
+    
     # Create all tables
     Base.metadata.create_all(bind=engine)
     print("Tables created successfully")
+    created_indexes = ensure_indexes(engine)
+    if created_indexes:
+        print(f"Created indexes: {', '.join(created_indexes)}")
     
     # Seed data
     db = SessionLocal()
@@ -320,25 +314,143 @@ def init_db():
         # Check if data already exists
         existing_count = db.query(Demographic).count()
         if existing_count > 0:
-            print(f"Database already contains {existing_count} records. Skipping seed.")
+            if sync or settings.seed_sync:
+                print(f"Database already contains {existing_count} records. Syncing changed CSVs...")
+                sync_seed_data(db, csv_path, chunk_size)
+                existing_count = db.query(Demographic).count()
+            else:
+                print(f"Database already contains {existing_count} records. Skipping seed.")
+            if db.query(PatientSummary).count() != existing_count:
+                count = rebuild_patient_summaries(db, chunk_size)
+                print(f"  Rebuilt {count} patient summaries")
+            if db.query(PatientTreatment).count() != existing_count:
+                count = rebuild_patient_treatments(db, chunk_size)
+                print(f"  Rebuilt {count} patient treatment rows")
+            if ensure_medication_search(db.connection()):
+                db.commit()
+                print("  Built medication search index")
+            if update_planner_stats(db.connection(), force=bool(created_indexes)):
+                db.commit()
+                print("  Updated query planner statistics")
+            seed_progress.finish()
             return
         
-        seed_demographics(db, csv_path)
-        seed_examinations(db, csv_path)
-        seed_labs(db, csv_path)
-        seed_diet(db, csv_path)
-        seed_questionnaires(db, csv_path)
-        seed_medications(db, csv_path)
+        seed_progress.start(seed_weights(csv_path))
+        timings = []
+        for table, _, seed in SEED_STEPS:
+            started = time.perf_counter()
+            rows = seed(db, csv_path, chunk_size)
+            seed_progress.end_table()
+            timings.append((table, rows, time.perf_counter() - started))
+        
+        print("Building patient summaries...")
+        started = time.perf_counter()
+        seed_progress.begin_table(PatientSummary.__tablename__, 0)
+        rows = rebuild_patient_summaries(db, chunk_size)
+        seed_progress.advance(rows)
+        seed_progress.end_table()
+        timings.append(("patient_summary", rows, time.perf_counter() - started))
+        print(f"  Built {rows} patient summaries")
+        
+        print("Building patient treatment status...")
+        started = time.perf_counter()
+        seed_progress.begin_table(PatientTreatment.__tablename__, 0)
+        rows = rebuild_patient_treatments(db, chunk_size)
+        seed_progress.advance(rows)
+        seed_progress.end_table()
+        timings.append(("patient_treatment", rows, time.perf_counter() - started))
+        print(f"  Built {rows} patient treatment rows")
+        
+        print("Building medication search index...")
+        started = time.perf_counter()
+        ensure_medication_search(db.connection())
+        db.commit()
+        indexed = next(rows for table, rows, _ in timings if table == "medications")
+        timings.append(("medications_fts", indexed, time.perf_counter() - started))
+        
+        started = time.perf_counter()
+        rows = record_seed_state(db, csv_path)
+        timings.append(("seed_row_hashes", rows, time.perf_counter() - started))
+        
+        update_planner_stats(db.connection(), force=True)
+        db.commit()
+        
+        # Anything cached while the tables were filling is stale now
+        invalidate_patient_caches()
+        seed_progress.finish()
         
         print("\nDatabase seeding complete!")
+        if benchmark:
+            print_benchmark(timings)
         
     except Exception as e:
         db.rollback()
+        seed_progress.finish(error=e)
         print(f"Error seeding database: {e}")
         raise
     finally:
         db.close()
 
 
+def seed_lock_path() -> str:
+    """Lock file next to a SQLite database, or in the temp dir for other backends."""
+    settings = get_settings()
+    if settings.seed_lock_file:
+        return settings.seed_lock_file
+    if is_sqlite_file(settings.database_url):
+        return os.path.abspath(make_url(settings.database_url).database) + ".seed.lock"
+    return os.path.join(tempfile.gettempdir(), "ehr_cds.seed.lock")
+
+
+@contextmanager
+def seed_lock():
+    """
+    Hold the cross-process seed lock for the duration of the block.
+
+    Every worker of a multi-process server runs ``init_db`` at startup; the
+    lock makes one of them seed while the others wait and then find the
+    data already there. Yields the seconds spent waiting.
+    """
+    lock = FileLock(seed_lock_path())
+    started = time.perf_counter()
+    try:
+        lock.acquire(blocking=False)
+    except Timeout:
+        print(f"Waiting for another process to finish seeding ({lock.lock_file})...")
+        seed_progress.wait()
+        lock.acquire()
+    try:
+        yield time.perf_counter() - started
+    finally:
+        lock.release()
+
+
+def start_background_seed() -> threading.Thread:
+    """Run ``init_db`` on a daemon thread; progress is reported via ``seed_progress``."""
+    def run():
+        started = time.perf_counter()
+        try:
+            with seed_lock() as waited:
+                init_db()
+            print(
+                f"[worker {os.getpid()}] Database ready in {time.perf_counter() - started:.2f}s "
+                f"({waited:.2f}s waiting for the seed lock)"
+            )
+        except Exception as e:
+            if seed_progress.state != "failed":
+                seed_progress.finish(error=e)
+                print(f"Error initializing database: {e}")
+
+    thread = threading.Thread(target=run, name="db-seed", daemon=True)
+    thread.start()
+    return thread
+
+
 if __name__ == "__main__":
-    init_db()
+    parser = argparse.ArgumentParser(description="Seed the EHR database from NHANES CSV files.")
+    parser.add_argument("--benchmark", action="store_true", help="report rows/s per table")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--sync", action="store_true", help="apply changed CSVs to an already seeded database")
+    args = parser.parse_args()
+    with seed_lock():
+        init_db(benchmark=args.benchmark, reset=args.reset, sync=args.sync)
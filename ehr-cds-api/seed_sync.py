@@ -0,0 +1,341 @@
+"""
+Incremental re-seeding from updated NHANES CSVs.
+
+A full seed records each CSV's checksum in ``seed_files`` and a hash of
+every row it loaded in ``seed_row_hashes``. ``sync_seed_data`` skips files
+whose checksum hasn't changed; for the others it diffs the file's rows
+against the recorded hashes by key (SEQN, or SEQN and drug name for
+medications) and applies only the inserts, updates and deletes, in
+transactions of ``seed_chunk_size`` rows. The summary and treatment rows of
+every patient touched are then recomputed.
+
+Only rows recorded as loaded from a CSV are ever updated or deleted, so
+patients created through the API are left alone. A new CSV row whose SEQN
+the API has already given to a patient (a new extract continuing the SEQN
+range, say) is skipped and reported rather than inserted over it, along
+with that SEQN's rows in the other files. On a database seeded
+before hashes were recorded, the first sync compares the CSVs with the
+rows currently in the database instead, and can't tell a row removed
+from a CSV from one added through the API, so it deletes nothing.
+
+    python seed_db.py --sync
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from cache import invalidate_patient_caches
+from models import (
+    Demographic, Examination, Labs, Diet, Questionnaire, Medication, PatientSummary, PatientTreatment,
+    SeedFile, SeedRowHash,
+)
+from seed_csv import clean_column, clean_frame, read_csv, rows_from_frame
+from snapshot import csv_checksum, load_manifest, save_manifest
+from summary import refresh_patient_summaries
+from treatment import refresh_patient_treatments
+
+# Demographics first: the other tables only keep rows for known patients
+SYNC_TABLES = [
+    (Demographic, "demographic.csv"),
+    (Examination, "examination.csv"),
+    (Labs, "labs.csv"),
+    (Diet, "diet.csv"),
+    (Questionnaire, "questionnaire.csv"),
+    (Medication, "medications.csv"),
+]
+
+
+@dataclass
+class TableChanges:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: int = 0  # New CSV rows whose key is already taken by a row not loaded from a CSV
+    unchanged: bool = False  # File checksum matched; the table wasn't diffed
+
+
+# ============ Keys and Hashes ============
+
+def row_keys(frame: pd.DataFrame, model) -> pd.Series:
+    """
+    Stable key of each row: the SEQN, or for medications the SEQN, drug name
+    and how many earlier rows of the same patient had that drug.
+    """
+    seqns = frame["seqn"].astype("int64").astype(str)
+    if model is not Medication:
+        return seqns
+    drugs = frame["rxddrug"].fillna("")
+    occurrence = frame.groupby([frame["seqn"], drugs], sort=False).cumcount()
+    return seqns + "|" + drugs + "|" + occurrence.astype(str)
+
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of each row's values, signed so SQLite can store it."""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def source_frame(csv_path: str, filename: str, model, known_seqns: Optional[np.ndarray]) -> pd.DataFrame:
+    """
+    A CSV cleaned into the model's columns, keeping the rows the seeder would
+    load: rows with a SEQN, belonging to ``known_seqns`` unless this is the
+    demographics file. Indexed by row key.
+    """
+    frame = clean_frame(read_csv(csv_path, filename, model), model)
+    frame = frame[frame["seqn"].notna()]
+    if known_seqns is not None:
+        frame = frame[frame["seqn"].isin(known_seqns)]
+    if model is not Medication:
+        frame = frame.drop_duplicates("seqn")
+    return frame.set_index(row_keys(frame, model)).rename_axis("row_key")
+
+
+def database_frame(db: Session, model) -> pd.DataFrame:
+    """The table's rows as cleaned frames, keyed like ``source_frame``; medications keep their ids."""
+    columns = [c for c in model.__table__.columns if c.autoincrement is not True]
+    stmt = select(*columns)
+    if model is Medication:
+        stmt = select(Medication.id, *columns).order_by(Medication.id)
+    frame = pd.DataFrame(db.execute(stmt).all(), columns=[c.name for c in stmt.selected_columns])
+    for column in columns:
+        frame[column.name] = clean_column(frame[column.name], column.type.python_type)
+    frame = frame[frame["seqn"].notna()]
+    return frame.set_index(row_keys(frame, model)).rename_axis("row_key")
+
+
+def recorded_hashes(db: Session, table: str) -> pd.Series:
+    rows = db.execute(
+        select(SeedRowHash.row_key, SeedRowHash.row_hash).where(SeedRowHash.table_name == table)
+    ).all()
+    return pd.Series([h for _, h in rows], index=[k for k, _ in rows], dtype="int64")
+
+
+# ============ Applying Changes ============
+
+def chunks(items, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_hashes(db: Session, table: str, hashes: pd.Series):
+    if len(hashes):
+        db.execute(insert(SeedRowHash), [
+            {"table_name": table, "row_key": key, "row_hash": int(value)} for key, value in hashes.items()
+        ])
+
+
+def forget_hashes(db: Session, table: str, keys: list[str]):
+    if keys:
+        db.execute(delete(SeedRowHash).where(SeedRowHash.table_name == table, SeedRowHash.row_key.in_(keys)))
+
+
+def apply_table_changes(
+    db: Session,
+    model,
+    source: pd.DataFrame,
+    hashes: pd.Series,
+    previous: pd.Series,
+    chunk_size: int,
+    apply_deletes: bool = True,
+) -> tuple[TableChanges, set[int], list[str]]:
+    """
+    Apply the difference between ``previous`` and ``hashes`` to the table,
+    committing every ``chunk_size`` rows. Returns the counts, the touched
+    SEQNs and the keys of new rows skipped because the key is already taken.
+    """
+    table = model.__table__
+    name = model.__tablename__
+    inserted = hashes.index.difference(previous.index)
+    common = hashes.index.intersection(previous.index)
+    updated = common[hashes[common].to_numpy() != previous[common].to_numpy()]
+    deleted = previous.index.difference(hashes.index) if apply_deletes else previous.index[:0]
+    if model is Demographic:
+        # Patients go last, after the other tables have dropped their rows
+        deleted = previous.index[:0]
+
+    skipped = taken_keys(db, model, inserted, chunk_size)
+    if skipped:
+        inserted = inserted.difference(skipped)
+
+    touched = set()
+    ids = None
+    if model is Medication and (len(updated) or len(deleted)):
+        current = database_frame(db, Medication)
+        ids = current["id"]
+
+    for keys in chunks(inserted, chunk_size):
+        rows = source.loc[keys]
+        db.execute(insert(table), rows_from_frame(rows))
+        write_hashes(db, name, hashes[keys])
+        touched.update(rows["seqn"].astype(int).tolist())
+        db.commit()
+
+    for keys in chunks(updated, chunk_size):
+        rows = source.loc[keys]
+        if model is Medication:
+            key_column, params = "id", [{"b_key": int(ids[k]), **row} for k, row in zip(keys, rows_from_frame(rows))]
+        else:
+            key_column, params = "seqn", [{"b_key": row["seqn"], **row} for row in rows_from_frame(rows)]
+        db.execute(update(table).where(table.c[key_column] == bindparam("b_key")), params)
+        forget_hashes(db, name, list(keys))
+        write_hashes(db, name, hashes[keys])
+        touched.update(rows["seqn"].astype(int).tolist())
+        db.commit()
+
+    for keys in chunks(deleted, chunk_size):
+        seqns = [int(key.split("|")[0]) for key in keys]
+        if model is Medication:
+            db.execute(delete(table).where(table.c.id.in_([int(ids[k]) for k in keys if k in ids.index])))
+        else:
+            db.execute(delete(table).where(table.c.seqn.in_(seqns)))
+        forget_hashes(db, name, list(keys))
+        touched.update(seqns)
+        db.commit()
+
+    return TableChanges(len(inserted), len(updated), len(deleted), len(skipped)), touched, skipped
+
+
+def taken_keys(db: Session, model, keys: pd.Index, chunk_size: int) -> list[str]:
+    """
+    Keys among ``keys`` (which have no recorded hash) that already have a row,
+    e.g. a patient the API created under a SEQN a new extract now uses too.
+    Medication rows have their own ids, so only one-row-per-patient tables clash.
+    """
+    if model is Medication:
+        return []
+    taken = []
+    column = model.__table__.c.seqn
+    for batch in chunks(keys, chunk_size):
+        existing = set(db.scalars(select(column).where(column.in_([int(key) for key in batch]))))
+        taken.extend(key for key in batch if int(key) in existing)
+    return taken
+
+
+def delete_patients(db: Session, seqns: list[int], chunk_size: int) -> int:
+    """Remove patients and every row that references them, as the delete endpoint does."""
+    keys = [str(seqn) for seqn in seqns]
+    for batch in chunks(seqns, chunk_size):
+        for model in [PatientSummary, PatientTreatment, Medication, Questionnaire, Diet, Labs, Examination]:
+            db.execute(delete(model).where(model.seqn.in_(batch)))
+        db.execute(delete(Demographic).where(Demographic.seqn.in_(batch)))
+        db.commit()
+    for batch in chunks(keys, chunk_size):
+        forget_hashes(db, Demographic.__tablename__, batch)
+        db.commit()
+    return len(seqns)
+
+
+def record_file(db: Session, filename: str, checksum: str, rows: int):
+    db.merge(SeedFile(filename=filename, sha256=checksum, row_count=rows))
+    db.commit()
+
+
+# ============ Entry Points ============
+
+def record_seed_state(db: Session, csv_path: str) -> int:
+    """Record the checksums and row hashes of the CSVs a full seed just loaded; returns the hash count."""
+    manifest = load_manifest(csv_path)
+    known = np.fromiter(db.scalars(select(Demographic.seqn)), dtype=np.int64)
+    recorded = 0
+    db.execute(delete(SeedRowHash))
+    db.execute(delete(SeedFile))
+    for model, filename in SYNC_TABLES:
+        source = source_frame(csv_path, filename, model, None if model is Demographic else known)
+        write_hashes(db, model.__tablename__, pd.Series(row_hashes(source), index=source.index))
+        recorded += len(source)
+        db.add(SeedFile(
+            filename=filename, sha256=csv_checksum(csv_path, filename, manifest), row_count=len(source)
+        ))
+    db.commit()
+    try:
+        save_manifest(csv_path, manifest)
+    except OSError:
+        pass
+    return recorded
+
+
+def sync_seed_data(db: Session, csv_path: str, chunk_size: int = 5000) -> dict[str, TableChanges]:
+    """Apply changed CSVs to an already seeded database and return the changes per table."""
+    manifest = load_manifest(csv_path)
+    recorded = {row.filename: row for row in db.scalars(select(SeedFile))}
+    results: dict[str, TableChanges] = {}
+    touched: set[int] = set()
+    removed_patients: list[int] = []
+    known = None
+
+    for model, filename in SYNC_TABLES:
+        name = model.__tablename__
+        checksum = csv_checksum(csv_path, filename, manifest)
+        record = recorded.get(filename)
+        if known is None and model is not Demographic:
+            # Patients loaded from demographic.csv, the only ones other files may add rows to
+            owned = recorded_hashes(db, Demographic.__tablename__).index.astype("int64")
+            known = owned[~owned.isin(removed_patients)].to_numpy()
+        # A new or removed patient changes which rows of the other files apply
+        patients_changed = model is not Demographic and (
+            results[Demographic.__tablename__].inserted or removed_patients
+        )
+        if record is not None and record.sha256 == checksum and not patients_changed:
+            results[name] = TableChanges(unchanged=True)
+            continue
+
+        print(f"Syncing {name} from {filename}...")
+        source = source_frame(csv_path, filename, model, known)
+        hashes = pd.Series(row_hashes(source), index=source.index)
+        if record is not None:
+            previous = recorded_hashes(db, name)
+        else:
+            # Nothing recorded yet: compare against the rows in the database
+            current = database_frame(db, model)
+            current = current[current.index.isin(hashes.index)]
+            previous = pd.Series(row_hashes(current.drop(columns="id", errors="ignore")), index=current.index)
+            db.execute(delete(SeedRowHash).where(SeedRowHash.table_name == name))
+            write_hashes(db, name, previous)
+            db.commit()
+
+        changes, seqns, skipped = apply_table_changes(
+            db, model, source, hashes, previous, chunk_size, apply_deletes=record is not None
+        )
+        touched |= seqns
+        if skipped:
+            print(f"  Skipped {len(skipped)} new rows whose keys are already taken: {', '.join(skipped[:10])}"
+                  + (" ..." if len(skipped) > 10 else ""))
+        if model is Demographic:
+            if record is not None:
+                removed_patients = [int(key) for key in previous.index.difference(hashes.index)]
+            changes.deleted = len(removed_patients)
+        record_file(db, filename, checksum, len(source))
+        results[name] = changes
+
+    if removed_patients:
+        delete_patients(db, removed_patients, chunk_size)
+        touched -= set(removed_patients)
+
+    if touched:
+        print(f"Refreshing {len(touched)} patient summaries and treatment rows...")
+        for batch in chunks(sorted(touched), chunk_size):
+            refresh_patient_summaries(db, batch)
+            refresh_patient_treatments(db, batch)
+            db.commit()
+
+    try:
+        save_manifest(csv_path, manifest)
+    except OSError:
+        pass
+    if touched or removed_patients:
+        invalidate_patient_caches()
+    print_sync_summary(results)
+    return results
+
+
+def print_sync_summary(results: dict[str, TableChanges]):
+    print("\nIncremental sync:")
+    print(f"  {'table':<16}{'inserted':>10}{'updated':>10}{'deleted':>10}{'skipped':>10}")
+    for table, changes in results.items():
+        if changes.unchanged:
+            print(f"  {table:<16}{'unchanged':>40}")
+        else:
+            print(f"  {table:<16}{changes.inserted:>10}{changes.updated:>10}{changes.deleted:>10}{changes.skipped:>10}")
@@ -0,0 +1,68 @@
+"""
+Production entry point: several uvicorn workers on uvloop and httptools.
+
+Each worker process runs the app's lifespan and so tries to seed the
+database; ``seed_db.seed_lock`` lets exactly one of them seed while the
+others wait, then find the data and go straight to ready. Each worker
+logs how long it took to start and to get a ready database.
+
+A write only clears the caches of the worker that served it, so with
+in-memory caches another worker could keep returning a deleted patient or
+old totals. The launcher passes the worker count to the workers as
+WORKERS, and with more than one they run without the process-local patient
+detail, list total and cohort stats caches (see ``cache.make_cache_backend``);
+a backend shared by all workers, registered in ``cache.CACHE_BACKENDS`` and
+selected with DETAIL_CACHE_BACKEND / RESULT_CACHE_BACKEND, keeps caching.
+
+Usage (from ehr-cds-api/):
+    python serve.py --workers 4
+    WORKERS=4 python serve.py --port 8080
+
+main.py's ``python main.py`` stays the single-process, auto-reloading
+development server.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from cache import cache_backend_class
+from config import get_settings
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the EHR CDS API with multiple worker processes.")
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--loop", default="uvloop", help="uvicorn event loop implementation")
+    parser.add_argument("--http", default="httptools", help="uvicorn HTTP protocol implementation")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Workers read settings from the environment they inherit
+    os.environ["WORKERS"] = str(args.workers)
+    if args.workers > 1:
+        disabled = [
+            f"{variable}={name}"
+            for variable, name in [
+                ("DETAIL_CACHE_BACKEND", settings.detail_cache_backend),
+                ("RESULT_CACHE_BACKEND", settings.result_cache_backend),
+            ]
+            if cache_backend_class(name).process_local
+        ]
+        if disabled:
+            print(
+                f"Per-process caches disabled for {args.workers} workers: {', '.join(disabled)}. "
+                "Register a shared backend in cache.CACHE_BACKENDS to cache across workers."
+            )
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        log_level=args.log_level,
+    )
@@ -0,0 +1,32 @@
+"""
+Server-side serving of the ML notebook models.
+"""
+from config import get_settings
+from serving.batching import MicroBatcher
+from serving.inference import predict_patients, predict_features, load_features, make_batcher
+from serving.registry import ModelRegistry, ModelNotAvailable
+from serving.specs import MODEL_SPECS, ModelSpec
+
+settings = get_settings()
+
+registry = ModelRegistry(settings.model_dir)
+
+# Shared scheduler that coalesces concurrent prediction requests; None when disabled
+batcher = (
+    make_batcher(registry, settings.prediction_max_batch, settings.prediction_max_wait_ms / 1000)
+    if settings.prediction_batching
+    else None
+)
+
+__all__ = [
+    "registry",
+    "batcher",
+    "MicroBatcher",
+    "ModelRegistry",
+    "ModelNotAvailable",
+    "ModelSpec",
+    "MODEL_SPECS",
+    "predict_patients",
+    "predict_features",
+    "load_features",
+]
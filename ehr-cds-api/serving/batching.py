@@ -0,0 +1,171 @@
+"""
+Micro-batching of model inference calls.
+
+scikit-learn's ``predict`` has a large fixed cost per call, so scoring 256
+rows at once is far cheaper than 256 single-row calls. Requests submitted
+from concurrent handlers are queued and coalesced on a dedicated worker
+thread: a batch closes when it reaches ``max_batch_size`` rows or when the
+oldest request has waited ``max_wait`` seconds, whichever comes first.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+# Upper bounds of the batch-size histogram buckets (rows per batch)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+@dataclass
+class PendingRequest:
+    key: Hashable
+    frame: pd.DataFrame
+    future: Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class BatchMetrics:
+    """Batch size distribution and queue latency for the scheduler."""
+
+    def __init__(self, latency_window: int = 10000):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self.size_buckets = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_latency_sum = 0.0
+        self._recent_latencies = deque(maxlen=latency_window)
+
+    def record_batch(self, rows: int, queue_latencies: list[float]):
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.requests += len(queue_latencies)
+            bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if rows <= bound), -1)
+            self.size_buckets[bucket] += 1
+            self.queue_latency_sum += sum(queue_latencies)
+            self._recent_latencies.extend(queue_latencies)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = np.array(self._recent_latencies) * 1000
+            labels = [str(b) for b in BATCH_SIZE_BUCKETS] + ["+Inf"]
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "rows": self.rows,
+                "mean_batch_rows": round(self.rows / self.batches, 2) if self.batches else None,
+                "batch_size_histogram": dict(zip(labels, self.size_buckets)),
+                "queue_latency_ms": {
+                    "mean": round(self.queue_latency_sum * 1000 / self.requests, 3) if self.requests else None,
+                    "p50": round(float(np.percentile(recent, 50)), 3) if recent.size else None,
+                    "p95": round(float(np.percentile(recent, 95)), 3) if recent.size else None,
+                    "p99": round(float(np.percentile(recent, 99)), 3) if recent.size else None,
+                    "max": round(float(recent.max()), 3) if recent.size else None,
+                },
+            }
+
+
+class MicroBatcher:
+    """
+    Coalesces inference requests into batches on one worker thread.
+
+    ``runner(key, frame)`` is called with the concatenated rows of every
+    queued request that shares ``key`` and must return one output per row.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Hashable, pd.DataFrame], np.ndarray],
+        max_batch_size: int = 256,
+        max_wait: float = 0.005,
+    ):
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = BatchMetrics()
+        self._queue: queue.Queue[PendingRequest] = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, frame: pd.DataFrame) -> Future:
+        """Queue rows for inference; the future resolves to their outputs."""
+        self._ensure_worker()
+        request = PendingRequest(key=key, frame=frame, future=Future())
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, key: Hashable, frame: pd.DataFrame) -> np.ndarray:
+        """Submit and block until the batch containing these rows has run."""
+        return self.submit(key, frame).result()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._worker.start()
+
+    def stop(self):
+        """Stop the worker after it drains the requests already queued."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+
+    def _collect(self, first: PendingRequest) -> tuple[list[PendingRequest], bool]:
+        """Gather requests until the batch is full or the first one's deadline passes."""
+        batch = [first]
+        rows = len(first.frame)
+        deadline = first.enqueued_at + self.max_wait
+        while rows < self.max_batch_size:
+            # Requests already waiting are taken even past the deadline, so a
+            # backlog that built up during the previous batch is coalesced.
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0:
+                    request = self._queue.get_nowait()
+                else:
+                    request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            rows += len(request.frame)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            started = time.monotonic()
+
+            by_key: dict[Hashable, list[PendingRequest]] = {}
+            for request in batch:
+                by_key.setdefault(request.key, []).append(request)
+
+            for key, requests in by_key.items():
+                frame = pd.concat([r.frame for r in requests]) if len(requests) > 1 else requests[0].frame
+                try:
+                    outputs = self.runner(key, frame)
+                except Exception as e:
+                    for request in requests:
+                        request.future.set_exception(e)
+                    continue
+                offset = 0
+                for request in requests:
+                    count = len(request.frame)
+                    request.future.set_result(outputs[offset:offset + count])
+                    offset += count
+                self.metrics.record_batch(len(frame), [started - r.enqueued_at for r in requests])
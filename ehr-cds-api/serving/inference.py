@@ -0,0 +1,134 @@
+"""
+Feature extraction from the database and batched prediction.
+"""
+import warnings
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Demographic, Examination, Labs, Diet
+from serving.batching import MicroBatcher
+from serving.registry import ModelRegistry, ModelNotAvailable
+from serving.specs import (
+    FEATURE_COLUMNS, BP_MODEL, HBA1C_MODEL, CKD_MODEL, METABOLIC_MODEL, METABOLIC_PROFILES,
+)
+
+
+def load_features(db: Session, seqns: list[int]) -> pd.DataFrame:
+    """Read every model feature for the given SEQNs, indexed by SEQN in request order."""
+    stmt = (
+        select(Demographic.seqn, *FEATURE_COLUMNS.values())
+        .outerjoin(Examination, Examination.seqn == Demographic.seqn)
+        .outerjoin(Labs, Labs.seqn == Demographic.seqn)
+        .outerjoin(Diet, Diet.seqn == Demographic.seqn)
+        .where(Demographic.seqn.in_(seqns))
+    )
+    rows = db.execute(stmt).all()
+    frame = pd.DataFrame(rows, columns=["SEQN", *FEATURE_COLUMNS]).set_index("SEQN")
+    frame = frame.astype("float64")
+    return frame.reindex([s for s in dict.fromkeys(seqns) if s in frame.index])
+
+
+def hba1c_category(value: float) -> str:
+    """ADA HbA1c bands used in the diabetes notebook."""
+    if value >= 6.5:
+        return "diabetic"
+    if value >= 5.7:
+        return "prediabetic"
+    return "normal"
+
+
+def call_pipeline(registry: ModelRegistry, name: str, method: str, features: pd.DataFrame):
+    """Call ``method`` on a loaded pipeline, hiding sklearn's feature-name warnings."""
+    pipeline = registry.get(name)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return getattr(pipeline, method)(features)
+
+
+def make_batcher(registry: ModelRegistry, max_batch_size: int, max_wait: float) -> MicroBatcher:
+    """Build a micro-batcher whose requests are keyed by (model name, method)."""
+    return MicroBatcher(
+        lambda key, frame: call_pipeline(registry, key[0], key[1], frame),
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+    )
+
+
+def run_model(
+    registry: ModelRegistry,
+    spec,
+    features: pd.DataFrame,
+    method: str = "predict",
+    batcher: Optional[MicroBatcher] = None,
+):
+    """
+    Run one pipeline over the feature frame; None if the model isn't trained.
+
+    With a ``batcher`` the rows are coalesced with concurrent requests for the
+    same model and this call blocks until that batch has been scored.
+    """
+    try:
+        registry.get(spec.name)
+    except ModelNotAvailable:
+        return None
+    if batcher is not None:
+        return batcher.predict((spec.name, method), features[spec.features])
+    return call_pipeline(registry, spec.name, method, features[spec.features])
+
+
+def predict_features(
+    registry: ModelRegistry, features: pd.DataFrame, batcher: Optional[MicroBatcher] = None
+) -> tuple[list[dict], list[str]]:
+    """
+    Predict every model for a frame of patients.
+
+    Returns one prediction dict per row plus the names of models that have no
+    trained artifact (their fields are left as None).
+    """
+    if features.empty:
+        return [], []
+
+    sbp = run_model(registry, BP_MODEL, features, batcher=batcher)
+    hba1c = run_model(registry, HBA1C_MODEL, features, batcher=batcher)
+    ckd = run_model(registry, CKD_MODEL, features, method="predict_proba", batcher=batcher)
+    cluster = run_model(registry, METABOLIC_MODEL, features, batcher=batcher)
+
+    unavailable = [
+        spec.name
+        for spec, result in ((BP_MODEL, sbp), (HBA1C_MODEL, hba1c), (CKD_MODEL, ckd), (METABOLIC_MODEL, cluster))
+        if result is None
+    ]
+
+    predictions = []
+    for i, seqn in enumerate(features.index):
+        item: dict[str, Optional[object]] = {"seqn": int(seqn)}
+        if sbp is not None:
+            item["predicted_systolic_bp"] = round(float(sbp[i]), 1)
+            item["systolic_risk_status"] = "High" if sbp[i] > 130 else "Normal"
+        if hba1c is not None:
+            item["predicted_hba1c"] = round(float(hba1c[i]), 2)
+            item["hba1c_category"] = hba1c_category(hba1c[i])
+        if ckd is not None:
+            probability = float(ckd[i, 1])
+            item["ckd_risk_probability"] = round(probability, 4)
+            item["ckd_high_risk"] = probability >= 0.5
+        if cluster is not None:
+            item["metabolic_cluster"] = int(cluster[i])
+            item["metabolic_phenotype"] = METABOLIC_PROFILES.get(int(cluster[i]), "Unknown Profile")
+        predictions.append(item)
+    return predictions, unavailable
+
+
+def predict_patients(
+    db: Session, registry: ModelRegistry, seqns: list[int], batcher: Optional[MicroBatcher] = None
+) -> tuple[list[dict], list[int], list[str]]:
+    """Predict for SEQNs; returns (predictions, missing SEQNs, unavailable models)."""
+    features = load_features(db, seqns)
+    predictions, unavailable = predict_features(registry, features, batcher=batcher)
+    found = set(features.index)
+    missing = [s for s in dict.fromkeys(seqns) if s not in found]
+    return predictions, missing, unavailable
@@ -0,0 +1,64 @@
+"""
+Lazy, memory-mapped loading of the persisted model pipelines.
+"""
+import os
+import threading
+
+import joblib
+
+from serving.specs import MODEL_SPECS, ModelSpec
+
+
+class ModelNotAvailable(Exception):
+    """Raised when a model's persisted pipeline has not been trained yet."""
+
+
+class ModelRegistry:
+    """
+    Loads each pipeline at most once per process.
+
+    Pipelines are loaded on first use with ``mmap_mode="r"`` so the large
+    tree arrays of the random forests are paged in from the artifact file
+    and shared between worker processes through the OS page cache.
+    """
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self._pipelines = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, spec: ModelSpec) -> str:
+        return os.path.join(self.model_dir, spec.filename)
+
+    def get(self, name: str):
+        """Return the fitted pipeline for ``name``, loading it on first use."""
+        pipeline = self._pipelines.get(name)
+        if pipeline is not None:
+            return pipeline
+        with self._lock:
+            if name not in self._pipelines:
+                path = self.path_for(MODEL_SPECS[name])
+                if not os.path.exists(path):
+                    raise ModelNotAvailable(
+                        f"Model '{name}' has not been trained; run `python -m serving.train`"
+                    )
+                self._pipelines[name] = joblib.load(path, mmap_mode="r")
+            return self._pipelines[name]
+
+    def load_all(self):
+        """Eagerly load every available pipeline."""
+        for name in MODEL_SPECS:
+            try:
+                self.get(name)
+            except ModelNotAvailable as e:
+                print(f"  {e}")
+
+    def status(self) -> dict:
+        """Which models are loaded and which have artifacts on disk."""
+        return {
+            name: {
+                "available": os.path.exists(self.path_for(spec)),
+                "loaded": name in self._pipelines,
+            }
+            for name, spec in MODEL_SPECS.items()
+        }
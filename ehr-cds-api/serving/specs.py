@@ -0,0 +1,86 @@
+"""
+Definitions of the served models.
+
+Each spec mirrors one notebook in ``ML/``: the NHANES feature columns it was
+trained on, the estimator it wraps, and where its persisted pipeline lives.
+"""
+from dataclasses import dataclass, field
+
+from models import Demographic, Examination, Labs, Diet
+
+
+# NHANES feature name -> ORM column the value is read from at inference time
+FEATURE_COLUMNS = {
+    "RIDAGEYR": Demographic.ridageyr,
+    "RIAGENDR": Demographic.riagendr,
+    "BMXBMI": Examination.bmxbmi,
+    "BMXWAIST": Examination.bmxwaist,
+    "LBXTC": Labs.lbxtc,
+    "DR1TKCAL": Diet.dr1tkcal,
+    "DR1TSODI": Diet.dr1tsodi,
+    "DR1TSUGR": Diet.dr1tsugr,
+}
+
+CLINICAL_FEATURES = ["RIDAGEYR", "RIAGENDR", "BMXBMI", "BMXWAIST", "LBXTC"]
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A persisted imputer + scaler + estimator pipeline."""
+    name: str
+    notebook: str
+    features: list[str] = field(default_factory=list)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.joblib"
+
+
+BP_MODEL = ModelSpec(
+    name="bp_systolic",
+    notebook="BP_Prediction_EHR_Analysis.ipynb",
+    features=CLINICAL_FEATURES,
+)
+
+HBA1C_MODEL = ModelSpec(
+    name="hba1c",
+    notebook="Diabetes_HbA1c_Risk_Prediction.ipynb",
+    features=CLINICAL_FEATURES,
+)
+
+CKD_MODEL = ModelSpec(
+    name="ckd_risk",
+    notebook="Kidney_CKD_Risk_Classification.ipynb",
+    features=CLINICAL_FEATURES,
+)
+
+METABOLIC_MODEL = ModelSpec(
+    name="metabolic_phenotype",
+    notebook="Metabolic_Phenotype_Clustering.ipynb",
+    features=["BMXBMI", "BMXWAIST", "DR1TKCAL", "DR1TSODI", "DR1TSUGR", "LBXTC"],
+)
+
+MODEL_SPECS = {spec.name: spec for spec in (BP_MODEL, HBA1C_MODEL, CKD_MODEL, METABOLIC_MODEL)}
+
+# Phenotype descriptions from the metabolic clustering notebook
+METABOLIC_PROFILES = {
+    0: "Balanced Profile: Moderate metrics across all categories.",
+    1: "High Caloric/Sugar Profile: Focus on glycemic control and weight management.",
+    2: "High Sodium/Cholesterol Profile: Focus on cardiovascular health and blood pressure.",
+    3: "Elevated Body Metric Profile: Significant risk for metabolic syndrome; focus on lifestyle.",
+}
+
+# Medication keyword lists the notebooks use to exclude already-treated patients from training
+BP_MED_KEYWORDS = [
+    'LISINOPRIL', 'AMLODIPINE', 'METOPROLOL', 'HYDROCHLOROTHIAZIDE',
+    'LOSARTAN', 'ATENOLOL', 'ENALAPRIL', 'FUROSEMIDE', 'PROPRANOLOL',
+    'VALSARTAN', 'DILTIAZEM', 'CARVEDILOL', 'SPIRONOLACTONE',
+]
+DIABETES_MED_KEYWORDS = [
+    'INSULIN', 'METFORMIN', 'GLIPIZIDE', 'GLYBURIDE',
+    'JANUVIA', 'PIOGLITAZONE', 'GLIMEPIRIDE',
+]
+RENAL_MED_KEYWORDS = [
+    'SEVELAMER', 'CALCIUM ACETATE', 'EPOETIN', 'DARBEPOETIN',
+    'CINACALCET', 'PARICALCITOL', 'CALCITRIOL',
+]
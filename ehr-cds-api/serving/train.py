@@ -0,0 +1,146 @@
+"""
+Train and persist the notebook models as imputer + scaler + estimator pipelines.
+
+Mirrors the training cells in ``ML/*.ipynb`` and writes one joblib artifact
+per model into ``Settings.model_dir`` for the serving registry to load.
+
+Usage (from ehr-cds-api/):
+    python -m serving.train
+"""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import mean_absolute_error, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from config import get_settings
+from snapshot import read_table
+from serving.specs import BP_MODEL, HBA1C_MODEL, CKD_MODEL, METABOLIC_MODEL
+from treatment import class_mask, get_drug_classes
+
+
+def read_csv(csv_path: str, filename: str, columns=None) -> pd.DataFrame:
+    """Read an NHANES table (snapshot or CSV), optionally keeping only some columns."""
+    return read_table(csv_path, filename, columns)
+
+
+def treated_seqns(meds: pd.DataFrame, drug_class: str) -> np.ndarray:
+    """SEQNs with a medication in the named drug class (same rules as patient_treatment)."""
+    classes = {c.name: c for c in get_drug_classes()}
+    mask = class_mask(meds['RXDDRUG'], meds['RXDRSD1'], classes[drug_class])
+    return meds.loc[mask, 'SEQN'].unique()
+
+
+def preprocessing_steps() -> list:
+    return [
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler()),
+    ]
+
+
+def train_bp(demo, exam, labs, meds) -> Pipeline:
+    """Systolic BP regressor trained on the untreated population."""
+    df = demo.merge(exam, on='SEQN').merge(labs, on='SEQN')
+    df = df[~df['SEQN'].isin(treated_seqns(meds, 'antihypertensive'))]
+    df = df.dropna(subset=['BPXSY1'])
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[BP_MODEL.features], df['BPXSY1'], test_size=0.2, random_state=42
+    )
+    pipeline = Pipeline(preprocessing_steps() + [
+        ('regressor', RandomForestRegressor(n_estimators=100, random_state=42)),
+    ])
+    pipeline.fit(X_train, y_train)
+    print(f"  {BP_MODEL.name}: test MAE {mean_absolute_error(y_test, pipeline.predict(X_test)):.2f} mmHg")
+    return pipeline
+
+
+def train_hba1c(demo, exam, labs, meds) -> Pipeline:
+    """HbA1c regressor trained on patients not on diabetes medication."""
+    df = demo.merge(exam, on='SEQN').merge(labs, on='SEQN')
+    df = df[~df['SEQN'].isin(treated_seqns(meds, 'diabetic'))]
+    df = df.dropna(subset=['LBXGH'])
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[HBA1C_MODEL.features], df['LBXGH'], test_size=0.2, random_state=42
+    )
+    pipeline = Pipeline(preprocessing_steps() + [
+        ('regressor', RandomForestRegressor(n_estimators=150, max_depth=12, random_state=42)),
+    ])
+    pipeline.fit(X_train, y_train)
+    print(f"  {HBA1C_MODEL.name}: test MAE {mean_absolute_error(y_test, pipeline.predict(X_test)):.3f} %")
+    return pipeline
+
+
+def train_ckd(demo, exam, labs, meds) -> Pipeline:
+    """Elevated-creatinine classifier, excluding patients on renal medication."""
+    df = demo.merge(labs, on='SEQN', how='left').merge(exam, on='SEQN', how='left')
+    df = df[~df['SEQN'].isin(treated_seqns(meds, 'renal'))]
+
+    # Gender-specific creatinine thresholds (1=Male > 1.2, 2=Female > 1.0)
+    threshold = df['RIAGENDR'].map({1: 1.2, 2: 1.0})
+    df = df.assign(kidney_risk=np.where(df['LBXSCR'] > threshold, 1, 0))
+    df = df[df['LBXSCR'].notna() & threshold.notna()]
+    df = df[CKD_MODEL.features + ['kidney_risk']].dropna()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[CKD_MODEL.features], df['kidney_risk'], test_size=0.2, random_state=42,
+        stratify=df['kidney_risk'],
+    )
+    pipeline = Pipeline(preprocessing_steps() + [
+        ('classifier', RandomForestClassifier(
+            n_estimators=100, max_depth=8, class_weight='balanced', random_state=42, n_jobs=-1,
+        )),
+    ])
+    pipeline.fit(X_train, y_train)
+    auc = roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1])
+    print(f"  {CKD_MODEL.name}: test ROC AUC {auc:.3f}")
+    return pipeline
+
+
+def train_metabolic(exam, diet, labs) -> Pipeline:
+    """Four-cluster KMeans over body metrics, diet and cholesterol."""
+    df = exam.merge(diet, on='SEQN').merge(labs, on='SEQN')
+    pipeline = Pipeline(preprocessing_steps() + [
+        ('kmeans', KMeans(n_clusters=4, random_state=42, n_init=10)),
+    ])
+    pipeline.fit(df[METABOLIC_MODEL.features])
+    print(f"  {METABOLIC_MODEL.name}: clustered {len(df)} patients")
+    return pipeline
+
+
+def train_all(csv_path: str, model_dir: str):
+    """Train every served model from the NHANES CSVs and persist the pipelines."""
+    print("Loading NHANES datasets...")
+    demo = read_csv(csv_path, "demographic.csv", ['SEQN', 'RIDAGEYR', 'RIAGENDR'])
+    exam = read_csv(csv_path, "examination.csv", ['SEQN', 'BPXSY1', 'BMXBMI', 'BMXWAIST'])
+    labs = read_csv(csv_path, "labs.csv", ['SEQN', 'LBXTC', 'LBXGH', 'LBXSCR'])
+    diet = read_csv(csv_path, "diet.csv", ['SEQN', 'DR1TKCAL', 'DR1TSODI', 'DR1TSUGR'])
+    meds = read_csv(csv_path, "medications.csv", ['SEQN', 'RXDDRUG', 'RXDRSD1'])
+
+    print("Training models...")
+    pipelines = [
+        (BP_MODEL, train_bp(demo, exam, labs, meds)),
+        (HBA1C_MODEL, train_hba1c(demo, exam, labs, meds)),
+        (CKD_MODEL, train_ckd(demo, exam, labs, meds)),
+        (METABOLIC_MODEL, train_metabolic(exam, diet, labs)),
+    ]
+
+    os.makedirs(model_dir, exist_ok=True)
+    for spec, pipeline in pipelines:
+        # Uncompressed so the registry can memory-map the arrays
+        path = os.path.join(model_dir, spec.filename)
+        joblib.dump(pipeline, path)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    train_all(settings.csv_data_path, settings.model_dir)
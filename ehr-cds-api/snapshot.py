@@ -0,0 +1,184 @@
+"""
+Parquet snapshots of the NHANES CSV files.
+
+Parsing the CSVs dominates cold-start time, so each file is converted once
+into a typed Parquet file in ``<csv_data_path>/.snapshots`` named after the
+CSV's SHA-256. Readers ask for the columns they need; a snapshot is only used
+when its checksum matches the current CSV, otherwise the CSV is parsed again
+and a fresh snapshot replaces the stale one.
+
+Run ``python snapshot.py`` to build every snapshot ahead of time.
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import get_settings
+
+SNAPSHOT_DIRNAME = ".snapshots"
+MANIFEST_FILENAME = "manifest.json"
+
+
+def snapshot_dir(csv_path: str) -> str:
+    return os.path.join(csv_path, SNAPSHOT_DIRNAME)
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(csv_path: str) -> dict:
+    try:
+        with open(os.path.join(snapshot_dir(csv_path), MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(csv_path: str, manifest: dict):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    write_atomic(os.path.join(snapshot_dir(csv_path), MANIFEST_FILENAME), write)
+
+
+def write_atomic(path: str, write):
+    """Write via a temp file in the same directory, then rename over ``path``."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def csv_checksum(csv_path: str, filename: str, manifest: Optional[dict] = None) -> str:
+    """
+    Checksum of one CSV.
+
+    The manifest remembers the size and mtime each checksum was computed for,
+    so an unchanged file isn't re-hashed on every start.
+    """
+    path = os.path.join(csv_path, filename)
+    stat = os.stat(path)
+    entry = (manifest or {}).get(filename)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+    checksum = file_checksum(path)
+    if manifest is not None:
+        manifest[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": checksum}
+    return checksum
+
+
+def snapshot_path(csv_path: str, filename: str, checksum: str) -> str:
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(snapshot_dir(csv_path), f"{stem}.{checksum[:16]}.parquet")
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a parsed CSV frame to Arrow.
+
+    Columns pandas left as ``object`` with mixed values are stored as strings;
+    the seeder's cleaners coerce them back exactly as they would the raw CSV.
+    """
+    for name in df.columns[df.dtypes == object]:
+        df[name] = df[name].map(str, na_action="ignore")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_snapshot(csv_path: str, filename: str, df: pd.DataFrame, checksum: str) -> Optional[str]:
+    """Store ``df`` as the snapshot for ``checksum`` and drop older snapshots of the file."""
+    target = snapshot_path(csv_path, filename, checksum)
+    try:
+        os.makedirs(snapshot_dir(csv_path), exist_ok=True)
+        table = to_arrow(df.copy())
+        write_atomic(target, lambda tmp: pq.write_table(table, tmp))
+    except OSError as e:
+        print(f"  Could not write snapshot for {filename}: {e}")
+        return None
+    stem = os.path.splitext(filename)[0]
+    for old in glob.glob(os.path.join(snapshot_dir(csv_path), f"{stem}.*.parquet")):
+        if old != target:
+            os.remove(old)
+    return target
+
+
+def read_csv_file(csv_path: str, filename: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """Parse an NHANES CSV directly, optionally keeping only ``columns``."""
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    return pd.read_csv(os.path.join(csv_path, filename), encoding='latin-1', usecols=usecols)
+
+
+def select_columns(df: pd.DataFrame, columns: Optional[list[str]]) -> pd.DataFrame:
+    if columns is None:
+        return df
+    return df[[c for c in df.columns if c in set(columns)]]
+
+
+def read_table(csv_path: str, filename: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Read an NHANES table, keeping only ``columns`` that exist in the file.
+
+    Uses the Parquet snapshot when it matches the CSV's checksum; otherwise
+    parses the CSV and, if snapshots are enabled, rebuilds the snapshot.
+    """
+    if not get_settings().csv_snapshots:
+        return read_csv_file(csv_path, filename, columns)
+
+    manifest = load_manifest(csv_path)
+    checksum = csv_checksum(csv_path, filename, manifest)
+    path = snapshot_path(csv_path, filename, checksum)
+
+    if os.path.exists(path):
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    df = read_csv_file(csv_path, filename)
+    if write_snapshot(csv_path, filename, df, checksum):
+        try:
+            save_manifest(csv_path, manifest)
+        except OSError:
+            pass
+    return select_columns(df, columns)
+
+
+def build_snapshots(csv_path: str) -> list[str]:
+    """Snapshot every CSV in ``csv_path`` that doesn't have a current snapshot."""
+    manifest = load_manifest(csv_path)
+    built = []
+    for path in sorted(glob.glob(os.path.join(csv_path, "*.csv"))):
+        filename = os.path.basename(path)
+        checksum = csv_checksum(csv_path, filename, manifest)
+        if os.path.exists(snapshot_path(csv_path, filename, checksum)):
+            print(f"  {filename}: up to date")
+            continue
+        if write_snapshot(csv_path, filename, read_csv_file(csv_path, filename), checksum):
+            built.append(filename)
+            print(f"  {filename}: snapshot written")
+    save_manifest(csv_path, manifest)
+    return built
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    print(f"Building snapshots for {settings.csv_data_path}")
+    build_snapshots(settings.csv_data_path)
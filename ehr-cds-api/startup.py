@@ -0,0 +1,9 @@
+"""
+Process start time, for the startup duration each worker logs.
+
+main.py imports this module first, so the measured time includes loading
+the rest of the app.
+"""
+import time
+
+STARTED_AT = time.perf_counter()
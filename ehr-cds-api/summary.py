@@ -0,0 +1,106 @@
+"""
+Maintenance of the materialized patient_summary table.
+
+The risk level and status shown in the patient list are derived values, so
+they are stored per SEQN in ``patient_summary`` to let list filters run as
+indexed WHERE clauses. The table is rebuilt in bulk at seed time and refreshed
+for a single patient whenever that patient's source rows change.
+"""
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from clinical import score_patients_batch, optional_int, optional_float
+from models import Demographic, Examination, Labs, Questionnaire, PatientSummary
+
+
+def summary_source_select():
+    """Select the columns needed to summarize patients, one row per SEQN."""
+    return (
+        select(
+            Demographic.seqn,
+            Demographic.riagendr,
+            Demographic.ridageyr,
+            Examination.bpxsy1, Examination.bpxsy2, Examination.bpxsy3,
+            Examination.bpxdi1, Examination.bpxdi2, Examination.bpxdi3,
+            Labs.lbxscr,
+            Labs.lbxgh,
+            Questionnaire.diq010,
+            Questionnaire.bpq020,
+        )
+        .outerjoin(Examination, Examination.seqn == Demographic.seqn)
+        .outerjoin(Labs, Labs.seqn == Demographic.seqn)
+        .outerjoin(Questionnaire, Questionnaire.seqn == Demographic.seqn)
+    )
+
+
+def score_summary_rows(rows) -> list[dict]:
+    """Score ``summary_source_select`` rows as one batch into patient_summary rows."""
+    if not rows:
+        return []
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(rows[0]._fields)}
+    scores = score_patients_batch(
+        riagendr=columns["riagendr"],
+        ridageyr=columns["ridageyr"],
+        lbxscr=columns["lbxscr"],
+        lbxgh=columns["lbxgh"],
+        systolic_readings=[columns[f"bpxsy{i}"] for i in (1, 2, 3)],
+        diastolic_readings=[columns[f"bpxdi{i}"] for i in (1, 2, 3)],
+        diq010=columns["diq010"],
+        bpq020=columns["bpq020"],
+    )
+    return [
+        {
+            "seqn": seqn,
+            "systolic": optional_int(scores["systolic"][i]),
+            "diastolic": optional_int(scores["diastolic"][i]),
+            "egfr": optional_float(scores["egfr"][i]),
+            "risk_score": int(scores["risk_score"][i]),
+            "risk_level": scores["risk_level"][i],
+            "status": scores["status"][i],
+        }
+        for i, seqn in enumerate(columns["seqn"])
+    ]
+
+
+def rebuild_patient_summaries(db: Session, chunk_size: int = 5000) -> int:
+    """Recompute the whole patient_summary table and return the row count."""
+    rows = score_summary_rows(db.execute(summary_source_select()).all())
+
+    db.execute(delete(PatientSummary))
+    stmt = insert(PatientSummary)
+    for start in range(0, len(rows), chunk_size):
+        db.execute(stmt, rows[start:start + chunk_size])
+    db.commit()
+    return len(rows)
+
+
+def refresh_patient_summary(db: Session, seqn: int) -> Optional[PatientSummary]:
+    """
+    Recompute one patient's summary inside the caller's transaction.
+
+    Pending changes are flushed first so the recomputation sees them; the
+    caller is responsible for committing.
+    """
+    db.flush()
+    row = db.execute(summary_source_select().where(Demographic.seqn == seqn)).first()
+    if row is None:
+        remove_patient_summary(db, seqn)
+        return None
+    return db.merge(PatientSummary(**score_summary_rows([row])[0]))
+
+
+def refresh_patient_summaries(db: Session, seqns: list[int]) -> int:
+    """Recompute the summaries of several patients inside the caller's transaction."""
+    db.flush()
+    rows = score_summary_rows(db.execute(summary_source_select().where(Demographic.seqn.in_(seqns))).all())
+    db.execute(delete(PatientSummary).where(PatientSummary.seqn.in_(seqns)))
+    if rows:
+        db.execute(insert(PatientSummary), rows)
+    return len(rows)
+
+
+def remove_patient_summary(db: Session, seqn: int):
+    """Delete one patient's summary inside the caller's transaction."""
+    db.query(PatientSummary).filter(PatientSummary.seqn == seqn).delete()
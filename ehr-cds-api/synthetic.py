@@ -0,0 +1,468 @@
+"""
+Synthetic NHANES-shaped patients for scale testing.
+
+``learn_profile`` fits a Gaussian copula to the seed CSVs. Every numeric
+column keeps its empirical marginal, and the rank correlations between
+columns, their missingness, each patient's medication count and whether
+a patient has a row in each table are sampled jointly. Medication lists
+are copied from real donor patients with the same number of medication
+rows and the same diabetes and hypertension answers, so drug names,
+conditions and ICD-10 codes stay consistent with each other and with the
+questionnaire.
+
+Patients are generated in chunks. They are either written straight into
+the database, where SEQNs come from the API's counter and the derived
+tables are refreshed per chunk, or written as one file per table named
+like ``med_data``. CSV output is a drop-in ``CSV_DATA_PATH`` for
+``seed_db.py``; Parquet output (same headers, typed columns) is for
+analysis tools and other loaders, since the seeder only reads
+``<table>.csv``. The same source data, seed and chunk size always produce
+the same patients.
+
+    python synthetic.py --patients 1000000 --seed 7
+    python synthetic.py --patients 1000000 --seed 7 --format csv --output /data/synthetic
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy.stats import norm
+from sqlalchemy import insert
+
+from config import get_settings
+from database import Base, SessionLocal, engine
+from medication_search import drop_medication_search, ensure_medication_search
+from models import Demographic, Examination, Labs, Diet, Questionnaire, Medication
+from patient_import import allocate_seqns
+from seed_csv import CSV_COLUMN_ALIASES, clean_column, frame_to_rows, read_csv
+from seed_db import ensure_indexes, update_planner_stats
+from summary import refresh_patient_summaries
+from treatment import refresh_patient_treatments
+
+# Tables with at most one row per patient, and the CSV each is learned from
+PATIENT_TABLES = [
+    (Demographic, "demographic.csv"),
+    (Examination, "examination.csv"),
+    (Labs, "labs.csv"),
+    (Diet, "diet.csv"),
+    (Questionnaire, "questionnaire.csv"),
+]
+MEDICATIONS_FILE = "medications.csv"
+
+# Points of the stored quantile function of a continuous column
+QUANTILE_POINTS = 1025
+
+OUTPUT_FORMATS = ("db", "csv", "parquet")
+
+ARROW_TYPES = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+
+
+@dataclass
+class Marginal:
+    """Empirical distribution of one variable, sampled by inverse CDF."""
+    values: np.ndarray
+    cdf: Optional[np.ndarray] = None  # Set for discrete variables
+    decimals: Optional[int] = None    # Rounding of continuous samples
+
+    @classmethod
+    def fit(cls, observed: np.ndarray, discrete: bool) -> "Marginal":
+        if discrete:
+            values, counts = np.unique(observed, return_counts=True)
+            return cls(values=values, cdf=np.cumsum(counts) / counts.sum())
+        grid = np.quantile(observed, np.linspace(0, 1, QUANTILE_POINTS))
+        return cls(values=grid, decimals=value_decimals(observed))
+
+    def sample(self, u: np.ndarray) -> np.ndarray:
+        if self.cdf is not None:
+            index = np.searchsorted(self.cdf, u, side="right")
+            return self.values[np.minimum(index, len(self.values) - 1)]
+        samples = np.interp(u, np.linspace(0, 1, len(self.values)), self.values)
+        return samples.round(self.decimals) if self.decimals is not None else samples
+
+
+@dataclass
+class Profile:
+    """Everything ``generate_chunk`` needs, learned from one set of CSVs."""
+    variables: list[str]
+    marginals: list[Marginal]
+    cholesky: np.ndarray
+    columns: dict              # model -> column names in output order
+    missing_rates: dict        # "table.column" -> share missing where the table has a row
+    medications: pd.DataFrame  # Donor medication rows, grouped by donor
+    donor_starts: np.ndarray
+    donor_counts: np.ndarray
+    donor_strata: dict         # (count, diabetes, hypertension) -> donor indexes
+    donors_by_count: dict      # count -> donor indexes
+    max_seqn: int
+
+
+def value_decimals(observed: np.ndarray, limit: int = 4) -> Optional[int]:
+    """Fewest decimals that represent every observed value, or None if more than ``limit``."""
+    for decimals in range(limit + 1):
+        if np.allclose(observed, observed.round(decimals), rtol=0, atol=1e-9):
+            return decimals
+    return None
+
+
+def csv_header(column_name: str) -> str:
+    return CSV_COLUMN_ALIASES.get(column_name, [column_name.upper()])[0]
+
+
+def model_frame(csv_path: str, filename: str, model) -> pd.DataFrame:
+    """A table's CSV cleaned into the model's column names and types."""
+    raw = read_csv(csv_path, filename, model)
+    frame = {}
+    for column in model.__table__.columns:
+        if column.autoincrement is True:
+            continue
+        candidates = CSV_COLUMN_ALIASES.get(column.name, [column.name.upper()])
+        source = next((c for c in candidates if c in raw.columns), None)
+        if source is None:
+            frame[column.name] = pd.Series([None] * len(raw), dtype=object)
+        else:
+            frame[column.name] = clean_column(raw[source], column.type.python_type).reset_index(drop=True)
+    frame = pd.DataFrame(frame)
+    return frame[frame["seqn"].notna()]
+
+
+def output_columns(model) -> list[str]:
+    return [c.name for c in model.__table__.columns if c.autoincrement is not True and c.name != "seqn"]
+
+
+def normal_scores(series: pd.Series) -> pd.Series:
+    """Map observed values to standard-normal scores by (average) rank."""
+    ranks = series.rank(method="average")
+    return pd.Series(norm.ppf(ranks / (series.notna().sum() + 1)), index=series.index)
+
+
+def nearest_correlation(matrix: np.ndarray) -> np.ndarray:
+    """Clip negative eigenvalues of a pairwise correlation estimate and restore the unit diagonal."""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    fixed = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+def learn_profile(csv_path: str) -> Profile:
+    """Fit marginals, missingness, correlations and medication donors to the CSVs in ``csv_path``."""
+    demographics = model_frame(csv_path, "demographic.csv", Demographic).drop_duplicates("seqn")
+    seqns = pd.Index(demographics["seqn"].astype("int64"))
+
+    # One row per patient; value columns are NaN where a patient has no value
+    variables: dict[str, pd.Series] = {}
+    discrete: set[str] = set()
+    columns = {}
+    missing_rates = {}
+    for model, filename in PATIENT_TABLES:
+        table = model.__tablename__
+        if model is Demographic:
+            frame = demographics.set_index(seqns)
+            present = pd.Series(True, index=seqns)
+        else:
+            frame = model_frame(csv_path, filename, model).drop_duplicates("seqn")
+            frame = frame.set_index(frame["seqn"].astype("int64")).reindex(seqns)
+            present = frame["seqn"].notna()
+            variables[f"{table}:present"] = present.astype(float)
+            discrete.add(f"{table}:present")
+
+        columns[model] = output_columns(model)
+        for name in columns[model]:
+            values = pd.to_numeric(frame[name], errors="coerce").astype(float)
+            key = f"{table}.{name}"
+            missing = values.isna()[present]
+            missing_rates[key] = float(missing.mean()) if len(missing) else 1.0
+            if missing_rates[key] < 1.0:
+                variables[key] = values
+                if model.__table__.columns[name].type.python_type is int:
+                    discrete.add(key)
+            if 0.0 < missing_rates[key] < 1.0:
+                variables[f"{key}:missing"] = missing.astype(float).reindex(seqns)
+                discrete.add(f"{key}:missing")
+
+    medications = model_frame(csv_path, MEDICATIONS_FILE, Medication)
+    medications = medications[medications["seqn"].isin(seqns)].copy()
+    medications["seqn"] = medications["seqn"].astype("int64")
+    medications = medications.sort_values("seqn", kind="stable").reset_index(drop=True)
+    counts = medications.groupby("seqn").size()
+    variables["medications:count"] = counts.reindex(seqns, fill_value=0).astype(float)
+    discrete.add("medications:count")
+
+    names = list(variables)
+    scores = pd.DataFrame({name: normal_scores(variables[name]) for name in names})
+    correlation = scores.corr(min_periods=10).fillna(0.0).to_numpy()
+    np.fill_diagonal(correlation, 1.0)
+    cholesky = np.linalg.cholesky(nearest_correlation(correlation))
+    marginals = [
+        Marginal.fit(variables[name].dropna().to_numpy(), name in discrete) for name in names
+    ]
+
+    # Donors: real patients' medication lists, stratified for consistency with the questionnaire
+    donor_seqns = counts.index.to_numpy()
+    donor_counts = counts.to_numpy()
+    donor_starts = np.concatenate([[0], np.cumsum(donor_counts)[:-1]])
+    answers = model_frame(csv_path, "questionnaire.csv", Questionnaire).drop_duplicates("seqn")
+    answers = answers.set_index(answers["seqn"].astype("int64")).reindex(donor_seqns)
+    diabetes = (answers["diq010"] == 1).fillna(False).to_numpy(dtype=bool)
+    hypertension = (answers["bpq020"] == 1).fillna(False).to_numpy(dtype=bool)
+    donor_strata: dict = {}
+    donors_by_count: dict = {}
+    for index, key in enumerate(zip(donor_counts.tolist(), diabetes.tolist(), hypertension.tolist())):
+        donor_strata.setdefault(key, []).append(index)
+        donors_by_count.setdefault(key[0], []).append(index)
+
+    return Profile(
+        variables=names,
+        marginals=marginals,
+        cholesky=cholesky,
+        columns=columns,
+        missing_rates=missing_rates,
+        medications=medications[output_columns(Medication)],
+        donor_starts=donor_starts,
+        donor_counts=donor_counts,
+        donor_strata={key: np.array(value) for key, value in donor_strata.items()},
+        donors_by_count={key: np.array(value) for key, value in donors_by_count.items()},
+        max_seqn=int(seqns.max()) if len(seqns) else 0,
+    )
+
+
+# ============ Generation ============
+
+def derive_bmi(tables: dict):
+    """BMI follows from the generated weight and height wherever both exist."""
+    exam = tables[Examination]
+    known = exam["bmxwt"].notna() & exam["bmxht"].notna()
+    exam.loc[known, "bmxbmi"] = (exam["bmxwt"] / (exam["bmxht"] / 100) ** 2).round(1)[known]
+
+
+def education_by_age(tables: dict):
+    """NHANES asks DMDEDUC3 of ages 6-19 and DMDEDUC2 of adults 20 and over."""
+    demo = tables[Demographic]
+    age = demo["ridageyr"].astype(float)
+    demo.loc[~(age >= 20), "dmdeduc2"] = pd.NA
+    demo.loc[~((age >= 6) & (age < 20)), "dmdeduc3"] = pd.NA
+
+
+CONSISTENCY_RULES = [derive_bmi, education_by_age]
+
+
+def typed_column(values: np.ndarray, python_type: type) -> pd.Series:
+    if python_type is int:
+        return pd.Series(pd.array(np.where(np.isnan(values), np.nan, np.round(values)), dtype="Int64"))
+    return pd.Series(values, dtype="float64")
+
+
+def pick_donors(profile: Profile, counts: np.ndarray, diabetes: np.ndarray, hypertension: np.ndarray,
+                rng: np.random.Generator) -> np.ndarray:
+    """A donor for each patient with medications, from the best matching stratum."""
+    donors = np.empty(len(counts), dtype=np.int64)
+    keys = pd.DataFrame({"count": counts, "diabetes": diabetes, "hypertension": hypertension})
+    for key, group in keys.groupby(["count", "diabetes", "hypertension"]).groups.items():
+        key = (int(key[0]), bool(key[1]), bool(key[2]))
+        pool = profile.donor_strata.get(key)
+        if pool is None:
+            pool = profile.donors_by_count.get(key[0])
+        if pool is None:
+            pool = np.arange(len(profile.donor_counts))
+        donors[np.asarray(group)] = rng.choice(pool, size=len(group))
+    return donors
+
+
+def generate_chunk(profile: Profile, seqns: np.ndarray, rng: np.random.Generator) -> dict:
+    """Frames in model column names for ``seqns``, keyed by model."""
+    n = len(seqns)
+    z = rng.standard_normal((n, len(profile.variables))) @ profile.cholesky.T
+    u = norm.cdf(z)
+    sampled = {
+        name: marginal.sample(u[:, j]) for j, (name, marginal) in enumerate(zip(profile.variables, profile.marginals))
+    }
+
+    tables = {}
+    for model, _ in PATIENT_TABLES:
+        table = model.__tablename__
+        present = sampled.get(f"{table}:present")
+        rows = np.ones(n, dtype=bool) if present is None else present == 1
+        frame = {"seqn": pd.Series(seqns[rows], dtype="int64")}
+        for name in profile.columns[model]:
+            key = f"{table}.{name}"
+            values = sampled.get(key, np.full(n, np.nan)).astype(float)
+            missing = sampled.get(f"{key}:missing")
+            if missing is not None:
+                values = np.where(missing == 1, np.nan, values)
+            frame[name] = typed_column(values[rows], model.__table__.columns[name].type.python_type)
+        tables[model] = pd.DataFrame(frame)
+
+    for rule in CONSISTENCY_RULES:
+        rule(tables)
+
+    counts = sampled["medications:count"].astype(np.int64)
+    has_meds = counts > 0
+    questionnaire = tables[Questionnaire].set_index("seqn").reindex(seqns)
+    diabetes = (questionnaire["diq010"] == 1).fillna(False).to_numpy(dtype=bool)
+    hypertension = (questionnaire["bpq020"] == 1).fillna(False).to_numpy(dtype=bool)
+    donors = pick_donors(profile, counts[has_meds], diabetes[has_meds], hypertension[has_meds], rng)
+
+    lengths = profile.donor_counts[donors]
+    starts = np.repeat(profile.donor_starts[donors], lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    medications = profile.medications.iloc[starts + offsets].reset_index(drop=True)
+    medications.insert(0, "seqn", np.repeat(seqns[has_meds], lengths))
+    tables[Medication] = medications
+    return tables
+
+
+def csv_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rename model columns to the NHANES headers the seeder reads."""
+    return frame.rename(columns={name: csv_header(name) for name in frame.columns})
+
+
+def chunk_rng(seed: int, chunk: int) -> np.random.Generator:
+    return np.random.default_rng([seed, chunk])
+
+
+# ============ Output ============
+
+class FileOutput:
+    """Appends each chunk to one CSV or Parquet file per table, named like med_data."""
+
+    def __init__(self, directory: str, format: str):
+        self.directory = directory
+        self.format = format
+        self._parquet_writers = {}
+        os.makedirs(directory, exist_ok=True)
+        for model, filename in PATIENT_TABLES + [(Medication, MEDICATIONS_FILE)]:
+            path = self.path(filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def path(self, filename: str) -> str:
+        stem = os.path.splitext(filename)[0]
+        return os.path.join(self.directory, f"{stem}.{self.format}")
+
+    def next_seqns(self, start: int, count: int) -> np.ndarray:
+        return np.arange(start, start + count, dtype=np.int64)
+
+    def write(self, tables: dict):
+        for model, filename in PATIENT_TABLES + [(Medication, MEDICATIONS_FILE)]:
+            frame = csv_frame(tables[model])
+            path = self.path(filename)
+            if self.format == "csv":
+                frame.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+                continue
+            writer = self._parquet_writers.get(model)
+            if writer is None:
+                schema = pa.schema([
+                    (csv_header(c.name), ARROW_TYPES[c.type.python_type])
+                    for c in model.__table__.columns if c.autoincrement is not True
+                ])
+                writer = self._parquet_writers[model] = pq.ParquetWriter(path, schema)
+            writer.write_table(pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False))
+
+    def close(self):
+        for writer in self._parquet_writers.values():
+            writer.close()
+
+
+class DatabaseOutput:
+    """
+    Inserts each chunk in one transaction with Core executemany.
+
+    SEQNs come from the API's counter, and patient_summary and
+    patient_treatment are refreshed for each chunk. The medication search
+    index is dropped for the load and rebuilt once at the end, because its
+    triggers would otherwise index every row separately.
+    """
+
+    def __init__(self, insert_chunk_size: int):
+        Base.metadata.create_all(bind=engine)
+        ensure_indexes(engine)
+        self.insert_chunk_size = insert_chunk_size
+        self.db = SessionLocal()
+        drop_medication_search(self.db.connection())
+        self.db.commit()
+
+    def next_seqns(self, start: Optional[int], count: int) -> np.ndarray:
+        seqns = allocate_seqns(self.db, count)
+        return np.arange(seqns.start, seqns.stop, dtype=np.int64)
+
+    def write(self, tables: dict):
+        for model in [model for model, _ in PATIENT_TABLES] + [Medication]:
+            rows = frame_to_rows(csv_frame(tables[model]), model)
+            for start in range(0, len(rows), self.insert_chunk_size):
+                self.db.execute(insert(model.__table__), rows[start:start + self.insert_chunk_size])
+        seqns = tables[Demographic]["seqn"].tolist()
+        refresh_patient_summaries(self.db, seqns)
+        refresh_patient_treatments(self.db, seqns)
+        self.db.commit()
+
+    def close(self):
+        try:
+            print("Rebuilding medication search index...")
+            ensure_medication_search(self.db.connection())
+            update_planner_stats(self.db.connection(), force=True)
+            self.db.commit()
+        finally:
+            self.db.close()
+
+
+def generate(
+    profile: Profile,
+    output,
+    patients: int,
+    seed: int,
+    chunk_size: int,
+    start_seqn: Optional[int] = None,
+) -> int:
+    """Generate ``patients`` patients into ``output`` and return the medication row count."""
+    medication_rows = 0
+    next_seqn = start_seqn if start_seqn is not None else profile.max_seqn + 1
+    started = time.perf_counter()
+    try:
+        for chunk, offset in enumerate(range(0, patients, chunk_size)):
+            count = min(chunk_size, patients - offset)
+            seqns = output.next_seqns(next_seqn, count)
+            next_seqn = int(seqns[-1]) + 1
+            tables = generate_chunk(profile, seqns, chunk_rng(seed, chunk))
+            output.write(tables)
+            medication_rows += len(tables[Medication])
+            done = offset + count
+            rate = done / (time.perf_counter() - started)
+            print(f"  {done}/{patients} patients ({rate:,.0f}/s)")
+    finally:
+        output.close()
+    return medication_rows
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Generate synthetic NHANES-shaped patients.")
+    parser.add_argument("--patients", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="db",
+                        help="db inserts into DATABASE_URL; csv (loadable by seed_db.py) and parquet write one file per table")
+    parser.add_argument("--output", help="Directory for csv/parquet output")
+    parser.add_argument("--source", default=settings.csv_data_path, help="CSVs to learn from")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Patients generated per chunk")
+    parser.add_argument("--start-seqn", type=int,
+                        help="First SEQN for file output (default: after the source's largest)")
+    args = parser.parse_args()
+    if args.format != "db" and not args.output:
+        parser.error("--output is required for csv and parquet")
+
+    print(f"Learning profile from {args.source}...")
+    profile = learn_profile(args.source)
+    print(f"  {len(profile.variables)} variables, {len(profile.donor_counts)} medication donors")
+
+    if args.format == "db":
+        output = DatabaseOutput(settings.seed_chunk_size)
+    else:
+        output = FileOutput(args.output, args.format)
+    started = time.perf_counter()
+    medication_rows = generate(profile, output, args.patients, args.seed, args.chunk_size, args.start_seqn)
+    print(f"Generated {args.patients} patients and {medication_rows} medication rows "
+          f"in {time.perf_counter() - started:.1f}s")
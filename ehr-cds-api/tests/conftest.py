@@ -0,0 +1,51 @@
+"""
+Shared fixtures for the API tests.
+
+Settings are read when the app modules are first imported, so the database
+and CSV directory are pointed at a temporary directory here, before any of
+them are. ``seeded`` seeds that database once per session from a small
+generated NHANES extract.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="ehr-cds-tests-")
+CSV_PATH = os.path.join(WORKDIR, "med_data")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'ehr_cds.db')}",
+    "CSV_DATA_PATH": CSV_PATH,
+    "ASYNC_DB": "false",
+    "FAST_JSON": "false",
+    "SEED_SYNC": "false",
+})
+sys.path.insert(0, API_DIR)
+
+from factories import sample_tables, write_tables  # noqa: E402  (needs the settings above)
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """Seed the session database; returns the tables it was seeded from."""
+    from seed_db import init_db
+
+    tables = sample_tables()
+    write_tables(CSV_PATH, tables)
+    init_db()
+    return tables
+
+
+@pytest.fixture
+def client(seeded):
+    """A client for the app on the seeded database, with empty result caches."""
+    from fastapi.testclient import TestClient
+
+    from cache import invalidate_patient_caches
+    from main import app
+
+    invalidate_patient_caches()
+    return TestClient(app)
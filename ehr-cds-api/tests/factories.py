@@ -0,0 +1,82 @@
+"""
+Small generated NHANES extracts for the tests.
+
+Only the columns the API derives something from are filled in; the seeder
+leaves every other model column empty, as it does for a CSV that lacks it.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DRUGS = [
+    ("LISINOPRIL", "Essential (primary) hypertension"),
+    ("AMLODIPINE", "Essential (primary) hypertension"),
+    ("METFORMIN", "Type 2 diabetes mellitus"),
+    ("INSULIN GLARGINE", "Type 2 diabetes mellitus"),
+    ("ATORVASTATIN", "Hyperlipidemia"),
+    ("LEVOTHYROXINE", "Hypothyroidism"),
+]
+
+FILENAMES = {
+    "demographic": "demographic.csv",
+    "examination": "examination.csv",
+    "labs": "labs.csv",
+    "diet": "diet.csv",
+    "questionnaire": "questionnaire.csv",
+    "medications": "medications.csv",
+}
+
+
+def sample_tables(patients: int = 60, first_seqn: int = 1000, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """One row per patient in each table, and zero to three medications each."""
+    rng = np.random.default_rng(seed)
+    seqns = np.arange(first_seqn, first_seqn + patients)
+
+    def readings(low, high):
+        return rng.integers(low, high, patients)
+
+    tables = {
+        "demographic": pd.DataFrame({
+            "SEQN": seqns,
+            "RIAGENDR": rng.integers(1, 3, patients),
+            "RIDAGEYR": readings(20, 86),
+            "RIDRETH3": rng.integers(1, 8, patients),
+            "DMDEDUC2": rng.integers(1, 6, patients),
+            "DMDMARTL": rng.integers(1, 7, patients),
+        }),
+        "examination": pd.DataFrame({
+            "SEQN": seqns,
+            **{f"BPXSY{i}": readings(100, 185) for i in (1, 2, 3)},
+            **{f"BPXDI{i}": readings(55, 115) for i in (1, 2, 3)},
+            "BMXBMI": np.round(rng.uniform(18, 42, patients), 1),
+        }),
+        "labs": pd.DataFrame({
+            "SEQN": seqns,
+            "LBXSCR": np.round(rng.uniform(0.5, 2.5, patients), 2),
+            "LBXGH": np.round(rng.uniform(4.5, 10.5, patients), 1),
+            "LBXSGL": readings(70, 250),
+            "LBXTC": readings(120, 300),
+        }),
+        "diet": pd.DataFrame({"SEQN": seqns, "DR1TKCAL": readings(1200, 3500)}),
+        "questionnaire": pd.DataFrame({
+            "SEQN": seqns,
+            "BPQ020": rng.integers(1, 3, patients),
+            "DIQ010": rng.integers(1, 3, patients),
+        }),
+    }
+
+    medications = []
+    for seqn in seqns:
+        for index in rng.choice(len(DRUGS), rng.integers(0, 4), replace=False):
+            drug, reason = DRUGS[index]
+            medications.append({"SEQN": seqn, "RXDDRUG": drug, "RXDRSD1": reason})
+    tables["medications"] = pd.DataFrame(medications, columns=["SEQN", "RXDDRUG", "RXDRSD1"])
+    return tables
+
+
+def write_tables(csv_path: str, tables: dict[str, pd.DataFrame]):
+    """Write the tables as the NHANES CSV files the seeder reads."""
+    os.makedirs(csv_path, exist_ok=True)
+    for name, frame in tables.items():
+        frame.to_csv(os.path.join(csv_path, FILENAMES[name]), index=False)
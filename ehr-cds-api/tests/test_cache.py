@@ -0,0 +1,65 @@
+"""Cache backends and their selection per worker count."""
+import pytest
+
+from cache import (
+    CACHE_BACKENDS, CacheBackend, NullCache, ResultCache, cohort_stats_cache, make_cache_backend, patient_count_cache,
+)
+
+
+def test_single_worker_gets_the_configured_backend():
+    cache = make_cache_backend("memory", maxsize=10, ttl=5.0)
+    assert isinstance(cache, ResultCache)
+    assert (cache.maxsize, cache.ttl) == (10, 5.0)
+
+
+def test_process_local_backends_are_disabled_with_several_workers():
+    cache = make_cache_backend("memory", maxsize=10, ttl=None, workers=4)
+    assert isinstance(cache, NullCache)
+    cache.set(1, b"detail")
+    assert cache.get(1) is None
+    assert cache.get_or_compute(1, lambda: b"fresh") == b"fresh"
+
+
+def test_shared_backends_are_kept_with_several_workers(monkeypatch):
+    class SharedCache(ResultCache):
+        process_local = False
+
+    monkeypatch.setitem(CACHE_BACKENDS, "shared", SharedCache)
+    assert isinstance(make_cache_backend("shared", maxsize=10, ttl=None, workers=4), SharedCache)
+
+
+def test_incomplete_backends_cannot_be_created():
+    class GetSetOnly(CacheBackend):
+        def get(self, key, default=None):
+            return default
+
+        def set(self, key, value):
+            pass
+
+    with pytest.raises(TypeError, match="clear, delete"):
+        GetSetOnly()
+    for backend in CACHE_BACKENDS.values():
+        backend()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown cache backend"):
+        make_cache_backend("redis", maxsize=10, ttl=None)
+
+
+def test_result_caches_expire_by_default():
+    assert cohort_stats_cache.ttl is not None and cohort_stats_cache.ttl > 0
+    assert patient_count_cache.ttl == cohort_stats_cache.ttl
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(maxsize=10, ttl=60.0)
+    cache.set(("gender", "female"), 412)
+
+    now[0] += 59
+    assert cache.get(("gender", "female")) == 412
+    now[0] += 2
+    assert cache.get(("gender", "female")) is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,164 @@
+"""Batch scoring must match the scalar clinical helpers exactly, including at rounding ties."""
+import numpy as np
+import pytest
+
+from clinical import (
+    _round_like_python, average_bp_readings, calculate_egfr, calculate_risk_level, calculate_risk_score,
+    decode_gender, optional_float, optional_int, score_patients_batch, status_for_risk_level,
+)
+
+
+def scalar_scores(row: dict) -> dict:
+    """Score one patient the way the detail endpoint and summary table do."""
+    gender = decode_gender(row["riagendr"])
+    systolic = average_bp_readings(*row["systolic"])
+    diastolic = average_bp_readings(*row["diastolic"])
+    egfr = calculate_egfr(row["lbxscr"], row["ridageyr"] or 0, gender)
+    diabetes = row["diq010"] == 1
+    hypertension = row["bpq020"] == 1
+    risk_level = calculate_risk_level(row["lbxgh"], systolic, egfr, diabetes, hypertension)
+    return {
+        "systolic": systolic,
+        "diastolic": diastolic,
+        "egfr": egfr,
+        "risk_score": calculate_risk_score(row["lbxgh"], systolic, egfr, diabetes, hypertension),
+        "risk_level": risk_level,
+        "status": status_for_risk_level(risk_level),
+    }
+
+
+def batch_scores(rows: list[dict]) -> list[dict]:
+    """Score the rows in one ``score_patients_batch`` call, converted back to Python values."""
+    scores = score_patients_batch(
+        riagendr=[row["riagendr"] for row in rows],
+        ridageyr=[row["ridageyr"] for row in rows],
+        lbxscr=[row["lbxscr"] for row in rows],
+        lbxgh=[row["lbxgh"] for row in rows],
+        systolic_readings=[[row["systolic"][i] for row in rows] for i in range(3)],
+        diastolic_readings=[[row["diastolic"][i] for row in rows] for i in range(3)],
+        diq010=[row["diq010"] for row in rows],
+        bpq020=[row["bpq020"] for row in rows],
+    )
+    return [
+        {
+            "systolic": optional_int(scores["systolic"][i]),
+            "diastolic": optional_int(scores["diastolic"][i]),
+            "egfr": optional_float(scores["egfr"][i]),
+            "risk_score": int(scores["risk_score"][i]),
+            "risk_level": scores["risk_level"][i],
+            "status": scores["status"][i],
+        }
+        for i in range(len(rows))
+    ]
+
+
+def assert_batch_matches_scalar(rows: list[dict]):
+    for row, batch in zip(rows, batch_scores(rows)):
+        assert batch == scalar_scores(row), row
+
+
+def patient(**values) -> dict:
+    row = {
+        "riagendr": 1, "ridageyr": 50, "lbxscr": 1.0, "lbxgh": 5.5,
+        "systolic": (120, 120, 120), "diastolic": (80, 80, 80), "diq010": 2, "bpq020": 2,
+    }
+    row.update(values)
+    return row
+
+
+def random_rows(rng: np.random.Generator, count: int) -> list[dict]:
+    """Patients with realistic ranges, each value missing 10% of the time."""
+    def maybe(value):
+        return None if rng.random() < 0.1 else value
+
+    def reading(low, high):
+        return maybe(int(rng.integers(low, high)))
+
+    return [
+        {
+            "riagendr": maybe(int(rng.choice([1, 2, 2, 1, 3]))),
+            "ridageyr": maybe(int(rng.integers(0, 90))),
+            "lbxscr": maybe(round(float(rng.choice([rng.uniform(0.2, 4.0), 0.0, -0.5], p=[0.96, 0.02, 0.02])), 2)),
+            "lbxgh": maybe(round(float(rng.uniform(4.0, 12.0)), 1)),
+            "systolic": tuple(reading(85, 200) for _ in range(3)),
+            "diastolic": tuple(reading(40, 120) for _ in range(3)),
+            "diq010": maybe(int(rng.integers(1, 4))),
+            "bpq020": maybe(int(rng.integers(1, 4))),
+        }
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_cohorts_match_scalar_scoring(seed):
+    assert_batch_matches_scalar(random_rows(np.random.default_rng(seed), 20_000))
+
+
+def test_empty_cohort():
+    assert batch_scores([]) == []
+
+
+@pytest.mark.parametrize("readings", [
+    (120, 121, None),   # 120.5 -> 120 (ties round to even)
+    (121, 122, None),   # 121.5 -> 122
+    (139, 140, None),   # 139.5 -> 140, crossing the 140 risk threshold
+    (129, 130, None),   # 129.5 -> 130, crossing the 130 risk threshold
+    (179, None, 180),   # 179.5 -> 180, crossing the 180 risk threshold
+    (None, None, None),
+    (None, 133, None),
+    (100, 101, 102),
+])
+def test_bp_averages_at_half_way_points(readings):
+    assert_batch_matches_scalar([patient(systolic=readings, diastolic=readings)])
+
+
+def half_way_egfr_rows() -> list[dict]:
+    """
+    Patients whose creatinine is solved back from an x.x5 eGFR, so the
+    unrounded value lands on the tie give or take a few ulps.
+    """
+    rows = []
+    for gender, kappa, scale, low in ((1, 0.9, 141, -0.411), (2, 0.7, 144, -0.329)):
+        for age in (0, 18, 35, 47, 62, 80, 89):
+            base = scale * 0.993 ** age
+            for target in (15.05, 29.95, 45.05, 59.95, 72.45, 88.85, 89.95, 104.25, 120.55, 150.35):
+                exponent = low if target >= base else -1.209
+                creatinine = kappa * (target / base) ** (1 / exponent)
+                rows.append(patient(riagendr=gender, ridageyr=age, lbxscr=creatinine))
+    return rows
+
+
+def test_egfr_at_half_way_points():
+    assert_batch_matches_scalar(half_way_egfr_rows())
+
+
+@pytest.mark.parametrize("value, ndigits", [
+    (2.675, 2),      # stored just below the tie: Python gives 2.67
+    (1.005, 2),
+    (0.125, 2),      # exact tie: rounds to even
+    (72.45, 1),
+    (88.85, 1),
+    (59.95, 1),      # rounds onto the 60 eGFR threshold
+    (29.95, 1),
+    (0.5, 0),
+    (1.5, 0),
+    (2.5, 0),
+    (139.5, 0),
+])
+def test_round_like_python_at_ties(value, ndigits):
+    rounded = _round_like_python(np.array([value, np.nan]), ndigits)
+    assert rounded[0] == round(value, ndigits)
+    assert np.isnan(rounded[1])
+
+
+@pytest.mark.parametrize("lbxgh, egfr_row, level", [
+    (9.0, {"lbxscr": 2.5}, "high"),
+    (6.4, {}, "low"),
+    (6.5, {}, "moderate"),
+    (None, {"lbxscr": None}, "low"),
+    (7.0, {"diq010": 1, "bpq020": 1}, "high"),
+])
+def test_thresholds(lbxgh, egfr_row, level):
+    row = patient(lbxgh=lbxgh, **egfr_row)
+    assert_batch_matches_scalar([row])
+    assert scalar_scores(row)["risk_level"] == level
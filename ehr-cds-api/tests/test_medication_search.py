@@ -0,0 +1,73 @@
+"""Medication search: paging and totals in SQL, normalized terms, cached index lookup."""
+import pytest
+
+import medication_search
+from database import ReadSessionLocal, SessionLocal
+from medication_search import drop_medication_search, ensure_medication_search, search_medications
+
+
+def expected_matches(seeded, drug: str) -> list[tuple[int, int]]:
+    meds = seeded["medications"]
+    counts = meds[meds["RXDDRUG"] == drug].groupby("SEQN").size()
+    return [(int(seqn), int(count)) for seqn, count in counts.items()]
+
+
+@pytest.mark.parametrize("limit, offset", [(1000, 0), (3, 0), (4, 5), (1000, 2)])
+def test_pages_and_totals(client, seeded, limit, offset):
+    expected = expected_matches(seeded, "METFORMIN")
+    response = client.get("/api/medications/search", params={"q": "metformin", "limit": limit, "offset": offset})
+    body = response.json()
+    assert (body["total_patients"], body["total_matches"]) == (len(expected), sum(c for _, c in expected))
+    assert [(item["seqn"], item["matches"]) for item in body["items"]] == expected[offset:offset + limit]
+
+
+def test_offset_past_the_end_keeps_the_totals(client, seeded):
+    expected = expected_matches(seeded, "LISINOPRIL")
+    body = client.get("/api/medications/search", params={"q": "lisinopril", "offset": 10_000}).json()
+    assert body["items"] == []
+    assert body["total_patients"] == len(expected)
+
+
+def test_query_reports_the_normalized_terms(client):
+    body = client.get("/api/medications/search", params={"q": ["  insulin   glar!", "E11.9", "--"]}).json()
+    assert body["query"] == ["insulin glar", "E11.9"]
+    assert client.get("/api/medications/search", params={"q": "!!"}).status_code == 400
+
+
+def test_like_fallback_matches_fts(seeded, monkeypatch):
+    with ReadSessionLocal() as db:
+        fts = search_medications(db, ["amlodipine"], limit=5, offset=1)
+        monkeypatch.setattr(medication_search, "fts_available", lambda conn: False)
+        like = search_medications(db, ["amlodipine"], limit=5, offset=1)
+    assert like == fts
+    assert fts.items and fts.total_patients == len(expected_matches(seeded, "AMLODIPINE"))
+
+
+def test_index_lookup_is_cached_until_dropped(seeded, monkeypatch):
+    lookups = []
+    fts_ready = medication_search.fts_ready
+    monkeypatch.setattr(medication_search, "fts_ready", lambda conn: lookups.append(1) or fts_ready(conn))
+    medication_search._fts_ready_urls.clear()
+
+    with ReadSessionLocal() as db:
+        expected = search_medications(db, ["metformin"])
+        for _ in range(3):
+            assert search_medications(db, ["metformin"]) == expected
+    assert len(lookups) == 1
+
+    with SessionLocal() as writer:
+        drop_medication_search(writer.connection())
+        writer.commit()
+        try:
+            with ReadSessionLocal() as db:
+                # Dropped in this process: the lookup runs again and falls back to LIKE
+                assert search_medications(db, ["metformin"]) == expected
+                assert len(lookups) == 2
+
+                # Dropped by another process while this one still trusts its cache
+                medication_search._fts_ready_urls.add(str(db.connection().engine.url))
+                assert search_medications(db, ["metformin"]) == expected
+                assert not medication_search._fts_ready_urls
+        finally:
+            ensure_medication_search(writer.connection())
+            writer.commit()
@@ -0,0 +1,59 @@
+"""Per-request DB headers: present on complete responses, absent on streamed ones."""
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from metrics import DB_TIME_HEADER, QUERY_COUNT_HEADER, MetricsMiddleware, current_request
+
+
+def test_detail_responses_report_their_queries(client):
+    response = client.get("/api/patients/1001")
+    assert response.status_code == 200
+    assert int(response.headers[QUERY_COUNT_HEADER]) >= 1
+    assert float(response.headers[DB_TIME_HEADER]) > 0
+
+
+def test_streamed_exports_omit_the_db_headers(client):
+    response = client.get("/api/patients/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.count("\n") > 60
+    assert QUERY_COUNT_HEADER not in response.headers
+    assert DB_TIME_HEADER not in response.headers
+
+
+def test_headers_follow_how_the_body_is_sent():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    def query():
+        current_request.get().queries += 1
+
+    @app.delete("/item", status_code=204)
+    def delete_item():
+        query()
+
+    @app.get("/empty-stream")
+    def empty_stream():
+        query()
+        return StreamingResponse(iter([]))
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            query()
+            yield b"late"
+        return StreamingResponse(chunks())
+
+    @app.get("/bytes")
+    def raw():
+        query()
+        query()
+        return Response(b"done")
+
+    client = TestClient(app)
+    assert client.delete("/item").headers[QUERY_COUNT_HEADER] == "1"
+    assert client.get("/bytes").headers[QUERY_COUNT_HEADER] == "2"
+    assert client.get("/empty-stream").headers[QUERY_COUNT_HEADER] == "1"
+    streamed = client.get("/stream")
+    assert streamed.content == b"late"
+    assert QUERY_COUNT_HEADER not in streamed.headers
@@ -0,0 +1,104 @@
+"""Batch patient detail endpoints: query count, ordering and unknown ids."""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from cache import patient_detail_cache
+from database import read_engine
+from routes.patients import MAX_BATCH_IDS
+
+
+@contextmanager
+def count_queries():
+    """Count statements executed on the reader engine inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(read_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(read_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def batch_ids(seeded, size: int) -> list[int]:
+    """``size`` ids: every seeded patient first, then SEQNs that don't exist."""
+    known = seeded["demographic"]["SEQN"].tolist()
+    unknown = range(max(known) + 1, max(known) + 1 + size)
+    return (known + list(unknown))[:size]
+
+
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_batch_query_count_is_independent_of_id_count(client, seeded, method):
+    counts = {}
+    for size in (1, 50, MAX_BATCH_IDS):
+        ids = batch_ids(seeded, size)
+        patient_detail_cache.clear()
+        with count_queries() as counter:
+            if method == "get":
+                response = client.get("/api/patients/batch", params={"ids": ",".join(map(str, ids))})
+            else:
+                response = client.post("/api/patients/batch", json={"ids": ids})
+        assert response.status_code == 200
+        counts[size] = counter["queries"]
+
+    # Patients with their one-to-one tables, then all of their medications
+    assert set(counts.values()) == {2}, counts
+
+
+def test_batch_warm_cache_needs_no_queries(client, seeded):
+    ids = batch_ids(seeded, 10)
+    client.post("/api/patients/batch", json={"ids": ids})
+    with count_queries() as counter:
+        response = client.post("/api/patients/batch", json={"ids": ids})
+    assert response.status_code == 200
+    assert counter["queries"] == 0
+
+
+def test_batch_keeps_request_order_and_drops_duplicates(client, seeded):
+    known = seeded["demographic"]["SEQN"].tolist()
+    ids = [known[5], known[0], known[5], known[3], known[0]]
+    # Comma-separated and repeated parameters combine
+    params = {"ids": [f"{known[5]},{known[0]}", str(known[5]), f"{known[3]},{known[0]}"]}
+    response = client.get("/api/patients/batch", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["seqn"] for item in body["items"]] == [known[5], known[0], known[3]]
+    assert body["missing"] == []
+
+    assert client.post("/api/patients/batch", json={"ids": ids}).json() == body
+
+
+def test_batch_reports_unknown_ids(client, seeded):
+    known = seeded["demographic"]["SEQN"].tolist()
+    unknown = max(known) + 100
+    response = client.post("/api/patients/batch", json={"ids": [unknown, known[1], unknown + 1]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["seqn"] for item in body["items"]] == [known[1]]
+    assert body["missing"] == [unknown, unknown + 1]
+
+
+def test_batch_matches_single_patient_detail(client, seeded):
+    seqn = seeded["demographic"]["SEQN"].iloc[7]
+    item = client.post("/api/patients/batch", json={"ids": [int(seqn)]}).json()["items"][0]
+    assert item == client.get(f"/api/patients/{seqn}").json()
+
+
+def test_batch_rejects_oversized_requests(client):
+    ids = ",".join(str(i) for i in range(1, MAX_BATCH_IDS + 2))
+    response = client.get("/api/patients/batch", params={"ids": ids})
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"At most {MAX_BATCH_IDS} ids per request"
+
+    # The POST body is validated by PatientBatchRequest before the handler runs
+    response = client.post("/api/patients/batch", json={"ids": list(range(1, MAX_BATCH_IDS + 2))})
+    assert response.status_code == 422
+
+
+def test_batch_rejects_non_integer_ids(client):
+    response = client.get("/api/patients/batch", params={"ids": "1,two"})
+    assert response.status_code == 400
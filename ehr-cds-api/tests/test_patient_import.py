@@ -0,0 +1,167 @@
+"""Bulk patient import: per-row validation, chunk transactions and SEQN allocation."""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select
+
+import patient_import
+from config import get_settings
+from database import SessionLocal
+from models import Demographic, PatientSummary
+from patient_import import allocate_seqns, bulk_import, import_patients, iter_lines
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(chunks, max_line_bytes: int) -> list:
+    return [line async for line in iter_lines(chunks, max_line_bytes)]
+
+
+def patient(**values) -> dict:
+    return {"gender": "female", "age": 54, "hba1c": 6.8, **values}
+
+
+def statuses(response) -> list[tuple]:
+    return [(r["row"], r["status"]) for r in response.json()["results"]]
+
+
+def test_lines_split_across_chunks():
+    chunks = stream(b'{"a": 1}\r\n{"b"', b': 2}\n\n', b'{"c": 3}')
+    assert asyncio.run(collect(chunks, 100)) == [b'{"a": 1}', b'{"b": 2}', b"", b'{"c": 3}']
+
+
+def test_overlong_lines_are_dropped_as_they_stream():
+    chunks = stream(b"ok\n" + b"x" * 6, b"x" * 6, b"x" * 6 + b"\nfine\n", b"y" * 11 + b"\nend", b"z" * 20)
+    assert asyncio.run(collect(chunks, 10)) == [b"ok", None, b"fine", None, None]
+
+
+def test_ndjson_rows_fail_individually(client):
+    body = b"\n".join([
+        json.dumps(patient()).encode(),
+        b"{not json",
+        b"[1, 2]",
+        json.dumps(patient(age=-5)).encode(),
+        b"",
+        b'{"gender": "male", "age": 40, "note": "\xff"}',
+        json.dumps(patient(gender="male", hba1c=9.1)).encode(),
+    ])
+    response = client.post("/api/patients/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert statuses(response) == [
+        (1, "created"), (2, "error"), (3, "error"), (4, "error"), (5, "error"), (6, "created"),
+    ]
+    results = response.json()["results"]
+    assert results[2]["errors"] == ["Each line must be a JSON object"]
+    assert results[3]["errors"][0].startswith("age:")
+    assert results[4]["errors"][0].startswith("Invalid UTF-8 at byte")
+    assert (response.json()["created"], response.json()["failed"]) == (2, 4)
+
+    hba1c = client.get(f"/api/patients/{results[5]['seqn']}").json()["hba1c"]
+    assert hba1c == 9.1
+
+
+def test_csv_rows_fail_individually(client):
+    body = "\n".join([
+        "gender,age,hba1c,smoker",
+        "female,61,7.2,true",
+        "unknown,61,7.2,false",
+        "male,,5.4,false",
+        "male,72,,",
+    ]).encode()
+    response = client.post("/api/patients/bulk", content=body, headers={"content-type": "text/csv"})
+    assert statuses(response) == [(1, "created"), (2, "error"), (3, "error"), (4, "created")]
+    assert response.json()["results"][1]["errors"][0].startswith("gender:")
+
+    detail = client.get(f"/api/patients/{response.json()['results'][3]['seqn']}").json()
+    assert (detail["gender"], detail["age"], detail["hba1c"]) == ("male", 72, None)
+
+
+def test_overlong_lines_fail_their_row(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "import_max_line_bytes", 200)
+    body = b"\n".join([
+        json.dumps(patient()).encode(),
+        json.dumps(patient(padding="x" * 500)).encode(),
+        json.dumps(patient()).encode(),
+    ])
+    response = client.post("/api/patients/bulk?format=ndjson", content=body)
+    assert statuses(response) == [(1, "created"), (2, "error"), (3, "created")]
+    assert response.json()["results"][1]["errors"] == ["Line is longer than 200 bytes"]
+
+    header = ",".join(["gender", "age"] + [f"unused_{i}" for i in range(50)])
+    response = client.post("/api/patients/bulk?format=csv", content=f"{header}\nmale,50".encode())
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CSV header is longer than 200 bytes"
+
+
+def test_failed_chunk_rolls_back_without_consuming_seqns(seeded, monkeypatch):
+    refresh = patient_import.refresh_patient_treatments
+    calls = []
+
+    def failing_second_chunk(db, seqns):
+        calls.append(list(seqns))
+        if len(calls) == 2:
+            raise RuntimeError("disk I/O error")
+        return refresh(db, seqns)
+
+    monkeypatch.setattr(patient_import, "refresh_patient_treatments", failing_second_chunk)
+    lines = b"\n".join(json.dumps(patient(age=30 + i)).encode() for i in range(6))
+
+    with SessionLocal() as db:
+        async def flush(batch):
+            return import_patients(db, batch)
+
+        response = asyncio.run(bulk_import(stream(lines), "ndjson", 2, 1000, flush))
+
+        assert [r.status for r in response.results] == ["created"] * 2 + ["error"] * 2 + ["created"] * 2
+        assert response.results[2].errors == ["Chunk failed: disk I/O error"]
+        first, failed, third = calls
+        assert third == failed == [first[1] + 1, first[1] + 2]
+        assert [r.seqn for r in response.results if r.seqn] == first + third
+
+        for model in (Demographic, PatientSummary):
+            assert db.scalar(select(func.count()).select_from(model).where(model.seqn.in_(first + third))) == 4
+
+
+def test_concurrent_allocations_never_overlap(seeded):
+    def allocate(count: int) -> range:
+        with SessionLocal() as db:
+            seqns = allocate_seqns(db, count)
+            db.commit()
+            return seqns
+
+    sizes = [1, 7, 3, 50, 2, 11, 1, 25] * 5
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        blocks = list(pool.map(allocate, sizes))
+
+    assert [len(block) for block in blocks] == sizes
+    allocated = sorted(seqn for block in blocks for seqn in block)
+    assert len(allocated) == len(set(allocated)) == sum(sizes)
+
+    with SessionLocal() as db:
+        highest = db.scalar(select(func.max(Demographic.seqn)))
+    assert min(allocated) > highest
+
+
+def test_allocations_start_above_rows_inserted_around_the_counter(seeded):
+    with SessionLocal() as db:
+        before = allocate_seqns(db, 3)
+        db.add(Demographic(seqn=before.stop + 100, riagendr=1, ridageyr=50))
+        db.commit()
+        after = allocate_seqns(db, 3)
+        db.rollback()
+    assert after.start == before.stop + 101
+
+
+@pytest.mark.parametrize("format, content_type, expected", [
+    (None, "text/csv", "csv"),
+    (None, "application/x-ndjson", "ndjson"),
+    (None, None, "ndjson"),
+    ("csv", "application/json", "csv"),
+])
+def test_resolve_import_format(format, content_type, expected):
+    assert patient_import.resolve_import_format(format, content_type) == expected
@@ -0,0 +1,107 @@
+"""The async patient routes answer like the sync ones, without scoring on the event loop."""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from cache import invalidate_patient_caches
+from routes import patients
+from routes.patients import router as sync_router
+from routes.patients_async import router as async_router
+
+
+def client_for(router) -> TestClient:
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+@pytest.fixture
+def clients(seeded):
+    invalidate_patient_caches()
+    with client_for(sync_router) as sync_client, client_for(async_router) as async_client:
+        yield sync_client, async_client
+
+
+def get_both(clients, path: str, **kwargs):
+    responses = []
+    for client in clients:
+        # Each router fills the shared caches; start both from the database
+        invalidate_patient_caches()
+        responses.append(client.get(path, **kwargs))
+    return responses
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/patients", {}),
+    ("/api/patients", {"page": 2, "page_size": 7}),
+    ("/api/patients", {"gender": "female", "min_age": 40, "risk_level": "high"}),
+    ("/api/patients", {"on_antihypertensive": "true", "include_total": "false"}),
+    ("/api/patients", {"after_seqn": 1010, "page_size": 5}),
+    ("/api/patients", {"cursor": "c2VxbjoxMDIw"}),
+    ("/api/patients", {"cursor": "not-a-cursor"}),
+    ("/api/patients/1003", {}),
+    ("/api/patients/999999", {}),
+    ("/api/patients/batch", {"ids": "1005,999999,1001,1005"}),
+    ("/api/patients/1004/medications", {}),
+    ("/api/patients/999999/medications", {}),
+])
+def test_reads_match_sync_routes(clients, path, params):
+    sync_response, async_response = get_both(clients, path, params=params)
+    assert async_response.status_code == sync_response.status_code
+    assert async_response.json() == sync_response.json()
+
+
+def test_batch_post_matches_sync_route(clients):
+    sync_client, async_client = clients
+    body = {"ids": [1002, 1000, 999999]}
+    assert async_client.post("/api/patients/batch", json=body).json() == \
+        sync_client.post("/api/patients/batch", json=body).json()
+
+
+def test_writes_are_visible_to_sync_routes(clients):
+    sync_client, async_client = clients
+    created = async_client.post("/api/patients", json={
+        "gender": "male", "age": 61, "blood_pressure_systolic": 150, "hba1c": 7.1, "creatinine": 1.3,
+    })
+    assert created.status_code == 201
+    seqn = created.json()["seqn"]
+    assert sync_client.get(f"/api/patients/{seqn}").json() == created.json()
+
+    updated = async_client.put(f"/api/patients/{seqn}", json={"hba1c": 9.4})
+    assert updated.status_code == 200
+    assert updated.json()["hba1c"] == 9.4
+    invalidate_patient_caches()
+    assert sync_client.get(f"/api/patients/{seqn}").json() == updated.json()
+
+    assert async_client.delete(f"/api/patients/{seqn}").status_code == 204
+    assert sync_client.get(f"/api/patients/{seqn}").status_code == 404
+    assert async_client.put(f"/api/patients/{seqn}", json={"hba1c": 5.0}).status_code == 404
+    assert async_client.delete(f"/api/patients/{seqn}").status_code == 404
+
+
+def test_scoring_and_serialization_run_off_the_event_loop(clients, monkeypatch):
+    _, async_client = clients
+    calls = []
+
+    def recording(function):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                calls.append((function.__name__, "event loop"))
+            except RuntimeError:
+                calls.append((function.__name__, "worker thread"))
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(patients, "patient_list_rows", recording(patients.patient_list_rows))
+    monkeypatch.setattr(patients, "patient_detail_values", recording(patients.patient_detail_values))
+
+    invalidate_patient_caches()
+    assert async_client.get("/api/patients").status_code == 200
+    assert async_client.get("/api/patients/1001").status_code == 200
+    assert async_client.post("/api/patients/batch", json={"ids": [1002, 1003]}).status_code == 200
+
+    assert {name for name, _ in calls} == {"patient_list_rows", "patient_detail_values"}
+    assert {place for _, place in calls} == {"worker thread"}
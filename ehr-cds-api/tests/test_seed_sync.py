@@ -0,0 +1,249 @@
+"""Incremental re-seeding applies exactly the CSV rows that changed."""
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import Session
+
+from database import Base
+from factories import sample_tables, write_tables
+from models import (
+    Demographic, Examination, Labs, Diet, Questionnaire, Medication, PatientSummary, PatientTreatment,
+    SeedFile, SeedRowHash,
+)
+from seed_db import SEED_STEPS
+from seed_sync import record_seed_state, sync_seed_data
+from summary import rebuild_patient_summaries
+from treatment import rebuild_patient_treatments
+
+FIRST_SEQN = 5000
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    """A database fully seeded from a fresh extract, with its seed state recorded."""
+    csv_path = str(tmp_path / "med_data")
+    tables = sample_tables(patients=20, first_seqn=FIRST_SEQN, seed=1)
+    write_tables(csv_path, tables)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for _, _, seed in SEED_STEPS:
+            seed(db, csv_path, 1000)
+        rebuild_patient_summaries(db)
+        rebuild_patient_treatments(db)
+        record_seed_state(db, csv_path)
+        yield db, csv_path, tables
+    engine.dispose()
+
+
+def sync(db: Session, csv_path: str, tables: dict) -> dict:
+    write_tables(csv_path, tables)
+    return sync_seed_data(db, csv_path, chunk_size=7)
+
+
+def changes(results: dict) -> dict:
+    """(inserted, updated, deleted, skipped) of each table that was diffed."""
+    return {
+        table: (c.inserted, c.updated, c.deleted, c.skipped)
+        for table, c in results.items() if not c.unchanged
+    }
+
+
+def medication_rows(db: Session, seqn: int) -> list[tuple]:
+    return db.execute(
+        select(Medication.rxddrug, Medication.rxdrsd1).where(Medication.seqn == seqn).order_by(Medication.id)
+    ).all()
+
+
+def csv_medication_rows(tables: dict, seqn: int) -> list[tuple]:
+    meds = tables["medications"]
+    return list(meds.loc[meds["SEQN"] == seqn, ["RXDDRUG", "RXDRSD1"]].itertuples(index=False, name=None))
+
+
+def test_unchanged_files_are_not_diffed(seeded_db):
+    db, csv_path, tables = seeded_db
+    results = sync(db, csv_path, tables)
+    assert all(c.unchanged for c in results.values())
+
+
+@pytest.mark.parametrize("name, model, column, value", [
+    ("examination", Examination, "BPXSY1", 199),
+    ("labs", Labs, "LBXGH", 12.3),
+    ("diet", Diet, "DR1TKCAL", 4321),
+    ("questionnaire", Questionnaire, "DIQ010", 3),
+])
+def test_update_delete_and_insert_per_table(seeded_db, name, model, column, value):
+    db, csv_path, tables = seeded_db
+    table = model.__tablename__
+    seqn = FIRST_SEQN + 4
+    original = tables[name]
+    row = original["SEQN"] == seqn
+
+    updated = original.copy()
+    updated.loc[row, column] = value
+    tables[name] = updated
+    assert changes(sync(db, csv_path, tables)) == {table: (0, 1, 0, 0)}
+    db.expire_all()
+    assert getattr(db.get(model, seqn), column.lower()) == value
+
+    tables[name] = updated[~row]
+    assert changes(sync(db, csv_path, tables)) == {table: (0, 0, 1, 0)}
+    db.expire_all()
+    assert db.get(model, seqn) is None
+
+    tables[name] = original
+    assert changes(sync(db, csv_path, tables)) == {table: (1, 0, 0, 0)}
+    db.expire_all()
+    assert getattr(db.get(model, seqn), column.lower()) == original.loc[row, column].item()
+
+
+def test_lab_changes_refresh_the_summary(seeded_db):
+    db, csv_path, tables = seeded_db
+    seqn = FIRST_SEQN + 2
+    labs = tables["labs"].copy()
+    labs.loc[labs["SEQN"] == seqn, "LBXSCR"] = 4.5
+    tables["labs"] = labs
+    sync(db, csv_path, tables)
+    db.expire_all()
+    assert db.get(PatientSummary, seqn).egfr < 30
+
+
+def test_patients_are_inserted_updated_and_removed(seeded_db):
+    db, csv_path, tables = seeded_db
+    new_seqn = FIRST_SEQN + 100
+    extra = sample_tables(patients=1, first_seqn=new_seqn, seed=7)
+    extra["medications"] = pd.DataFrame(
+        [{"SEQN": new_seqn, "RXDDRUG": "METFORMIN", "RXDRSD1": "Type 2 diabetes mellitus"}]
+    )
+    grown = {name: pd.concat([tables[name], extra[name]], ignore_index=True) for name in tables}
+
+    results = changes(sync(db, csv_path, grown))
+    assert all(counts == (1, 0, 0, 0) for counts in results.values())
+    assert len(results) == 6
+    db.expire_all()
+    assert db.get(PatientSummary, new_seqn) is not None
+    assert db.get(PatientTreatment, new_seqn).on_diabetic
+
+    demographics = grown["demographic"].copy()
+    demographics.loc[demographics["SEQN"] == new_seqn, "RIDAGEYR"] = 33
+    grown["demographic"] = demographics
+    assert changes(sync(db, csv_path, grown)) == {"demographics": (0, 1, 0, 0)}
+    db.expire_all()
+    assert db.get(Demographic, new_seqn).ridageyr == 33
+
+    results = changes(sync(db, csv_path, tables))
+    assert results["demographics"] == (0, 0, 1, 0)
+    db.expire_all()
+    for model in [Demographic, Examination, Labs, Diet, Questionnaire, PatientSummary, PatientTreatment]:
+        assert db.get(model, new_seqn) is None
+    assert medication_rows(db, new_seqn) == []
+    assert db.scalar(select(SeedRowHash).where(SeedRowHash.row_key.like(f"{new_seqn}%"))) is None
+
+
+def test_medications_are_inserted_updated_and_deleted(seeded_db):
+    db, csv_path, tables = seeded_db
+    seqn = FIRST_SEQN + 1
+    meds = tables["medications"]
+    meds = pd.concat([meds[meds["SEQN"] != seqn], pd.DataFrame([
+        {"SEQN": seqn, "RXDDRUG": "LISINOPRIL", "RXDRSD1": "Essential (primary) hypertension"},
+        {"SEQN": seqn, "RXDDRUG": "METFORMIN", "RXDRSD1": "Type 2 diabetes mellitus"},
+    ])], ignore_index=True)
+    tables["medications"] = meds
+    sync(db, csv_path, tables)
+    assert medication_rows(db, seqn) == csv_medication_rows(tables, seqn)
+
+    changed = meds.copy()
+    changed.loc[(changed["SEQN"] == seqn) & (changed["RXDDRUG"] == "METFORMIN"), "RXDRSD1"] = "Prediabetes"
+    tables["medications"] = changed
+    assert changes(sync(db, csv_path, tables)) == {"medications": (0, 1, 0, 0)}
+    assert medication_rows(db, seqn) == csv_medication_rows(tables, seqn)
+
+    tables["medications"] = changed[~((changed["SEQN"] == seqn) & (changed["RXDDRUG"] == "LISINOPRIL"))]
+    assert changes(sync(db, csv_path, tables)) == {"medications": (0, 0, 1, 0)}
+    assert medication_rows(db, seqn) == [("METFORMIN", "Prediabetes")]
+    db.expire_all()
+    assert not db.get(PatientTreatment, seqn).on_antihypertensive
+
+
+def test_reordered_duplicate_drugs_keep_one_row_each(seeded_db):
+    db, csv_path, tables = seeded_db
+    seqn = FIRST_SEQN + 3
+    first = {"SEQN": seqn, "RXDDRUG": "INSULIN GLARGINE", "RXDRSD1": "Type 1 diabetes mellitus"}
+    second = {"SEQN": seqn, "RXDDRUG": "INSULIN GLARGINE", "RXDRSD1": "Type 2 diabetes mellitus"}
+    others = tables["medications"][tables["medications"]["SEQN"] != seqn]
+
+    tables["medications"] = pd.concat([others, pd.DataFrame([first, second])], ignore_index=True)
+    sync(db, csv_path, tables)
+    last_id = db.scalar(select(Medication.id).order_by(Medication.id.desc()))
+    assert medication_rows(db, seqn) == csv_medication_rows(tables, seqn)
+
+    # Swapping the two rows swaps which is occurrence 0 and 1: both are
+    # updated in place, nothing is added or removed
+    tables["medications"] = pd.concat([others, pd.DataFrame([second, first])], ignore_index=True)
+    assert changes(sync(db, csv_path, tables)) == {"medications": (0, 2, 0, 0)}
+    assert medication_rows(db, seqn) == csv_medication_rows(tables, seqn)
+    assert db.scalar(select(Medication.id).order_by(Medication.id.desc())) == last_id
+
+    # Dropping the first leaves the other as occurrence 0
+    tables["medications"] = pd.concat([others, pd.DataFrame([first])], ignore_index=True)
+    assert changes(sync(db, csv_path, tables)) == {"medications": (0, 1, 1, 0)}
+    assert medication_rows(db, seqn) == [("INSULIN GLARGINE", "Type 1 diabetes mellitus")]
+
+
+def test_first_sync_without_recorded_hashes_deletes_nothing(seeded_db):
+    db, csv_path, tables = seeded_db
+    db.execute(delete(SeedRowHash))
+    db.execute(delete(SeedFile))
+    api_seqn = FIRST_SEQN + 500
+    db.add(Demographic(seqn=api_seqn, riagendr=1, ridageyr=40))
+    db.add(Labs(seqn=api_seqn, lbxgh=6.1))
+    db.commit()
+
+    removed_seqn = FIRST_SEQN + 6
+    changed_seqn = FIRST_SEQN + 7
+    labs = tables["labs"].copy()
+    labs.loc[labs["SEQN"] == changed_seqn, "LBXGH"] = 11.1
+    tables["labs"] = labs[labs["SEQN"] != removed_seqn]
+    tables["demographic"] = tables["demographic"][tables["demographic"]["SEQN"] != removed_seqn]
+
+    results = changes(sync(db, csv_path, tables))
+    assert results["labs"] == (0, 1, 0, 0)
+    assert all(deleted == 0 for _, _, deleted, _ in results.values())
+    db.expire_all()
+    assert db.get(Labs, changed_seqn).lbxgh == 11.1
+    assert db.get(Demographic, removed_seqn) is not None
+    assert db.get(Labs, api_seqn).lbxgh == 6.1
+
+    # The first sync recorded what it compared against; the next one is a no-op
+    assert db.scalar(select(SeedRowHash).where(SeedRowHash.table_name == "labs")) is not None
+    assert all(c.unchanged for c in sync(db, csv_path, tables).values())
+
+
+def test_new_rows_for_a_taken_seqn_are_skipped(seeded_db):
+    db, csv_path, tables = seeded_db
+    api_seqn = FIRST_SEQN + 50
+    db.add(Demographic(seqn=api_seqn, riagendr=2, ridageyr=70))
+    db.add(Labs(seqn=api_seqn, lbxgh=5.2))
+    db.commit()
+
+    extra = sample_tables(patients=2, first_seqn=api_seqn, seed=9)
+    grown = {name: pd.concat([tables[name], extra[name]], ignore_index=True) for name in tables}
+
+    results = changes(sync(db, csv_path, grown))
+    assert results["demographics"] == (1, 0, 0, 1)
+    assert results["labs"] == (1, 0, 0, 0)
+    db.expire_all()
+    assert db.get(Demographic, api_seqn).ridageyr == 70
+    assert db.get(Labs, api_seqn).lbxgh == 5.2
+    assert db.get(Demographic, api_seqn + 1) is not None
+
+    # Still taken on the next change, and still never removed
+    demographics = grown["demographic"].copy()
+    demographics.loc[demographics["SEQN"] == FIRST_SEQN, "RIDAGEYR"] = 21
+    grown["demographic"] = demographics
+    assert changes(sync(db, csv_path, grown))["demographics"] == (0, 1, 0, 1)
+    assert changes(sync(db, csv_path, tables))["demographics"] == (0, 1, 1, 0)
+    db.expire_all()
+    assert db.get(Demographic, api_seqn).ridageyr == 70
+    assert db.get(Demographic, api_seqn + 1) is None
@@ -0,0 +1,154 @@
+"""
+Maintenance of the materialized patient_treatment table.
+
+Treatment status is derived from each patient's current medications by
+matching drug names (and, for some classes, the stated reason for use)
+against a drug-class dictionary. The defaults are the keyword lists the ML
+notebooks use; ``Settings.drug_classes_file`` can point at a JSON file that
+overrides the keywords or reason of any class:
+
+    {"antihypertensive": {"keywords": ["LISINOPRIL", "..."], "reason": "hypertension"}}
+"""
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models import Demographic, Medication, PatientTreatment
+from serving.specs import BP_MED_KEYWORDS, DIABETES_MED_KEYWORDS, RENAL_MED_KEYWORDS
+
+
+@dataclass(frozen=True)
+class DrugClass:
+    name: str
+    keywords: tuple[str, ...]
+    reason: Optional[str] = None  # Also match medications taken for this condition
+
+    @property
+    def flag_column(self) -> str:
+        return f"on_{self.name}"
+
+    @property
+    def count_column(self) -> str:
+        return f"{self.name}_count"
+
+
+DEFAULT_DRUG_CLASSES = [
+    DrugClass("antihypertensive", tuple(BP_MED_KEYWORDS), reason="hypertension"),
+    DrugClass("diabetic", tuple(DIABETES_MED_KEYWORDS), reason="diabetes"),
+    DrugClass("renal", tuple(RENAL_MED_KEYWORDS)),
+]
+
+
+@lru_cache
+def get_drug_classes() -> tuple[DrugClass, ...]:
+    """The default drug classes with any overrides from ``drug_classes_file`` applied."""
+    path = get_settings().drug_classes_file
+    if not path:
+        return tuple(DEFAULT_DRUG_CLASSES)
+
+    with open(path) as f:
+        overrides = json.load(f)
+    classes = {c.name: c for c in DEFAULT_DRUG_CLASSES}
+    unknown = set(overrides) - set(classes)
+    if unknown:
+        raise ValueError(f"Unknown drug classes in {path}: {', '.join(sorted(unknown))}")
+    for name, override in overrides.items():
+        default = classes[name]
+        keywords = tuple(override.get("keywords", default.keywords))
+        if any(not isinstance(k, str) or not k.strip() for k in keywords):
+            raise ValueError(f"Drug class {name!r} in {path} has a blank keyword, which would match every drug")
+        classes[name] = DrugClass(name, keywords, override.get("reason", default.reason))
+    return tuple(classes.values())
+
+
+def class_mask(drugs: pd.Series, reasons: pd.Series, drug_class: DrugClass) -> pd.Series:
+    """Rows whose drug name contains a class keyword or whose reason matches the class."""
+    if drug_class.keywords:
+        pattern = '|'.join(re.escape(k) for k in drug_class.keywords)
+        mask = drugs.str.contains(pattern, case=False, na=False)
+    else:
+        # An empty pattern would match every drug
+        mask = pd.Series(False, index=drugs.index)
+    if drug_class.reason:
+        mask |= reasons.str.contains(drug_class.reason, case=False, na=False)
+    return mask
+
+
+def treatment_rows(seqns: list[int], meds: pd.DataFrame) -> list[dict]:
+    """
+    One patient_treatment row per SEQN from a frame of (seqn, rxddrug, rxdrsd1).
+
+    Patients without matching medications get False flags and zero counts,
+    so "not treated" filters work without an outer join.
+    """
+    meds = meds.astype({"rxddrug": object, "rxdrsd1": object})
+    counts = {}
+    for drug_class in get_drug_classes():
+        mask = class_mask(meds["rxddrug"], meds["rxdrsd1"], drug_class)
+        counts[drug_class] = mask.groupby(meds["seqn"]).sum().reindex(seqns, fill_value=0).astype(int).tolist()
+
+    rows = []
+    for i, seqn in enumerate(seqns):
+        row = {"seqn": seqn}
+        for drug_class, values in counts.items():
+            row[drug_class.flag_column] = values[i] > 0
+            row[drug_class.count_column] = values[i]
+        rows.append(row)
+    return rows
+
+
+def medication_frame(db: Session, seqns: Optional[list[int]] = None) -> pd.DataFrame:
+    stmt = select(Medication.seqn, Medication.rxddrug, Medication.rxdrsd1)
+    if seqns is not None:
+        stmt = stmt.where(Medication.seqn.in_(seqns))
+    return pd.DataFrame(db.execute(stmt).all(), columns=["seqn", "rxddrug", "rxdrsd1"])
+
+
+def rebuild_patient_treatments(db: Session, chunk_size: int = 5000) -> int:
+    """Recompute the whole patient_treatment table and return the row count."""
+    seqns = list(db.scalars(select(Demographic.seqn)))
+    rows = treatment_rows(seqns, medication_frame(db))
+
+    db.execute(delete(PatientTreatment))
+    stmt = insert(PatientTreatment)
+    for start in range(0, len(rows), chunk_size):
+        db.execute(stmt, rows[start:start + chunk_size])
+    db.commit()
+    return len(rows)
+
+
+def refresh_patient_treatment(db: Session, seqn: int) -> Optional[PatientTreatment]:
+    """
+    Recompute one patient's treatment status inside the caller's transaction.
+
+    Pending changes are flushed first so the recomputation sees them; the
+    caller is responsible for committing.
+    """
+    db.flush()
+    if db.get(Demographic, seqn) is None:
+        remove_patient_treatment(db, seqn)
+        return None
+    return db.merge(PatientTreatment(**treatment_rows([seqn], medication_frame(db, [seqn]))[0]))
+
+
+def refresh_patient_treatments(db: Session, seqns: list[int]) -> int:
+    """Recompute the treatment rows of several patients inside the caller's transaction."""
+    db.flush()
+    existing = list(db.scalars(select(Demographic.seqn).where(Demographic.seqn.in_(seqns))))
+    rows = treatment_rows(existing, medication_frame(db, existing))
+    db.execute(delete(PatientTreatment).where(PatientTreatment.seqn.in_(seqns)))
+    if rows:
+        db.execute(insert(PatientTreatment), rows)
+    return len(rows)
+
+
+def remove_patient_treatment(db: Session, seqn: int):
+    """Delete one patient's treatment row inside the caller's transaction."""
+    db.query(PatientTreatment).filter(PatientTreatment.seqn == seqn).delete()
@@ -127,6 +127,12 @@ export interface PaginatedResponse<T> {
   page: number
   page_size: number
   pages: number
+  next_cursor?: string | null
+}
+
+export interface PatientBatchResponse {
+  items: PatientDetail[]
+  missing: number[]
 }
 
 export interface PatientFilters {
@@ -137,4 +143,8 @@ export interface PatientFilters {
   max_age?: number
   risk_level?: string
   status?: string
+  on_antihypertensive?: boolean
+  on_diabetic?: boolean
+  on_renal?: boolean
+  cursor?: string
 }
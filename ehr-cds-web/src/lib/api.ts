@@ -8,6 +8,7 @@ import type {
   PatientCreate,
   PatientUpdate,
   PaginatedResponse,
+  PatientBatchResponse,
   PatientFilters,
   Medication,
 } from "./api-types"
@@ -76,6 +77,10 @@ export async function getPatients(
   if (filters.max_age) params.set("max_age", String(filters.max_age))
   if (filters.risk_level) params.set("risk_level", filters.risk_level)
   if (filters.status) params.set("status", filters.status)
+  if (filters.on_antihypertensive !== undefined) params.set("on_antihypertensive", String(filters.on_antihypertensive))
+  if (filters.on_diabetic !== undefined) params.set("on_diabetic", String(filters.on_diabetic))
+  if (filters.on_renal !== undefined) params.set("on_renal", String(filters.on_renal))
+  if (filters.cursor) params.set("cursor", filters.cursor)
 
   const query = params.toString()
   const endpoint = query ? `/patients?${query}` : "/patients"
@@ -87,6 +92,13 @@ export async function getPatient(id: string): Promise<PatientDetail> {
   return fetchApi<PatientDetail>(`/patients/${id}`)
 }
 
+export async function getPatientsBatch(ids: string[]): Promise<PatientBatchResponse> {
+  return fetchApi<PatientBatchResponse>("/patients/batch", {
+    method: "POST",
+    body: JSON.stringify({ ids: ids.map(Number) }),
+  })
+}
+
 export async function createPatient(
   data: PatientCreate
 ): Promise<PatientDetail> {